@@ -1,33 +1,158 @@
-import { useState, useCallback } from 'react';
-import { Alert } from 'react-native';
+import { useState, useCallback, useEffect, useRef } from 'react';
 import { api } from '../utils/api';
+import { API_URL } from '../utils/config';
+import { getAccessToken } from '../utils/identity';
 import { Intent } from '../types/intent';
 import { CoarseLocation } from '../utils/location';
 
+const POLL_INTERVAL_MS = 30000;
+const PING_INTERVAL_MS = 30000;
+// Server default for WS_NEARBY_RESUBSCRIBE_SECONDS; re-sends rejected as too fast wait this long
+const RESUBSCRIBE_RETRY_MS = 1000;
+
+function buildFeedUrl(token: string | null): string {
+    const url = new URL('/ws/nearby', API_URL);
+    url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:';
+    if (token) {
+        url.searchParams.set('token', token);
+    }
+    return url.toString();
+}
+
+function subscribeMessage(loc: CoarseLocation): string {
+    return JSON.stringify({ type: 'subscribe', lat: loc.latitude, lon: loc.longitude });
+}
+
 export function useNearbyIntents() {
     const [nearby, setNearby] = useState<Intent[]>([]);
     const [loading, setLoading] = useState(true);
     const [message, setMessage] = useState<string | null>(null);
+    const etagRef = useRef<string | null>(null);
+    const locRef = useRef<CoarseLocation | null>(null);
+    const wsRef = useRef<WebSocket | null>(null);
+    const pollRef = useRef<NodeJS.Timeout | null>(null);
+    const resubscribeRef = useRef<NodeJS.Timeout | null>(null);
+
+    const poll = useCallback(async (loc: CoarseLocation) => {
+        // Compact view carries exactly the fields of `Intent`;
+        // unchanged results come back as 304 with no body.
+        const res = await api.get('/intents/nearby', {
+            params: { lat: loc.latitude, lon: loc.longitude, view: 'compact' },
+            headers: etagRef.current ? { 'If-None-Match': etagRef.current } : undefined,
+            validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+        });
+        if (res.status === 304) return;
+        etagRef.current = res.headers['etag'] ?? null;
+        setNearby(res.data.intents);
+        setMessage(res.data.message || null);
+    }, []);
+
+    const startPolling = useCallback(() => {
+        if (pollRef.current) return;
+        pollRef.current = setInterval(() => {
+            if (locRef.current) poll(locRef.current).catch(() => {});
+        }, POLL_INTERVAL_MS);
+    }, [poll]);
+
+    const stopPolling = useCallback(() => {
+        if (pollRef.current) {
+            clearInterval(pollRef.current);
+            pollRef.current = null;
+        }
+    }, []);
+
+    // Live feed: a snapshot per subscribe, then add/update/remove diffs.
+    // Falls back to conditional polling while the socket is down.
+    const connectFeed = useCallback(async () => {
+        if (wsRef.current) return;
+        const token = await getAccessToken();
+        const ws = new WebSocket(buildFeedUrl(token));
+        wsRef.current = ws;
+
+        ws.onopen = () => {
+            stopPolling();
+            if (locRef.current) ws.send(subscribeMessage(locRef.current));
+        };
+
+        ws.onmessage = (event) => {
+            let data: any;
+            try {
+                data = JSON.parse(event.data);
+            } catch {
+                return; // Ignore non-JSON (e.g. "pong")
+            }
+            if (data.type === 'snapshot') {
+                setNearby(data.intents);
+            } else if (data.type === 'add') {
+                setNearby(prev => [...prev.filter(i => i.id !== data.intent.id), data.intent]);
+            } else if (data.type === 'update') {
+                setNearby(prev => prev.map(i => (i.id === data.intent.id ? data.intent : i)));
+            } else if (data.type === 'remove') {
+                setNearby(prev => prev.filter(i => i.id !== data.id));
+            } else if (data.type === 'error' && data.message === 'Resubscribing too fast') {
+                // The server kept the previous circle; send the latest location once the window passes
+                if (resubscribeRef.current) return;
+                resubscribeRef.current = setTimeout(() => {
+                    resubscribeRef.current = null;
+                    if (ws.readyState === WebSocket.OPEN && locRef.current) {
+                        ws.send(subscribeMessage(locRef.current));
+                    }
+                }, RESUBSCRIBE_RETRY_MS);
+            }
+        };
+
+        ws.onclose = () => {
+            if (wsRef.current === ws) wsRef.current = null;
+            startPolling();
+        };
+    }, [startPolling, stopPolling]);
 
     const fetchIntents = useCallback(async (loc: CoarseLocation | null) => {
         setLoading(true);
         try {
             if (loc) {
-                const res = await api.get('/intents/nearby', {
-                    params: { lat: loc.latitude, lon: loc.longitude }
-                });
-                setNearby(res.data.intents);
-                setMessage(res.data.message || null);
+                locRef.current = loc;
+                const ws = wsRef.current;
+                if (ws?.readyState === WebSocket.OPEN) {
+                    // The subscribe's snapshot replaces a poll
+                    ws.send(subscribeMessage(loc));
+                } else if (ws?.readyState !== WebSocket.CONNECTING) {
+                    // A connecting socket subscribes to locRef on open
+                    await poll(loc);
+                    connectFeed();
+                }
             } else {
                 setMessage("We need your location to find the Nowhere.");
             }
         } catch (e: any) {
             // Keep stale data visible — don't clear nearby
             setMessage(e.userMessage || "Could not fetch nearby events");
+            startPolling();
         } finally {
             setLoading(false);
         }
-    }, []);
+    }, [poll, connectFeed, startPolling]);
+
+    useEffect(() => {
+        // Keepalive so the server's idle timeout doesn't close the feed
+        const pingInterval = setInterval(() => {
+            if (wsRef.current?.readyState === WebSocket.OPEN) {
+                wsRef.current.send('ping');
+            }
+        }, PING_INTERVAL_MS);
+
+        return () => {
+            clearInterval(pingInterval);
+            stopPolling();
+            if (resubscribeRef.current) clearTimeout(resubscribeRef.current);
+            const ws = wsRef.current;
+            wsRef.current = null;
+            if (ws) {
+                ws.onclose = null;
+                ws.close();
+            }
+        };
+    }, [stopPolling]);
 
     return { nearby, loading, message, fetchIntents };
 }
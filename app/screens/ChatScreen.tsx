@@ -37,6 +37,7 @@ export default function ChatScreen({ route, navigation }: Props) {
     const wsRef = useRef<WebSocket | null>(null);
     const intervalRef = useRef<NodeJS.Timeout | null>(null);
     const flatListRef = useRef<FlatList>(null);
+    const etagRef = useRef<string | null>(null);
 
     // Validate intentId is a real UUID — reject malicious route params
     useEffect(() => {
@@ -49,7 +50,13 @@ export default function ChatScreen({ route, navigation }: Props) {
     const fetchMessages = useCallback(async () => {
         if (!isValidUUID(intentId)) return;
         try {
-            const res = await api.get(`/intents/${intentId}/messages`);
+            // Conditional poll: the server answers 304 when nothing changed
+            const res = await api.get(`/intents/${intentId}/messages`, {
+                headers: etagRef.current ? { 'If-None-Match': etagRef.current } : undefined,
+                validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+            });
+            if (res.status === 304) return;
+            etagRef.current = res.headers['etag'] ?? null;
             setMessages(res.data);
         } catch (e) {
             logError('Failed to fetch messages', e);
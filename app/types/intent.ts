@@ -5,4 +5,5 @@ export interface Intent {
     latitude: number;
     longitude: number;
     join_count: number;
+    online_count?: number;
 }
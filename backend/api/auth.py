@@ -1,12 +1,13 @@
 import logging
-from fastapi import APIRouter, HTTPException, Depends, Request
-from pydantic import BaseModel
+from typing import Annotated
 from uuid import UUID, uuid4
-from redis.asyncio import Redis
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
 from ..auth.jwt import create_access_token
-from ..infra.persistence.redis import get_redis_client
-from ..infra.persistence.keys import RedisKeys
-from .deps import get_current_user_id
+from ..infra.persistence.erasure_repo import ErasureRepository
+from .deps import get_current_user_id, get_erasure_repo
 
 logger = logging.getLogger(__name__)
 
@@ -48,44 +49,23 @@ async def handshake(request: HandshakeRequest):
 
 @router.delete("/me/data", status_code=200)
 async def delete_my_data(
-    user_id: UUID = Depends(get_current_user_id),
-    redis: Redis = Depends(get_redis_client),
+    user_id: Annotated[UUID, Depends(get_current_user_id)],
+    erasure_repo: Annotated[ErasureRepository, Depends(get_erasure_repo)],
 ):
     """
     GDPR Article 17 — Right to Erasure.
-    Deletes all data associated with the authenticated user from Redis.
+    Deletes all data associated with the authenticated user from Redis:
+    their intents, identity-scoped keys, and their joins, flags and
+    messages in other people's intents. Runs as one server-side script.
     """
-    uid = str(user_id)
-    deleted_keys = 0
-
-    # 1. Find all intents created by this user
-    user_intents_key = RedisKeys.user_intents(uid)
-    intent_ids = await redis.smembers(user_intents_key)
-
-    for intent_id in intent_ids:
-        # Delete intent data, messages, joins, flags
-        keys_to_delete = [
-            RedisKeys.intent(intent_id),
-            RedisKeys.intent_messages(intent_id),
-            RedisKeys.intent_joins(intent_id),
-            RedisKeys.intent_flags(intent_id),
-        ]
-        result = await redis.delete(*keys_to_delete)
-        deleted_keys += result
-
-        # Remove from geo index
-        await redis.zrem(RedisKeys.intent_geo(), intent_id)
-
-    # 2. Delete user's intent list
-    await redis.delete(user_intents_key)
-    deleted_keys += 1
-
-    # 3. Delete rate limit keys
-    for action in ("create_intent", "join", "message", "flag"):
-        await redis.delete(RedisKeys.rate_limit(uid, action))
-
-    # 4. Delete spam tracking
-    await redis.delete(RedisKeys.spam_last_hash(uid))
-
-    logger.info("GDPR erasure completed for user %s: %d keys deleted", uid, deleted_keys)
-    return {"status": "deleted", "keys_removed": deleted_keys}
+    result = await erasure_repo.erase_user(user_id)
+    logger.info(
+        "GDPR erasure completed for user %s: %d keys deleted, %d memberships, %d messages",
+        user_id, result.keys_deleted, result.memberships_removed, result.messages_removed,
+    )
+    return {
+        "status": "deleted",
+        "keys_removed": result.keys_deleted,
+        "memberships_removed": result.memberships_removed,
+        "messages_removed": result.messages_removed,
+    }
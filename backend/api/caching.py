@@ -0,0 +1,25 @@
+from fastapi import Request, Response
+
+# Clients must revalidate every time, but may reuse their copy on 304.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(version: str | int) -> str:
+    """Weak ETag — the body is equivalent, not byte-identical, across encodings."""
+    return f'W/"{version}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 §13.1.2): ignore the W/ prefix on both sides
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
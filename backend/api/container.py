@@ -0,0 +1,92 @@
+from redis.asyncio import Redis
+
+from ..config import Settings
+from ..core.clock import SystemClock
+from ..core.event_bus import InMemoryEventBus
+from ..core.events import IntentCreated, IntentFlagged, IntentJoined, MessagePosted
+from ..infra.persistence.density_repo import DensityRepository
+from ..infra.persistence.erasure_repo import ErasureRepository
+from ..infra.persistence.event_store import RedisEventStore
+from ..infra.persistence.intent_repo import IntentRepository
+from ..infra.persistence.join_repo import JoinRepository
+from ..infra.persistence.message_repo import MessageRepository
+from ..infra.persistence.metrics_repo import MetricsRepository, NullMetricsRepository
+from ..infra.persistence.presence_repo import PresenceRepository
+from ..infra.persistence.trending_repo import TrendingRepository
+from ..infra.persistence.unit_of_work import RedisUnitOfWork
+from ..services.density_service import DensityService
+from ..services.intent_command_handler import IntentCommandHandler
+from ..services.intent_query_service import IntentQueryService
+from ..services.intent_service import IntentService
+from ..services.metrics_event_handler import MetricsEventHandler
+from ..services.ranking_service import RankingService
+from ..services.trending_service import TrendingService
+from ..spam import SpamDetector
+
+
+class Container:
+    """
+    Application object graph, built once per lifespan and kept on
+    `app.state.container`. Repositories and services hold no per-request
+    state, so they are shared; only the unit of work (and the command
+    handler wrapping it) is created per request.
+    """
+
+    def __init__(self, redis: Redis, reader: Redis, settings: Settings):
+        self.redis = redis
+        self.reader = reader
+        self.clock = SystemClock()
+
+        self.intent_repo = IntentRepository(redis=redis, reader=reader)
+        self.join_repo = JoinRepository(redis=redis, reader=reader)
+        self.message_repo = MessageRepository(redis=redis, reader=reader)
+        self.erasure_repo = ErasureRepository(redis)
+        self.presence_repo = PresenceRepository(redis=redis, reader=reader)
+        self.density_repo = DensityRepository(
+            redis=redis, reader=reader,
+            half_life_seconds=settings.DENSITY_HALF_LIFE_SECONDS, precision=settings.DENSITY_GEOHASH_PRECISION,
+        )
+        self.trending_repo = TrendingRepository(redis=redis, reader=reader, precision=settings.TRENDING_GEOHASH_PRECISION)
+        self.metrics_repo = MetricsRepository() if settings.POSTGRES_ENABLED else NullMetricsRepository()
+        self.spam_detector = SpamDetector(redis)
+        self.ranking_service = RankingService(settings)
+
+        self.density_service = DensityService(self.density_repo)
+        self.trending_service = TrendingService(self.trending_repo, self.intent_repo)
+
+        self.event_bus = InMemoryEventBus(event_store=RedisEventStore(redis))
+        self.event_bus.subscribe(IntentCreated, self.density_service.on_intent_created)
+        self.event_bus.subscribe(IntentJoined, self.density_service.on_intent_joined)
+        self.event_bus.subscribe(MessagePosted, self.density_service.on_message_posted)
+        self.event_bus.subscribe(IntentFlagged, self.trending_service.on_intent_flagged)
+        if settings.POSTGRES_ENABLED:
+            metrics_handler = MetricsEventHandler(self.metrics_repo)
+            self.event_bus.subscribe(IntentCreated, metrics_handler.on_intent_created)
+            self.event_bus.subscribe(IntentJoined, metrics_handler.on_intent_joined)
+            self.event_bus.subscribe(MessagePosted, metrics_handler.on_message_posted)
+            self.event_bus.subscribe(IntentFlagged, metrics_handler.on_intent_flagged)
+
+        self.query_service = IntentQueryService(
+            intent_repo=self.intent_repo,
+            ranking_service=self.ranking_service,
+            message_repo=self.message_repo,
+            join_repo=self.join_repo,
+            density_service=self.density_service,
+            event_bus=self.event_bus,
+            query_sample_rate=settings.RANKING_QUERY_SAMPLE_RATE,
+            cluster_method=settings.CLUSTERING_METHOD,
+        )
+        self.intent_service = IntentService(
+            intent_repo=self.intent_repo,
+            join_repo=self.join_repo,
+            message_repo=self.message_repo,
+            metrics_repo=self.metrics_repo,
+            spam_detector=self.spam_detector,
+            clock=self.clock,
+        )
+
+    def unit_of_work(self) -> RedisUnitOfWork:
+        return RedisUnitOfWork(redis=self.redis, event_bus=self.event_bus)
+
+    def command_handler(self) -> IntentCommandHandler:
+        return IntentCommandHandler(uow=self.unit_of_work(), spam_detector=self.spam_detector)
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
-from ..infra.persistence.intent_repo import IntentRepository
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+
 from ..api.deps import get_intent_repo
+from ..config import settings
+from ..infra.persistence import tracing
+from ..infra.persistence.intent_repo import IntentRepository
 from ..tasks.seeder import seed_ambient_intents
-from ..core.models.intent import Intent
+from .ws import get_ws_manager
 
 router = APIRouter()
 
@@ -29,3 +34,25 @@ async def seed_intents(
         radius_km=request.radius_km
     )
     return seeded
+
+
+@router.get("/profile")
+async def redis_profile(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: Literal["total", "mean", "max"] = "total",
+    reset: bool = False,
+):
+    """
+    Slowest Redis key patterns seen by this worker since start (or the last
+    reset). Requires REDIS_TRACE_ENABLED.
+    """
+    patterns = tracing.slowest_patterns(limit=limit, order_by=order_by)
+    if reset:
+        tracing.reset_stats()
+    return {"enabled": settings.REDIS_TRACE_ENABLED, "order_by": order_by, "patterns": patterns}
+
+
+@router.get("/ws")
+async def ws_memory():
+    """Connection counts and manager-held memory for this worker's WebSockets."""
+    return get_ws_manager().memory_usage()
@@ -1,8 +1,35 @@
-from fastapi import Request, HTTPException
 from uuid import UUID
 
-def get_current_user_id(request: Request) -> UUID:
-    user_id = getattr(request.state, "user_id", None)
+from fastapi import HTTPException
+from starlette.requests import HTTPConnection
+
+from ..core.clock import Clock
+from ..core.event_bus import EventBus
+from ..core.interfaces.repositories import MetricsRepository
+from ..core.unit_of_work import UnitOfWork
+from ..infra.persistence.erasure_repo import ErasureRepository
+from ..infra.persistence.intent_repo import IntentRepository
+from ..infra.persistence.join_repo import JoinRepository
+from ..infra.persistence.message_repo import MessageRepository
+from ..services.density_service import DensityService
+from ..services.intent_command_handler import IntentCommandHandler
+from ..services.intent_query_service import IntentQueryService
+from ..services.intent_service import IntentService
+from ..services.ranking_service import RankingService
+from ..services.trending_service import TrendingService
+from ..spam import SpamDetector
+from .container import Container
+
+# All providers are `async def`: FastAPI runs plain `def` dependencies in the
+# threadpool, which cost more than the lookups themselves.
+
+
+async def get_current_user_id(conn: HTTPConnection) -> UUID:
+    # Set by RequestMiddleware; reuses the UUID cached with the verified token
+    user_uuid = getattr(conn.state, "user_uuid", None)
+    if user_uuid is not None:
+        return user_uuid
+    user_id = getattr(conn.state, "user_id", None)
     if not user_id:
         # Should be caught by middleware normally, but defensive check
         raise HTTPException(status_code=401, detail="User not authenticated")
@@ -11,106 +38,71 @@ def get_current_user_id(request: Request) -> UUID:
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid user ID")
 
-from fastapi import Depends
-from redis.asyncio import Redis
-from ..infra.persistence.redis import get_redis_client
-from ..infra.persistence.redis import get_redis_client
-from ..spam import SpamDetector
-from ..infra.persistence.intent_repo import IntentRepository
-from ..infra.persistence.join_repo import JoinRepository
-from ..infra.persistence.message_repo import MessageRepository
-from ..infra.persistence.metrics_repo import MetricsRepository
-from ..services.intent_service import IntentService
-from ..services.intent_command_handler import IntentCommandHandler
-from ..services.intent_query_service import IntentQueryService
-from ..services.metrics_event_handler import MetricsEventHandler
-from ..core.clock import Clock, SystemClock
-from ..core.event_bus import EventBus, InMemoryEventBus
-from ..services.ranking_service import RankingService
-from ..config import settings as app_settings
-from ..core.events import IntentCreated, IntentJoined, MessagePosted, IntentFlagged
-from ..infra.persistence.event_store import RedisEventStore
-
-# Global event bus instance (singleton pattern)
-_event_bus = None
-
-def get_clock() -> Clock:
-    return SystemClock()
-
-def get_intent_repo(redis: Redis = Depends(get_redis_client)) -> IntentRepository:
-    return IntentRepository(redis=redis)
-
-def get_join_repo(redis: Redis = Depends(get_redis_client)) -> JoinRepository:
-    return JoinRepository(redis=redis)
-
-def get_message_repo(redis: Redis = Depends(get_redis_client)) -> MessageRepository:
-    return MessageRepository(redis=redis)
-
-def get_metrics_repo(redis: Redis = Depends(get_redis_client)) -> MetricsRepository:
-    return MetricsRepository(redis=redis)
-
-def get_spam_detector(redis: Redis = Depends(get_redis_client)) -> SpamDetector:
-    return SpamDetector(redis)
-
-def get_event_bus(
-    metrics_repo: MetricsRepository = Depends(get_metrics_repo),
-    redis: Redis = Depends(get_redis_client),
-) -> EventBus:
-    """Get the global event bus instance and wire up handlers."""
-    global _event_bus
-    if _event_bus is None:
-        event_store = RedisEventStore(redis)
-        _event_bus = InMemoryEventBus(event_store=event_store)
-
-        # Wire up metrics event handler
-        metrics_handler = MetricsEventHandler(metrics_repo)
-        _event_bus.subscribe(IntentCreated, metrics_handler.on_intent_created)
-        _event_bus.subscribe(IntentJoined, metrics_handler.on_intent_joined)
-        _event_bus.subscribe(MessagePosted, metrics_handler.on_message_posted)
-        _event_bus.subscribe(IntentFlagged, metrics_handler.on_intent_flagged)
-
-    return _event_bus
-
-def get_intent_service(
-    intent_repo: IntentRepository = Depends(get_intent_repo),
-    join_repo: JoinRepository = Depends(get_join_repo),
-    message_repo: MessageRepository = Depends(get_message_repo),
-    metrics_repo: MetricsRepository = Depends(get_metrics_repo),
-    spam_detector: SpamDetector = Depends(get_spam_detector),
-    clock: Clock = Depends(get_clock)
-) -> IntentService:
-    return IntentService(
-        intent_repo=intent_repo,
-        join_repo=join_repo,
-        message_repo=message_repo,
-        metrics_repo=metrics_repo,
-        spam_detector=spam_detector,
-        clock=clock
-    )
 
-from ..core.unit_of_work import UnitOfWork
-from ..infra.persistence.unit_of_work import RedisUnitOfWork
-
-def get_unit_of_work(
-    redis: Redis = Depends(get_redis_client),
-    event_bus: EventBus = Depends(get_event_bus)
-) -> UnitOfWork:
-    return RedisUnitOfWork(redis=redis, event_bus=event_bus)
-
-def get_intent_command_handler(
-    uow: UnitOfWork = Depends(get_unit_of_work),
-    spam_detector: SpamDetector = Depends(get_spam_detector)
-) -> IntentCommandHandler:
-    return IntentCommandHandler(
-        uow=uow,
-        spam_detector=spam_detector
-    )
-
-def get_ranking_service() -> RankingService:
-    return RankingService(app_settings)
-
-def get_intent_query_service(
-    intent_repo: IntentRepository = Depends(get_intent_repo),
-    ranking_service: RankingService = Depends(get_ranking_service),
-) -> IntentQueryService:
-    return IntentQueryService(intent_repo=intent_repo, ranking_service=ranking_service)
+async def get_container(conn: HTTPConnection) -> Container:
+    container = getattr(conn.app.state, "container", None)
+    if container is None:
+        # Lifespan could not reach Redis
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    return container
+
+
+async def get_clock(conn: HTTPConnection) -> Clock:
+    return (await get_container(conn)).clock
+
+
+async def get_intent_repo(conn: HTTPConnection) -> IntentRepository:
+    return (await get_container(conn)).intent_repo
+
+
+async def get_join_repo(conn: HTTPConnection) -> JoinRepository:
+    return (await get_container(conn)).join_repo
+
+
+async def get_message_repo(conn: HTTPConnection) -> MessageRepository:
+    return (await get_container(conn)).message_repo
+
+
+async def get_erasure_repo(conn: HTTPConnection) -> ErasureRepository:
+    return (await get_container(conn)).erasure_repo
+
+
+async def get_metrics_repo(conn: HTTPConnection) -> MetricsRepository:
+    return (await get_container(conn)).metrics_repo
+
+
+async def get_spam_detector(conn: HTTPConnection) -> SpamDetector:
+    return (await get_container(conn)).spam_detector
+
+
+async def get_event_bus(conn: HTTPConnection) -> EventBus:
+    return (await get_container(conn)).event_bus
+
+
+async def get_density_service(conn: HTTPConnection) -> DensityService:
+    return (await get_container(conn)).density_service
+
+
+async def get_trending_service(conn: HTTPConnection) -> TrendingService:
+    return (await get_container(conn)).trending_service
+
+
+async def get_ranking_service(conn: HTTPConnection) -> RankingService:
+    return (await get_container(conn)).ranking_service
+
+
+async def get_intent_service(conn: HTTPConnection) -> IntentService:
+    return (await get_container(conn)).intent_service
+
+
+async def get_intent_query_service(conn: HTTPConnection) -> IntentQueryService:
+    return (await get_container(conn)).query_service
+
+
+async def get_unit_of_work(conn: HTTPConnection) -> UnitOfWork:
+    """Fresh unit of work (pipeline + collected events) per request."""
+    return (await get_container(conn)).unit_of_work()
+
+
+async def get_intent_command_handler(conn: HTTPConnection) -> IntentCommandHandler:
+    return (await get_container(conn)).command_handler()
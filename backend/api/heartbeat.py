@@ -0,0 +1,137 @@
+"""
+Shared heartbeat for WebSocket connections.
+
+One task per worker replaces a timer per receive: connections sit in a
+hashed timer wheel bucketed by idle deadline, and each tick drains one
+bucket. Receives only stamp `last_seen`; a connection that comes due but
+was seen since is re-bucketed, one that was not is evicted with the rest
+of its batch. Every tick also flushes presence (users seen per room
+since the last tick) in one pipeline, one ZADD per room. Every
+WS_ROOM_CHECK_SECONDS the same loop checks each room's intent in one
+pipeline and closes rooms whose intent expired or was deleted.
+
+Ping/pong frames are not reachable through ASGI: uvicorn sends protocol
+pings itself (--ws-ping-interval / --ws-ping-timeout, 20s by default) and
+drops peers that stop answering. This loop handles peers that are alive
+but silent, and rooms that outlive their intent.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Callable
+
+from redis.asyncio import Redis
+
+from ..infra.persistence.keys import RedisKeys
+from ..infra.persistence.presence_repo import PresenceRepository
+
+logger = logging.getLogger(__name__)
+
+IDLE_CLOSE_CODE = 4008
+EXPIRED_CLOSE_CODE = 4004
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel of `slots` buckets, `tick` seconds each. Items fire
+    at most one tick late and never early, except that deadlines beyond
+    one turn of the wheel are clamped to the last bucket (callers re-check
+    and reschedule).
+    """
+
+    def __init__(self, tick: float, slots: int, now: float):
+        self.tick = tick
+        self._buckets: list[list] = [[] for _ in range(slots)]
+        self._cursor = 0
+        self._time = now  # when the cursor bucket was due
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets)
+
+    def schedule(self, item, deadline: float) -> None:
+        ticks = min(max(1, math.ceil((deadline - self._time) / self.tick)), len(self._buckets) - 1)
+        self._buckets[(self._cursor + ticks) % len(self._buckets)].append(item)
+
+    def advance(self, now: float) -> list:
+        """Pop every bucket due by `now`."""
+        due = []
+        while self._time + self.tick <= now:
+            self._cursor = (self._cursor + 1) % len(self._buckets)
+            self._time += self.tick
+            if self._buckets[self._cursor]:
+                due.extend(self._buckets[self._cursor])
+                self._buckets[self._cursor] = []
+        return due
+
+
+class Heartbeat:
+    def __init__(
+        self,
+        manager,
+        idle_timeout: float,
+        tick: float,
+        room_check_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.manager = manager
+        self.idle_timeout = idle_timeout
+        self.room_check_interval = room_check_interval
+        self.clock = clock
+        self.wheel = TimerWheel(tick, math.ceil(idle_timeout / tick) + 1, clock())
+
+    def track(self, conn) -> None:
+        self.wheel.schedule(conn, conn.last_seen + self.idle_timeout)
+
+    async def sweep(self) -> int:
+        """Evict connections silent for `idle_timeout`; returns how many."""
+        now = self.clock()
+        idle = []
+        for conn in self.wheel.advance(now):
+            if not self.manager.is_connected(conn):
+                continue
+            if now - conn.last_seen >= self.idle_timeout:
+                idle.append(conn)
+            else:
+                self.wheel.schedule(conn, conn.last_seen + self.idle_timeout)
+        if idle:
+            await self.manager.evict(idle, code=IDLE_CLOSE_CODE, reason="Idle timeout")
+            logger.info("Evicted %d idle WebSocket connections", len(idle))
+        return len(idle)
+
+    async def flush_presence(self, presence: PresenceRepository) -> None:
+        await presence.record(self.manager.drain_presence())
+
+    async def check_rooms(self, reader: Redis) -> int:
+        """Close every room whose intent no longer exists; returns how many."""
+        room_ids = self.manager.room_ids()
+        if not room_ids:
+            return 0
+        pipe = reader.pipeline(transaction=False)
+        for intent_id in room_ids:
+            pipe.exists(RedisKeys.intent(intent_id))
+        exists = await pipe.execute()
+        expired = [intent_id for intent_id, found in zip(room_ids, exists, strict=True) if not found]
+        for intent_id in expired:
+            await self.manager.close_room(intent_id, code=EXPIRED_CLOSE_CODE, reason="Intent expired")
+        if expired:
+            logger.info("Closed %d WebSocket rooms for expired intents", len(expired))
+        return len(expired)
+
+    async def run(self, reader: Redis | None, presence: PresenceRepository | None = None) -> None:
+        """
+        Tick forever; cancel to stop. Without Redis (`reader`/`presence`
+        None) only idle eviction runs.
+        """
+        next_check = self.clock() + self.room_check_interval
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            try:
+                await self.sweep()
+                if presence is not None:
+                    await self.flush_presence(presence)
+                if reader is not None and self.clock() >= next_check:
+                    next_check = self.clock() + self.room_check_interval
+                    await self.check_rooms(reader)
+            except Exception as e:  # noqa: BLE001 - the loop must outlive any one failed sweep
+                logger.warning("WebSocket heartbeat sweep failed: %s", e)
@@ -1,17 +1,21 @@
+from datetime import datetime
+from hashlib import blake2b
+from typing import Annotated, Literal
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from ..core.models.intent import Intent
-from ..core.models.message import Message
-from ..core.exceptions import IntentNotFound, DomainError, InvalidAction
+from ..core.models.ranking import RANKING_STRATEGIES
+from ..core.exceptions import DomainError
 from ..core.commands import CreateIntent, JoinIntent, PostMessage, FlagIntent
 from ..core.clock import Clock
-from .deps import get_current_user_id, get_intent_command_handler, get_intent_query_service, get_clock
+from .deps import get_current_user_id, get_intent_command_handler, get_intent_query_service, get_trending_service, get_clock
 from .limiter import RateLimiter, DynamicRateLimiter
 from .message_schemas import CreateMessageRequest
-from .join_schemas import JoinRequest
-from .schemas import NearbyResponse, CreateIntentRequest, ClusterResponse
+from .schemas import NearbyResponse, CompactNearbyResponse, CompactIntent, CreateIntentRequest
+from .caching import CACHE_CONTROL, make_etag, etag_matches, not_modified
 from ..services.intent_command_handler import IntentCommandHandler
 from ..services.intent_query_service import IntentQueryService
+from ..services.trending_service import TrendingService
 from .ws import get_ws_manager
 
 router = APIRouter()
@@ -37,25 +41,79 @@ async def create_intent(
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
+def _nearby_etag(intents: list[Intent], view: str) -> str:
+    """
+    Content hash of a ranked result set. Everything else on an Intent is
+    immutable, so ids, order, join/online counts and flags identify the payload.
+    """
+    h = blake2b(view.encode(), digest_size=12)
+    for intent in intents:
+        h.update(f"|{intent.id}:{intent.join_count}:{intent.online_count}:{intent.flags}".encode())
+    return make_etag(h.hexdigest())
+
 @router.get("/nearby")
 async def find_nearby_intents(
     lat: float,
     lon: float,
+    request: Request,
     radius: float = 1.0,
     limit: int = 50,
+    view: Literal["full", "compact"] = "full",
+    ranking: str | None = None,
     query_service: IntentQueryService = Depends(get_intent_query_service),
 ):
+    """
+    Ranked intents around a point. `view=compact` returns only the fields the
+    list renders; `ranking` picks a ranking strategy (else the configured one,
+    or the A/B experiment's for an authenticated caller's bucket). Supports If-None-Match;
+    large bodies are gzip-compressed.
+    """
     if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
         raise HTTPException(status_code=422, detail="Invalid coordinates")
     if not (0.1 <= radius <= 50):
         raise HTTPException(status_code=422, detail="Radius must be between 0.1 and 50 km")
+    if ranking is not None and ranking not in RANKING_STRATEGIES:
+        raise HTTPException(status_code=422, detail=f"Unknown ranking strategy: {ranking}")
     limit = min(limit, 100)
-    intents = await query_service.get_nearby(lat, lon, radius, limit)
-    
-    response = NearbyResponse(intents=intents, count=len(intents))
+    # Anonymous callers get a fresh uuid per request: bucketing on it would flip
+    # their strategy (and ETag) between identical requests, so they get the default
+    user_id = request.state.user_uuid if getattr(request.state, "is_authenticated", False) else None
+    intents = await query_service.get_nearby(lat, lon, radius, limit, strategy=ranking, user_id=user_id)
+
+    etag = _nearby_etag(intents, view)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if view == "compact":
+        response = CompactNearbyResponse(
+            intents=[CompactIntent.from_intent(i) for i in intents], count=len(intents)
+        )
+    else:
+        response = NearbyResponse(intents=intents, count=len(intents))
     if not intents:
         response.message = "It's quiet here. Start something?"
-        
+
+    # Serialize once in pydantic-core instead of going through jsonable_encoder
+    return Response(
+        content=response.model_dump_json(),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+@router.get("/trending")
+async def trending_intents(
+    lat: float,
+    lon: float,
+    trending_service: Annotated[TrendingService, Depends(get_trending_service)],
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Most-joined intents in the caller's geohash cell and the cells around it."""
+    if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        raise HTTPException(status_code=422, detail="Invalid coordinates")
+    intents = await trending_service.trending(lat, lon, limit)
+    response = NearbyResponse(intents=intents, count=len(intents))
+    if not intents:
+        response.message = "Nothing trending here yet."
     return response
 
 @router.get("/clusters")
@@ -127,6 +185,35 @@ async def post_message(
             raise HTTPException(status_code=403, detail=str(e))
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/{intent_id}/messages")
+async def get_messages(
+    intent_id: UUID,
+    request: Request,
+    response: Response,
+    user_id: Annotated[UUID, Depends(get_current_user_id)],
+    query_service: Annotated[IntentQueryService, Depends(get_intent_query_service)],
+    since: datetime | None = None,
+    limit: int = 50,
+):
+    """
+    Recent chat messages, oldest first. `since` returns only newer messages.
+    Supports If-None-Match: unchanged polls get a 304 without reading the list.
+    """
+    if not await query_service.can_read_messages(intent_id, user_id):
+        raise HTTPException(status_code=403, detail="Must join intent to read messages")
+
+    limit = max(1, min(limit, 100))
+    version = await query_service.get_message_version(intent_id)
+    # Different slices of the same version must not share a validator
+    etag = make_etag(f"{intent_id}:{version}:{since.isoformat() if since else ''}:{limit}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    messages = await query_service.get_messages(intent_id, since=since, limit=limit)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return messages
+
 @router.post("/{intent_id}/flag", status_code=200, dependencies=[Depends(RateLimiter("flag", 5, 3600))])
 async def flag_intent(
     intent_id: UUID,
@@ -1,9 +1,13 @@
-from fastapi import HTTPException, Depends, Request
+import logging
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request
 from redis.asyncio import Redis
-from ..infra.persistence.redis import get_redis_client
+
+from ..config import settings
 from ..infra.persistence.keys import RedisKeys
+from ..infra.persistence.redis import get_redis_client
 from .deps import get_current_user_id
-import logging
 
 logger = logging.getLogger(__name__)
 
@@ -18,21 +22,27 @@ class RateLimiter:
         key = RedisKeys.rate_limit(user_id, self.action)
         effective_limit = limit_override if limit_override is not None else self.limit
         
+        current = await self._hit(key, redis)
+        if current > effective_limit:
+            await self._reject(key, redis, effective_limit)
+
+    async def _hit(self, key: str, redis: Redis) -> int:
         current = await redis.incr(key)
         if current == 1:
             await redis.expire(key, self.window)
-            
-        if current > effective_limit:
-            wait_time = await redis.ttl(key)
-            raise HTTPException(
-                status_code=429, 
-                detail=f"Rate limit exceeded for {self.action} (Limit: {effective_limit}). Try again in {wait_time} seconds."
-            )
+        return current
+
+    async def _reject(self, key: str, redis: Redis, limit: int) -> None:
+        wait_time = await redis.ttl(key)
+        raise HTTPException(
+            status_code=429, 
+            detail=f"Rate limit exceeded for {self.action} (Limit: {limit}). Try again in {wait_time} seconds."
+        )
 
     async def __call__(
-        self, 
-        user_id: str = Depends(get_current_user_id),
-        redis: Redis = Depends(get_redis_client)
+        self,
+        user_id: Annotated[str, Depends(get_current_user_id)],
+        redis: Annotated[Redis, Depends(get_redis_client)],
     ) -> bool:
         await self.check_limit(user_id, redis)
         return True
@@ -40,12 +50,56 @@ class RateLimiter:
 
 class DynamicRateLimiter(RateLimiter):
     """
-    Rate limiter with configurable limits.
-    For dynamic density-based limiting, use a factory function.
+    Rate limiter whose limit shrinks in busy areas. The location comes from
+    `lat`/`lon` query params or a JSON body's `latitude`/`longitude`; above
+    DENSITY_BUSY_ACTIVITY decayed events in that geohash cell the limit
+    scales by busy / activity (never below 1). Without a location or a
+    container the base limit applies.
     """
-    pass
+
+    def __init__(self, action: str, limit: int, window: int = 3600, busy_activity: float | None = None):
+        super().__init__(action, limit, window)
+        self.busy_activity = settings.DENSITY_BUSY_ACTIVITY if busy_activity is None else busy_activity
+
+    def limit_for(self, activity: float) -> int:
+        if activity <= self.busy_activity:
+            return self.limit
+        return max(1, int(self.limit * self.busy_activity / activity))
+
+    async def __call__(
+        self,
+        request: Request,
+        user_id: Annotated[str, Depends(get_current_user_id)],
+        redis: Annotated[Redis, Depends(get_redis_client)],
+    ) -> bool:
+        key = RedisKeys.rate_limit(user_id, self.action)
+        current = await self._hit(key, redis)
+        limit = self.limit
+        # The limit never drops below 1: the first request of a window skips the density lookup
+        if current > 1:
+            location = await _request_location(request)
+            container = getattr(request.app.state, "container", None)
+            if location is not None and container is not None:
+                density = await container.density_service.density(*location)
+                limit = self.limit_for(density.activity)
+        if current > limit:
+            await self._reject(key, redis, limit)
+        return True
+
+
+async def _request_location(request: Request) -> tuple[float, float] | None:
+    try:
+        if "lat" in request.query_params and "lon" in request.query_params:
+            return float(request.query_params["lat"]), float(request.query_params["lon"])
+        if request.headers.get("content-type", "").startswith("application/json"):
+            # FastAPI has already read the body for the endpoint; Request caches it
+            body = await request.json()
+            if isinstance(body, dict) and "latitude" in body and "longitude" in body:
+                return float(body["latitude"]), float(body["longitude"])
+    except (ValueError, TypeError):
+        pass  # malformed input is the endpoint's to reject
+    return None
 
 
 async def rate_limit(request: Request) -> None:
     """Placeholder rate limit function for middleware or direct usage."""
-    pass
@@ -1,54 +1,47 @@
 import logging
-from fastapi import APIRouter, Depends, Request
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from prometheus_client.core import GaugeMetricFamily
 from redis.asyncio import Redis
-from ..infra.persistence.redis import get_redis_client
+from redis.exceptions import RedisError
+
+from ..core.metrics import render_metrics
 from ..infra.persistence.event_store import STREAM_KEY
+from ..infra.persistence.keys import RedisKeys
+from ..infra.persistence.redis import get_redis_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Simple Redis counters for operational metrics
-COUNTER_PREFIX = "nowhere:counter:"
-
-
-async def incr_counter(redis: Redis, name: str) -> None:
-    """Increment an operational counter."""
-    try:
-        await redis.incr(f"{COUNTER_PREFIX}{name}")
-    except Exception:
-        pass
-
 
 @router.get("/metrics")
-async def get_metrics(request: Request, redis: Redis = Depends(get_redis_client)):
+async def get_metrics(request: Request, redis: Annotated[Redis, Depends(get_redis_client)]):
+    """
+    Prometheus text exposition: request / Redis / event handler latency
+    histograms from in-process aggregates, plus two keyspace gauges read
+    from Redis at scrape time.
+    """
     # Restrict to localhost / internal requests only
     client_host = request.client.host if request.client else None
     if client_host not in ("127.0.0.1", "::1", "localhost"):
-        from fastapi import HTTPException
         raise HTTPException(status_code=403, detail="Forbidden")
-    """Lightweight operational metrics endpoint."""
-    pipe = redis.pipeline()
-    counters = [
-        "intents_created",
-        "intents_joined",
-        "messages_posted",
-        "intents_flagged",
-    ]
-    for name in counters:
-        pipe.get(f"{COUNTER_PREFIX}{name}")
-
-    # Also get event stream length and geo index size
-    pipe.xlen(STREAM_KEY)
-    pipe.zcard("intents:geo")
-
-    results = await pipe.execute()
-
-    metrics = {}
-    for name, val in zip(counters, results[: len(counters)]):
-        metrics[name] = int(val) if val else 0
-
-    metrics["event_stream_length"] = results[len(counters)]
-    metrics["active_intents_geo"] = results[len(counters) + 1]
-
-    return metrics
+
+    extra = []
+    try:
+        pipe = redis.pipeline()
+        pipe.xlen(STREAM_KEY)
+        pipe.zcard(RedisKeys.intent_geo())
+        pipe.zcard(RedisKeys.intent_geo_unverified())
+        stream_length, verified, unverified = await pipe.execute()
+        extra = [
+            GaugeMetricFamily("nowhere_event_stream_length", "Entries in the domain event stream", value=stream_length),
+            GaugeMetricFamily("nowhere_active_intents_geo", "Members of both intent geo tiers", value=verified + unverified),
+        ]
+    except RedisError as e:
+        # Latency metrics are most useful exactly when Redis is struggling
+        logger.warning("Metrics scrape could not read Redis gauges: %s", e)
+
+    content, media_type = render_metrics(extra)
+    return Response(content=content, media_type=media_type)
@@ -0,0 +1,159 @@
+import json
+import logging
+import random
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..auth.middleware import auth_cookie, resolve_identity
+from ..core.logging import access_logger, request_id_var
+from ..core.metrics import HTTP_REQUEST_SECONDS, route_label
+from ..infra.persistence import tracing
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1_048_576  # 1MB
+
+# Encoded once at import; appended verbatim to every HTTP response.
+SECURITY_HEADERS: list[tuple[bytes, bytes]] = [
+    (
+        b"content-security-policy",
+        (
+            b"default-src 'self'; "
+            b"script-src 'self'; "
+            b"style-src 'self' 'unsafe-inline'; "
+            b"img-src 'self' data:; "
+            b"connect-src 'self' wss: ws:; "
+            b"frame-ancestors 'none'; "
+            b"base-uri 'self'; "
+            b"form-action 'self'"
+        ),
+    ),
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"permissions-policy", b"geolocation=(self), camera=(), microphone=()"),
+]
+HSTS_HEADER = (b"strict-transport-security", b"max-age=63072000; includeSubDomains; preload")
+
+
+class RequestMiddleware:
+    """
+    Single pure-ASGI pass over every HTTP request:
+    request ID + access logging, latency histogram, body size limit,
+    JWT identity and security headers. Replaces a chain of BaseHTTPMiddleware layers, each of
+    which spawned its own task and body stream per request.
+    WebSocket and lifespan scopes pass straight through.
+
+    Access lines are sampled: errors (>= 400) and requests slower than
+    `slow_request_ms` are always logged, the rest at `access_log_sample_rate`.
+    With `redis_trace_sample_rate` set (Redis tracing enabled), each request
+    collects its Redis commands and slow or sampled requests log a summary.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_size: int = MAX_BODY_SIZE,
+        hsts: bool = True,
+        access_log_sample_rate: float = 1.0,
+        slow_request_ms: float = 500.0,
+        redis_trace_sample_rate: float | None = None,
+    ):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.security_headers = SECURITY_HEADERS + ([HSTS_HEADER] if hsts else [])
+        self.access_log_sample_rate = access_log_sample_rate
+        self.slow_request_ms = slow_request_ms
+        self.redis_trace_sample_rate = redis_trace_sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = authorization = content_length = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+            elif name == b"authorization":
+                authorization = value.decode("latin-1")
+            elif name == b"content-length":
+                content_length = value
+
+        if not request_id:
+            request_id = str(uuid.uuid4())
+        token = request_id_var.set(request_id)
+        method, path = scope["method"], scope["path"]
+        extra_headers = self.security_headers + [(b"x-request-id", request_id.encode("latin-1"))]
+
+        trace_token = tracing.begin_request_trace() if self.redis_trace_sample_rate is not None else None
+        start = time.perf_counter()
+        try:
+            if content_length is not None:
+                try:
+                    too_large = int(content_length) > self.max_body_size
+                except ValueError:
+                    await _send_error(send, 400, "Invalid Content-Length", extra_headers)
+                    return
+                if too_large:
+                    await _send_error(send, 413, "Request body too large", extra_headers)
+                    return
+
+            user_id, user_uuid, is_authenticated = resolve_identity(authorization)
+            state = scope.setdefault("state", {})
+            state["user_id"] = user_id
+            state["user_uuid"] = user_uuid
+            state["is_authenticated"] = is_authenticated
+            if is_authenticated:
+                extra_headers = extra_headers + [(b"set-cookie", auth_cookie(user_id))]
+
+            status_code = 500
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    message["headers"] = [*message.get("headers", ()), *extra_headers]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                logger.error("%s %s failed: %s", method, path, e)
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                HTTP_REQUEST_SECONDS.labels(method, route_label(scope), status_code).observe(duration)
+
+            duration_ms = duration * 1000
+            if (
+                status_code >= 400
+                or duration_ms >= self.slow_request_ms
+                or random.random() < self.access_log_sample_rate
+            ):
+                access_logger.info("%s %s -> %d in %.1fms", method, path, status_code, duration_ms)
+            if trace_token is not None and (
+                duration_ms >= self.slow_request_ms or random.random() < self.redis_trace_sample_rate
+            ):
+                tracing.log_request_trace(method, path, tracing.end_request_trace(trace_token))
+                trace_token = None
+        finally:
+            if trace_token is not None:
+                tracing.end_request_trace(trace_token)
+            request_id_var.reset(token)
+
+
+async def _send_error(send: Send, status_code: int, detail: str, headers: list) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,244 @@
+"""
+Live nearby feed: pushes add/update/remove diffs to /ws/nearby subscribers.
+
+Each subscriber registers one viewport (lat, lon, radius). Viewports live in
+a SpatialIndex, so an intent change is matched to the sockets whose circle
+contains it with one grid-cell lookup rather than a scan over all sockets.
+
+Changes arrive through the `nowhere:events` stream (every worker appends to
+it), so a join on one worker reaches subscribers on all of them. Events
+carry no coordinates by design; the intent is read back once per event and
+the resulting diff is encoded once per kind. Expiry has no event: every
+WS_ROOM_CHECK_SECONDS the intents currently shown to someone are checked
+in one EXISTS pipeline, and vanished ones are removed.
+"""
+import asyncio
+import json
+import logging
+from uuid import UUID
+
+from fastapi import WebSocket
+from redis.asyncio import Redis
+
+from ..core.models.geo import SpatialIndex, haversine_km
+from ..core.models.intent import MAX_VISIBLE_FLAGS, Intent
+from ..infra.persistence.event_store import STREAM_KEY
+from ..infra.persistence.keys import RedisKeys
+from .schemas import CompactIntent
+
+logger = logging.getLogger(__name__)
+
+# Event types that can change what a viewport shows
+_FEED_EVENTS = {"IntentCreated", "IntentJoined", "IntentFlagged"}
+
+
+class _Subscription:
+    __slots__ = ("lat", "lon", "pending", "radius_km", "shown", "ws")
+
+    def __init__(self, ws: WebSocket, lat: float, lon: float, radius_km: float):
+        self.ws = ws
+        self.lat = lat
+        self.lon = lon
+        self.radius_km = radius_km
+        self.shown: dict[UUID, tuple[int, int]] = {}  # intent_id -> (join_count, online_count) last sent
+        # Changes seen while the snapshot is being queried (latest state per intent);
+        # None once the snapshot is sent and diffs go out directly
+        self.pending: dict[UUID, Intent | None] | None = {}
+
+
+def _encode(data: dict) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _compact(intent: Intent) -> dict:
+    return CompactIntent.from_intent(intent).model_dump(mode="json")
+
+
+class NearbyFeed:
+    def __init__(self, max_subscriptions: int):
+        self.max_subscriptions = max_subscriptions
+        self._index = SpatialIndex()
+        self._subs: dict[WebSocket, _Subscription] = {}
+        self._viewers: dict[UUID, set[_Subscription]] = {}  # intent_id -> subs showing it
+        self._pending: set[_Subscription] = set()  # subs waiting for their snapshot
+        self._last_event_id: str | None = None  # resolved to the stream tail on first read
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    def reserve(self, ws: WebSocket, lat: float, lon: float, radius_km: float) -> bool:
+        """
+        Register or move `ws`'s viewport before its snapshot is queried; False
+        when full. Changes consumed until `send_snapshot` are buffered, not lost.
+        """
+        if ws not in self._subs and len(self._subs) >= self.max_subscriptions:
+            return False
+        self.unsubscribe(ws)
+        sub = self._subs[ws] = _Subscription(ws, lat, lon, radius_km)
+        self._index.insert_circle(ws, lat, lon, radius_km)
+        self._pending.add(sub)
+        return True
+
+    async def send_snapshot(self, ws: WebSocket, snapshot: list[Intent]) -> None:
+        """
+        Send a reserved viewport its snapshot, then the changes buffered while
+        it was queried, as diffs against it (a change the snapshot already
+        reflects sends nothing).
+        """
+        sub = self._subs.get(ws)
+        if sub is None or sub.pending is None:
+            return
+        for intent in snapshot:
+            self._show(sub, intent)
+        await ws.send_text(_encode({"type": "snapshot", "intents": [_compact(i) for i in snapshot]}))
+        # Changes arriving during these sends join the buffer, so replay until it is empty
+        while sub.pending and self._subs.get(ws) is sub:
+            intent_id = next(iter(sub.pending))
+            intent = sub.pending.pop(intent_id)
+            kind = self._change(sub, intent_id, intent)
+            if kind is not None:
+                await self._apply(intent_id, intent, {kind: [sub]})
+        sub.pending = None
+        self._pending.discard(sub)
+
+    async def subscribe(
+        self, ws: WebSocket, lat: float, lon: float, radius_km: float, snapshot: list[Intent]
+    ) -> bool:
+        """Register or move `ws`'s viewport and send it `snapshot`; False when full."""
+        if not self.reserve(ws, lat, lon, radius_km):
+            return False
+        await self.send_snapshot(ws, snapshot)
+        return True
+
+    def unsubscribe(self, ws: WebSocket) -> None:
+        sub = self._subs.pop(ws, None)
+        if sub is None:
+            return
+        self._pending.discard(sub)
+        self._index.remove(ws)
+        for intent_id in sub.shown:
+            self._hide_viewer(intent_id, sub)
+
+    def _show(self, sub: _Subscription, intent: Intent) -> None:
+        sub.shown[intent.id] = (intent.join_count, intent.online_count)
+        self._viewers.setdefault(intent.id, set()).add(sub)
+
+    def _hide_viewer(self, intent_id: UUID, sub: _Subscription) -> None:
+        viewers = self._viewers.get(intent_id)
+        if viewers is not None:
+            viewers.discard(sub)
+            if not viewers:
+                del self._viewers[intent_id]
+
+    def _visible_to(self, sub: _Subscription, intent: Intent) -> bool:
+        if intent.flags >= MAX_VISIBLE_FLAGS:
+            return False
+        dist = haversine_km(sub.lat, sub.lon, intent.latitude, intent.longitude)
+        return dist <= sub.radius_km and intent.is_visible(dist)
+
+    def _change(self, sub: _Subscription, intent_id: UUID, intent: Intent | None) -> str | None:
+        """The diff `sub` needs for the intent's new state: add, update, remove or None."""
+        shown = sub.shown.get(intent_id)
+        if intent is None or not self._visible_to(sub, intent):
+            return "remove" if shown is not None else None
+        if shown is None:
+            return "add"
+        return "update" if shown != (intent.join_count, intent.online_count) else None
+
+    async def on_intent_changed(self, intent_id: UUID, intent: Intent | None) -> int:
+        """
+        Push the diff for one changed intent (None = gone) to every affected
+        subscriber; subscribers still waiting for their snapshot buffer it.
+        Returns the number of messages sent.
+        """
+        if intent is None:
+            affected = list(self._viewers.get(intent_id, ()))
+            # Not shown to pending subs yet, but their snapshot may include it
+            for sub in self._pending:
+                sub.pending[intent_id] = None
+        else:
+            affected = [self._subs[ws] for ws in self._index.query(intent.latitude, intent.longitude)]
+
+        changes: dict[str, list[_Subscription]] = {}
+        for sub in affected:
+            if sub.pending is not None:
+                sub.pending[intent_id] = intent
+                continue
+            kind = self._change(sub, intent_id, intent)
+            if kind is not None:
+                changes.setdefault(kind, []).append(sub)
+        return await self._apply(intent_id, intent, changes)
+
+    async def _apply(self, intent_id: UUID, intent: Intent | None, changes: dict[str, list[_Subscription]]) -> int:
+        for sub in changes.get("add", []) + changes.get("update", []):
+            self._show(sub, intent)
+        for sub in changes.get("remove", ()):
+            sub.shown.pop(intent_id, None)
+            self._hide_viewer(intent_id, sub)
+
+        sent = 0
+        for kind in ("add", "update", "remove"):
+            subs = changes.get(kind)
+            if not subs:
+                continue
+            payload = {"type": kind, "id": str(intent_id)} if kind == "remove" else {"type": kind, "intent": _compact(intent)}
+            sent += await self._send(subs, _encode(payload))
+        return sent
+
+    async def _send(self, subs: list[_Subscription], text: str) -> int:
+        sent = 0
+        for sub in subs:
+            try:
+                await sub.ws.send_text(text)
+                sent += 1
+            except Exception:  # noqa: BLE001 - a failed send means the socket is gone
+                self.unsubscribe(sub.ws)
+        return sent
+
+    async def consume(self, reader: Redis, intent_repo) -> int:
+        """Apply feed-relevant events appended since the last call; returns how many."""
+        if self._last_event_id is None:
+            latest = await reader.xrevrange(STREAM_KEY, count=1)
+            self._last_event_id = latest[0][0] if latest else "0-0"
+        response = await reader.xread({STREAM_KEY: self._last_event_id}, count=500)
+        handled = 0
+        for _, entries in response or ():
+            for entry_id, fields in entries:
+                self._last_event_id = entry_id
+                if fields.get("event_type") not in _FEED_EVENTS or not self._subs:
+                    continue
+                intent_id = UUID(json.loads(fields["data"])["intent_id"])
+                await self.on_intent_changed(intent_id, await intent_repo.get_intent(str(intent_id)))
+                handled += 1
+        return handled
+
+    async def check_expired(self, reader: Redis) -> int:
+        """Remove intents shown to someone that no longer exist; returns how many."""
+        intent_ids = list(self._viewers)
+        if not intent_ids:
+            return 0
+        pipe = reader.pipeline(transaction=False)
+        for intent_id in intent_ids:
+            pipe.exists(RedisKeys.intent(intent_id))
+        exists = await pipe.execute()
+        gone = [intent_id for intent_id, found in zip(intent_ids, exists, strict=True) if not found]
+        for intent_id in gone:
+            await self.on_intent_changed(intent_id, None)
+        return len(gone)
+
+    async def run(self, reader: Redis, intent_repo, check_interval: float, poll_interval: float = 0.25) -> None:
+        """
+        Tail the event stream forever; cancel to stop. Reads are polled
+        rather than blocking, so the loop never pins a reader-pool connection.
+        """
+        loop = asyncio.get_running_loop()
+        next_check = loop.time() + check_interval
+        while True:
+            await asyncio.sleep(poll_interval)
+            try:
+                await self.consume(reader, intent_repo)
+                if loop.time() >= next_check:
+                    next_check = loop.time() + check_interval
+                    await self.check_expired(reader)
+            except Exception as e:  # noqa: BLE001 - the loop must outlive any one failed pass
+                logger.warning("Nearby feed loop failed: %s", e)
@@ -1,9 +1,9 @@
-from typing import List, Optional
-from pydantic import BaseModel
-from ..core.models.intent import Intent
-
-from pydantic import field_validator
 import html
+from uuid import UUID
+
+from pydantic import BaseModel, field_validator
+
+from ..core.models.intent import Intent
 
 
 class CreateIntentRequest(BaseModel):
@@ -37,9 +37,36 @@ class CreateIntentRequest(BaseModel):
         return v
 
 class NearbyResponse(BaseModel):
-    intents: List[Intent]
+    intents: list[Intent]
+    count: int
+    message: str | None = None
+
+class CompactIntent(BaseModel):
+    """Just the fields the nearby list renders — smaller payloads for mobile."""
+    id: UUID
+    emoji: str
+    title: str
+    latitude: float
+    longitude: float
+    join_count: int
+    online_count: int
+
+    @classmethod
+    def from_intent(cls, intent: Intent) -> "CompactIntent":
+        return cls.model_construct(
+            id=intent.id,
+            emoji=intent.emoji,
+            title=intent.title,
+            latitude=intent.latitude,
+            longitude=intent.longitude,
+            join_count=intent.join_count,
+            online_count=intent.online_count,
+        )
+
+class CompactNearbyResponse(BaseModel):
+    intents: list[CompactIntent]
     count: int
-    message: Optional[str] = None
+    message: str | None = None
 
 class ClusterItem(BaseModel):
     geohash: str
@@ -48,4 +75,4 @@ class ClusterItem(BaseModel):
     count: int
 
 class ClusterResponse(BaseModel):
-    clusters: List[ClusterItem]
+    clusters: list[ClusterItem]
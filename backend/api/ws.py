@@ -1,61 +1,220 @@
 import asyncio
 import json
 import logging
+import sys
+import time
 from uuid import UUID
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from ..auth.jwt import decode_access_token
-from ..infra.persistence.redis import get_redis_client
+from pydantic import BaseModel, Field, ValidationError
+
+from ..auth.jwt import verify_access_token
+from ..config import settings
+from ..core.metrics import WS_CONNECTIONS
+from ..core.models.geo import round_coord
+from .heartbeat import Heartbeat
+from .nearby_feed import NearbyFeed
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-MAX_CONNECTIONS_PER_ROOM = 100
-MAX_TOTAL_CONNECTIONS = 10000
+class _Room:
+    """A room's members. The 16-byte key is held once, here; connections point at the room."""
+
+    __slots__ = ("key", "members")
+
+    def __init__(self, key: bytes):
+        self.key = key
+        self.members: dict[WebSocket, _Connection] = {}
+
+
+class _Connection:
+    """Per-socket record. Slotted: a worker holds tens of thousands of these."""
+
+    __slots__ = ("last_seen", "room", "user_id", "ws")
+
+    def __init__(self, ws: WebSocket, room: _Room, user_id: bytes | None):
+        self.ws = ws
+        self.room = room
+        self.user_id = user_id
+        self.last_seen = time.monotonic()  # stamped on every client frame (manager.touch)
+
+
+def _room_key(intent_id: str | UUID) -> bytes:
+    return (intent_id if isinstance(intent_id, UUID) else UUID(intent_id)).bytes
+
+
+# /ws/nearby sockets share the limits and heartbeat but belong to no intent
+_FEED_KEY = bytes(16)
 
 
 class ConnectionManager:
     """Manages WebSocket connections per intent with limits."""
 
-    def __init__(self):
-        self._rooms: dict[str, set[WebSocket]] = {}
+    def __init__(self, max_per_room: int, max_total: int):
+        self.max_per_room = max_per_room
+        self.max_total = max_total
+        self._rooms: dict[bytes, _Room] = {}
+        self._feed = _Room(_FEED_KEY)  # kept out of _rooms: no presence, no room check
         self._total: int = 0
+        # Presence since the last heartbeat tick (see drain_presence)
+        self._seen: set[_Connection] = set()
+
+    @property
+    def total(self) -> int:
+        return self._total
 
-    def join(self, intent_id: str, ws: WebSocket) -> bool:
-        if self._total >= MAX_TOTAL_CONNECTIONS:
-            return False
-        if intent_id not in self._rooms:
-            self._rooms[intent_id] = set()
-        if len(self._rooms[intent_id]) >= MAX_CONNECTIONS_PER_ROOM:
-            return False
-        self._rooms[intent_id].add(ws)
+    def join(self, intent_id: str | UUID, ws: WebSocket, user_id: UUID | None = None) -> _Connection | None:
+        """Register `ws`; returns its record, or None when a limit is hit."""
+        if self._total >= self.max_total:
+            return None
+        key = _room_key(intent_id)
+        room = self._rooms.get(key)
+        if room is None:
+            room = self._rooms[key] = _Room(key)
+        elif len(room.members) >= self.max_per_room:
+            return None
+        conn = room.members[ws] = _Connection(ws, room, user_id.bytes if user_id else None)
         self._total += 1
-        return True
-
-    def leave(self, intent_id: str, ws: WebSocket):
-        room = self._rooms.get(intent_id)
-        if room and ws in room:
-            room.discard(ws)
-            self._total -= 1
-            if not room:
-                del self._rooms[intent_id]
-
-    async def broadcast(self, intent_id: str, data: dict, exclude: WebSocket | None = None):
-        room = self._rooms.get(intent_id, set())
+        WS_CONNECTIONS.inc()
+        self._seen.add(conn)
+        return conn
+
+    def join_feed(self, ws: WebSocket) -> _Connection | None:
+        """Register a /ws/nearby socket; None when the worker is full."""
+        if self._total >= self.max_total:
+            return None
+        conn = self._feed.members[ws] = _Connection(ws, self._feed, None)
+        self._total += 1
+        WS_CONNECTIONS.inc()
+        return conn
+
+    def leave_feed(self, ws: WebSocket) -> None:
+        self._discard(self._feed, ws)
+
+    @property
+    def feed_size(self) -> int:
+        return len(self._feed.members)
+
+    def touch(self, conn: _Connection) -> None:
+        """Client frame received: refresh idle deadline and presence."""
+        conn.last_seen = time.monotonic()
+        if conn.user_id:
+            self._seen.add(conn)
+
+    def leave(self, intent_id: str | UUID, ws: WebSocket):
+        room = self._rooms.get(_room_key(intent_id))
+        if room is not None:
+            self._discard(room, ws)
+
+    def _discard(self, room: _Room, ws: WebSocket) -> None:
+        conn = room.members.pop(ws, None)
+        if conn is None:
+            return
+        self._total -= 1
+        WS_CONNECTIONS.dec()
+        if not room.members and self._rooms.get(room.key) is room:
+            del self._rooms[room.key]
+
+    def drain_presence(self) -> dict[UUID, set[str]]:
+        """Users seen per room since the last call, for one batched presence write."""
+        seen: dict[UUID, set[str]] = {}
+        for conn in self._seen:
+            if conn.user_id and self.is_connected(conn):
+                seen.setdefault(UUID(bytes=conn.room.key), set()).add(str(UUID(bytes=conn.user_id)))
+        self._seen = set()
+        return seen
+
+    def is_connected(self, conn: _Connection) -> bool:
+        return conn.room.members.get(conn.ws) is conn
+
+    def room_ids(self) -> list[UUID]:
+        return [UUID(bytes=key) for key in self._rooms]
+
+    def room_size(self, intent_id: str | UUID) -> int:
+        room = self._rooms.get(_room_key(intent_id))
+        return len(room.members) if room else 0
+
+    def members(self, intent_id: str | UUID) -> list[WebSocket]:
+        room = self._rooms.get(_room_key(intent_id))
+        return list(room.members) if room else []
+
+    async def broadcast(self, intent_id: str | UUID, data: dict, exclude: WebSocket | None = None):
+        room = self._rooms.get(_room_key(intent_id))
+        if room is None:
+            return
+        # Encode once for the whole room (same bytes as Starlette's send_json)
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
         dead = []
-        for ws in room:
+        for ws in list(room.members):
             if ws is exclude:
                 continue
             try:
-                await ws.send_json(data)
-            except Exception:
+                await ws.send_text(text)
+            except Exception:  # noqa: BLE001 - a failed send means the socket is gone
                 dead.append(ws)
         for ws in dead:
-            room.discard(ws)
-            self._total -= 1
+            self._discard(room, ws)
 
+    async def evict(self, conns: list[_Connection], code: int, reason: str = "") -> None:
+        """Unregister a batch of connections, then close their sockets concurrently."""
+        for conn in conns:
+            self._discard(conn.room, conn.ws)
+        await _close([conn.ws for conn in conns], code, reason)
 
-manager = ConnectionManager()
+    async def close_room(self, intent_id: str | UUID, code: int, reason: str = "") -> None:
+        room = self._rooms.get(_room_key(intent_id))
+        if room is not None:
+            await self.evict(list(room.members.values()), code, reason)
+
+    async def close_all(self, code: int = 1001, reason: str = "") -> None:
+        rooms, self._rooms = self._rooms, {}
+        rooms[_FEED_KEY], self._feed = self._feed, _Room(_FEED_KEY)
+        WS_CONNECTIONS.dec(self._total)
+        self._total = 0
+        # Presence entries age out of the window on their own
+        self._seen = set()
+        await _close([ws for room in rooms.values() for ws in room.members], code, reason)
+
+    def memory_usage(self) -> dict:
+        """
+        Approximate bytes held by the manager itself (rooms, keys, member
+        dicts, connection records) — not the sockets, which belong to the
+        ASGI server. See benchmarks/ws_soak.py for whole-process numbers.
+        """
+        size = sys.getsizeof(self._rooms)
+        for room in (*self._rooms.values(), self._feed):
+            size += sys.getsizeof(room) + sys.getsizeof(room.key) + sys.getsizeof(room.members)
+            for conn in room.members.values():
+                size += sys.getsizeof(conn) + (sys.getsizeof(conn.user_id) if conn.user_id else 0)
+        return {
+            "connections": self._total,
+            "rooms": len(self._rooms),
+            "feed": len(self._feed.members),
+            "bytes": size,
+            "bytes_per_connection": round(size / self._total, 1) if self._total else 0.0,
+        }
+
+
+async def _close(sockets: list[WebSocket], code: int, reason: str) -> None:
+    async def close(ws: WebSocket) -> None:
+        try:
+            await ws.close(code=code, reason=reason)
+        except Exception:  # noqa: BLE001, S110 - already gone; servers differ in what they raise
+            pass
+
+    await asyncio.gather(*(close(ws) for ws in sockets))
+
+
+manager = ConnectionManager(settings.WS_MAX_CONNECTIONS_PER_ROOM, settings.WS_MAX_TOTAL_CONNECTIONS)
+nearby_feed = NearbyFeed(settings.WS_MAX_NEARBY_SUBSCRIPTIONS)
+heartbeat = Heartbeat(
+    manager,
+    idle_timeout=settings.WS_IDLE_TIMEOUT_SECONDS,
+    tick=settings.WS_HEARTBEAT_TICK_SECONDS,
+    room_check_interval=settings.WS_ROOM_CHECK_SECONDS,
+)
 
 
 @router.websocket("/ws/intents/{intent_id}/messages")
@@ -73,32 +232,130 @@ async def intent_messages_ws(websocket: WebSocket, intent_id: str):
         await websocket.close(code=4001, reason="Missing token")
         return
 
-    payload = decode_access_token(token)
-    if not payload or "sub" not in payload:
+    verified = verify_access_token(token)
+    if verified is None:
         await websocket.close(code=4001, reason="Invalid token")
         return
 
+    container = getattr(websocket.app.state, "container", None)
+    if container is None:
+        await websocket.close(code=1013, reason="Service unavailable")
+        return
+
+    # Sockets count towards presence (online_count feeds ranking): members only,
+    # checked on the primary so a fresh join isn't refused by replica lag
+    if not await container.join_repo.is_member(UUID(intent_id), verified[1], primary=True):
+        await websocket.close(code=4003, reason="Must join intent")
+        return
+
     await websocket.accept()
 
-    if not manager.join(intent_id, websocket):
+    conn = manager.join(intent_id, websocket, user_id=verified[1])
+    if conn is None:
         await websocket.send_json({"type": "error", "message": "Room is full"})
         await websocket.close(code=4003, reason="Connection limit reached")
         return
 
-    logger.info("WS connected to intent %s", intent_id)
+    # Idle eviction is the shared heartbeat's job (client should ping every 30s)
+    heartbeat.track(conn)
+    logger.debug("WS connected to intent %s", intent_id)
 
     try:
         while True:
-            # 60s timeout — evict abandoned connections (client should ping every 30s)
-            data = await asyncio.wait_for(websocket.receive_text(), timeout=60)
+            data = await websocket.receive_text()
+            manager.touch(conn)
             if data == "ping":
                 await websocket.send_text("pong")
-    except (WebSocketDisconnect, asyncio.TimeoutError):
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the heartbeat closed the socket under us
         pass
     finally:
         manager.leave(intent_id, websocket)
-        logger.info("WS disconnected from intent %s", intent_id)
+        logger.debug("WS disconnected from intent %s", intent_id)
+
+
+class NearbySubscribe(BaseModel):
+    type: str = Field(pattern="^subscribe$")
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    # Same bounds as GET /intents/nearby
+    radius: float = Field(default=1.0, ge=0.1, le=50)
+    limit: int = Field(default=50, ge=1, le=100)
+
+
+@router.websocket("/ws/nearby")
+async def nearby_ws(websocket: WebSocket):
+    """
+    Live nearby feed. Send {"type": "subscribe", "lat", "lon", "radius"} (again
+    to move the viewport); receive a "snapshot", then "add" / "update" /
+    "remove" diffs as intents in the viewport are created, joined, flagged
+    or expire.
+    """
+    token = websocket.query_params.get("token")
+    if not token or verify_access_token(token) is None:
+        await websocket.close(code=4001, reason="Invalid token")
+        return
+
+    container = getattr(websocket.app.state, "container", None)
+    if container is None:
+        await websocket.close(code=1013, reason="Service unavailable")
+        return
+
+    await websocket.accept()
+
+    conn = manager.join_feed(websocket)
+    if conn is None:
+        await websocket.send_json({"type": "error", "message": "Server is full"})
+        await websocket.close(code=4003, reason="Connection limit reached")
+        return
+    heartbeat.track(conn)
+
+    circle: tuple[float, float, float] | None = None
+    next_snapshot = 0.0
+    try:
+        while True:
+            data = await websocket.receive_text()
+            manager.touch(conn)
+            if data == "ping":
+                await websocket.send_text("pong")
+                continue
+            try:
+                sub = NearbySubscribe.model_validate_json(data)
+            except ValidationError:
+                await websocket.send_json({"type": "error", "message": "Invalid subscription"})
+                continue
+            # Snapshots cost a full nearby query: skip unchanged circles, throttle moves
+            moved = (round_coord(sub.lat), round_coord(sub.lon), sub.radius)
+            if moved == circle:
+                continue
+            if time.monotonic() < next_snapshot:
+                await websocket.send_json({"type": "error", "message": "Resubscribing too fast"})
+                continue
+            next_snapshot = time.monotonic() + settings.WS_NEARBY_RESUBSCRIBE_SECONDS
+            # Register before querying: changes consumed meanwhile are buffered and
+            # replayed after the snapshot instead of being missed
+            if not nearby_feed.reserve(websocket, sub.lat, sub.lon, sub.radius):
+                await websocket.send_json({"type": "error", "message": "Feed is full"})
+                await websocket.close(code=4003, reason="Connection limit reached")
+                return
+            snapshot = await container.query_service.get_nearby(sub.lat, sub.lon, sub.radius, sub.limit)
+            await nearby_feed.send_snapshot(websocket, snapshot)
+            circle = moved
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the heartbeat closed the socket under us
+        pass
+    finally:
+        nearby_feed.unsubscribe(websocket)
+        manager.leave_feed(websocket)
 
 
 def get_ws_manager() -> ConnectionManager:
     return manager
+
+
+def get_ws_heartbeat() -> Heartbeat:
+    return heartbeat
+
+
+def get_nearby_feed() -> NearbyFeed:
+    return nearby_feed
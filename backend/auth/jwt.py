@@ -1,10 +1,19 @@
-import jwt
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from uuid import UUID
+
+import jwt
+
 from ..config import settings
+from ..core.metrics import JWT_CACHE_LOOKUPS, JWT_CACHE_SIZE
+
+_CACHE_HITS = JWT_CACHE_LOOKUPS.labels("hit")
+_CACHE_MISSES = JWT_CACHE_LOOKUPS.labels("miss")
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=7))
     to_encode.update({
@@ -16,7 +25,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
-def decode_access_token(token: str) -> Optional[dict]:
+def decode_access_token(token: str) -> dict | None:
     try:
         return jwt.decode(
             token,
@@ -27,3 +36,84 @@ def decode_access_token(token: str) -> Optional[dict]:
         )
     except jwt.PyJWTError:
         return None
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified tokens: digest -> (user_id, user UUID, exp).
+    Keys are digests so raw bearer tokens are never retained. Only successful
+    verifications are cached — garbage tokens cannot evict real entries.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[str, UUID, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes, now: float) -> tuple[str, UUID] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            _CACHE_MISSES.inc()
+            return None
+        if entry[2] <= now:
+            # Expired since it was cached — force a full (failing) verification
+            del self._entries[key]
+            JWT_CACHE_SIZE.set(len(self._entries))
+            self.misses += 1
+            _CACHE_MISSES.inc()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        _CACHE_HITS.inc()
+        return entry[0], entry[1]
+
+    def put(self, key: bytes, user_id: str, user_uuid: UUID, exp: float) -> None:
+        self._entries[key] = (user_id, user_uuid, exp)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        JWT_CACHE_SIZE.set(len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        JWT_CACHE_SIZE.set(0)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = VerifiedTokenCache(maxsize=settings.JWT_CACHE_SIZE)
+
+
+def verify_access_token(token: str) -> tuple[str, UUID] | None:
+    """
+    Verify a token and return (canonical user_id, UUID) for its subject, or
+    None if the token is invalid, expired, or its subject is not a UUID.
+    Repeat tokens are answered from `token_cache` until they expire.
+    """
+    key = token_cache.digest(token)
+    now = time.time()
+    cached = token_cache.get(key, now)
+    if cached is not None:
+        return cached
+
+    payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        return None
+    try:
+        user_uuid = UUID(payload["sub"])
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+    user_id = str(user_uuid)
+    if "exp" in payload:
+        token_cache.put(key, user_id, user_uuid, float(payload["exp"]))
+    return user_id, user_uuid
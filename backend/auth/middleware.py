@@ -1,53 +1,36 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-import uuid
-from .jwt import decode_access_token
 import logging
+import uuid
+
+from .jwt import verify_access_token
 
 logger = logging.getLogger(__name__)
 
+# 7 days — matches JWT expiry
+AUTH_COOKIE_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def resolve_identity(authorization: str | None) -> tuple[str, uuid.UUID, bool]:
+    """
+    Resolve the caller's user id from an Authorization header value.
+    Returns (user_id, user_uuid, is_authenticated).
+
+    Only cryptographically signed JWTs are trusted for identity. Without a
+    valid one, a temporary anonymous identity is generated; it is ephemeral
+    and per-request — not trusted for ownership.
+    """
+    if authorization and authorization.startswith("Bearer "):
+        token = authorization.split(" ")[1]
+        verified = verify_access_token(token)
+        if verified is not None:
+            return verified[0], verified[1], True
+
+    user_uuid = uuid.uuid4()
+    return str(user_uuid), user_uuid, False
+
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        user_id = None
-
-        # Only trust cryptographically signed JWTs for identity
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            payload = decode_access_token(token)
-            if payload and "sub" in payload:
-                user_id = payload["sub"]
-
-        # If no valid JWT, generate a temporary anonymous identity.
-        # This identity is ephemeral and per-request — not trusted for ownership.
-        if not user_id:
-            user_id = str(uuid.uuid4())
-            request.state.is_authenticated = False
-        else:
-            request.state.is_authenticated = True
-
-        # Validate UUID format
-        try:
-            uuid_obj = uuid.UUID(user_id)
-            user_id = str(uuid_obj)
-        except ValueError:
-            user_id = str(uuid.uuid4())
-            request.state.is_authenticated = False
-
-        request.state.user_id = user_id
-
-        response = await call_next(request)
-
-        # Set httponly cookie only for authenticated users on web
-        if request.state.is_authenticated:
-            response.set_cookie(
-                key="user_id",
-                value=user_id,
-                max_age=7 * 24 * 60 * 60,  # 7 days (matches JWT expiry)
-                httponly=True,
-                secure=True,
-                samesite="lax",
-            )
-
-        return response
+def auth_cookie(user_id: str) -> bytes:
+    """Set-Cookie value for authenticated web clients (httponly, secure)."""
+    return (
+        f"user_id={user_id}; HttpOnly; Max-Age={AUTH_COOKIE_MAX_AGE}; "
+        f"Path=/; SameSite=lax; Secure"
+    ).encode("latin-1")
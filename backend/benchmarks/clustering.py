@@ -0,0 +1,111 @@
+"""
+Viewport clustering at 10k-100k points: coordinate rounding vs grid vs greedy.
+
+"rounding" is the old ClusteringService.cluster, which rounded lat/lon to
+a zoom-dependent number of decimals. "grid" is the latitude-corrected
+grid, with NumPy when installed ("grid/python" forces the pure-Python
+binning), and "greedy" the supercluster-style merge. Points are
+`(member, lon, lat)` tuples as `get_geo_points` returns them: hotspots
+plus uniform noise over a --radius km viewport at --lat. Also reports
+the share of hotspots kept whole rather than split at a cell edge.
+
+    python -m backend.benchmarks.clustering [--points 10000,100000] [--zooms 10,14] [--lat 40.7] [--radius 10]
+"""
+import argparse
+import random
+import time
+from math import cos, radians
+
+from ..core.models.geo import KM_PER_DEG_LAT, haversine_km
+from ..services import clustering_service
+from ..services.clustering_service import ClusteringService
+
+HOTSPOT_KM = 0.03
+
+
+def rounding_cluster(points: list[tuple[str, float, float]], radius_km: float, zoom: int | None = None) -> list[dict]:
+    precision = ClusteringService._precision_for_zoom(zoom, radius_km)
+    clusters: dict[tuple[float, float], list] = {}
+    for _member, lon, lat in points:
+        key = (round(lat, precision), round(lon, precision))
+        cluster = clusters.setdefault(key, [0, 0.0, 0.0])
+        cluster[0] += 1
+        cluster[1] += lat
+        cluster[2] += lon
+    return [{"latitude": s_lat / n, "longitude": s_lon / n, "count": n} for n, s_lat, s_lon in clusters.values()]
+
+
+def grid_python(points: list[tuple[str, float, float]], radius_km: float, zoom: int | None = None) -> list[dict]:
+    numpy, clustering_service.np = clustering_service.np, None
+    try:
+        return ClusteringService.cluster(points, radius_km, zoom)
+    finally:
+        clustering_service.np = numpy
+
+
+METHODS = {
+    "rounding": rounding_cluster,
+    "grid": ClusteringService.cluster,
+    "grid/python": grid_python,
+    "greedy": lambda points, radius_km, zoom: ClusteringService.cluster(points, radius_km, zoom, method="greedy"),
+}
+
+
+def make_points(count: int, lat: float, lon: float, radius_km: float, rng: random.Random):
+    """Half the points in tight hotspots (HOTSPOT_KM wide), half uniform; returns (points, hotspot centres)."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    dlon = dlat / cos(radians(lat))
+    hotspots = [(lat + rng.uniform(-dlat, dlat), lon + rng.uniform(-dlon, dlon)) for _ in range(50)]
+    spread = HOTSPOT_KM / KM_PER_DEG_LAT
+    points = []
+    for i in range(count):
+        if i % 2:
+            h_lat, h_lon = hotspots[i // 2 % len(hotspots)]
+            p_lat, p_lon = h_lat + rng.gauss(0, spread / 3), h_lon + rng.gauss(0, spread / 3) / cos(radians(h_lat))
+        else:
+            p_lat, p_lon = lat + rng.uniform(-dlat, dlat), lon + rng.uniform(-dlon, dlon)
+        points.append((str(i), p_lon, p_lat))
+    return points, hotspots
+
+
+def hotspots_whole(clusters: list[dict], hotspots: list[tuple[float, float]], size: int, cell_km: float) -> float:
+    """Share of hotspots with a single cluster nearby holding (nearly) all of their `size` points."""
+    whole = 0
+    for h_lat, h_lon in hotspots:
+        near = [c["count"] for c in clusters if haversine_km(h_lat, h_lon, c["latitude"], c["longitude"]) < cell_km]
+        whole += max(near, default=0) >= 0.95 * size
+    return whole / len(hotspots)
+
+
+def main(counts: list[int], zooms: list[int], lat: float, lon: float, radius_km: float, rounds: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"numpy: {'yes' if clustering_service.np is not None else 'no'}")
+    for count in counts:
+        points, hotspots = make_points(count, lat, lon, radius_km, rng)
+        for zoom in zooms:
+            cell_km = KM_PER_DEG_LAT * 10.0 ** -ClusteringService._precision_for_zoom(zoom, radius_km)
+            for name, cluster in METHODS.items():
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    clusters = cluster(points, radius_km, zoom)
+                ms = (time.perf_counter() - start) / rounds * 1000
+                print(
+                    f"{count:>7} pts  zoom {zoom:>2}  {name:<12} {ms:>9.2f}ms  {len(clusters):>7} clusters"
+                    f"  {hotspots_whole(clusters, hotspots, count // 2 // len(hotspots), cell_km):>4.0%} hotspots whole"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", default="10000,100000", help="comma-separated point counts")
+    parser.add_argument("--zooms", default="10,14", help="comma-separated map zoom levels")
+    parser.add_argument("--lat", type=float, default=40.7)
+    parser.add_argument("--lon", type=float, default=-74.0)
+    parser.add_argument("--radius", type=float, default=10.0, help="viewport radius in km")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(
+        [int(n) for n in args.points.split(",")], [int(z) for z in args.zooms.split(",")],
+        args.lat, args.lon, args.radius, args.rounds, args.seed,
+    )
@@ -0,0 +1,179 @@
+"""
+Per-request dependency resolution cost, per endpoint shape.
+
+"legacy" rebuilds the old api/deps.py graph: nested sync `Depends` that
+construct every repository, the spam detector, ranking service, query
+service and command handler on each request (each sync provider hops
+through the threadpool). "container" is the current api/deps.py: async
+lookups on the lifespan-built Container, with only the unit of work
+created per request. Endpoints return immediately after their
+dependencies resolve, so the numbers are pure DI overhead.
+
+    python -m backend.benchmarks.di_overhead [--requests 5000]
+"""
+# ruff: noqa: B008 - endpoint signatures mirror the app's `Depends()` defaults on purpose
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from fakeredis import FakeAsyncRedis
+from fastapi import Depends, FastAPI, Request
+
+from ..api import deps
+from ..api.container import Container
+from ..config import settings
+from ..core.clock import SystemClock
+from ..core.event_bus import InMemoryEventBus
+from ..infra.persistence.event_store import RedisEventStore
+from ..infra.persistence.intent_repo import IntentRepository
+from ..infra.persistence.join_repo import JoinRepository
+from ..infra.persistence.message_repo import MessageRepository
+from ..infra.persistence.metrics_repo import MetricsRepository
+from ..infra.persistence.unit_of_work import RedisUnitOfWork
+from ..services.intent_command_handler import IntentCommandHandler
+from ..services.intent_query_service import IntentQueryService
+from ..services.ranking_service import RankingService
+from ..spam import SpamDetector
+
+ENDPOINTS = ("nearby", "messages", "join", "create")
+
+
+def build_legacy_app(redis) -> FastAPI:
+    app = FastAPI()
+    event_bus = None
+
+    def get_redis():
+        return redis
+
+    def get_current_user_id(request: Request):
+        return request.state.user_uuid
+
+    def get_clock():
+        return SystemClock()
+
+    def get_intent_repo(r=Depends(get_redis)):
+        return IntentRepository(redis=r)
+
+    def get_join_repo(r=Depends(get_redis)):
+        return JoinRepository(redis=r)
+
+    def get_message_repo(r=Depends(get_redis)):
+        return MessageRepository(redis=r)
+
+    def get_metrics_repo(r=Depends(get_redis)):
+        return MetricsRepository()
+
+    def get_spam_detector(r=Depends(get_redis)):
+        return SpamDetector(r)
+
+    def get_event_bus(metrics_repo=Depends(get_metrics_repo), r=Depends(get_redis)):
+        nonlocal event_bus
+        if event_bus is None:
+            event_bus = InMemoryEventBus(event_store=RedisEventStore(r))
+        return event_bus
+
+    def get_unit_of_work(r=Depends(get_redis), bus=Depends(get_event_bus)):
+        return RedisUnitOfWork(redis=r, event_bus=bus)
+
+    def get_command_handler(uow=Depends(get_unit_of_work), spam=Depends(get_spam_detector)):
+        return IntentCommandHandler(uow=uow, spam_detector=spam)
+
+    def get_ranking_service():
+        return RankingService(settings)
+
+    def get_query_service(
+        intent_repo=Depends(get_intent_repo),
+        ranking=Depends(get_ranking_service),
+        message_repo=Depends(get_message_repo),
+        join_repo=Depends(get_join_repo),
+    ):
+        return IntentQueryService(intent_repo, ranking, message_repo, join_repo)
+
+    _add_endpoints(app, get_current_user_id, get_clock, get_query_service, get_command_handler)
+    return app
+
+
+def build_container_app(redis) -> FastAPI:
+    app = FastAPI()
+    app.state.container = Container(redis, redis, settings)
+    _add_endpoints(
+        app, deps.get_current_user_id, deps.get_clock,
+        deps.get_intent_query_service, deps.get_intent_command_handler,
+    )
+    return app
+
+
+def _add_endpoints(app, user_dep, clock_dep, query_dep, command_dep) -> None:
+    @app.get("/nearby")
+    async def nearby(query=Depends(query_dep)):
+        return None
+
+    @app.get("/messages")
+    async def messages(user=Depends(user_dep), query=Depends(query_dep)):
+        return None
+
+    @app.post("/join")
+    async def join(user=Depends(user_dep), handler=Depends(command_dep), clock=Depends(clock_dep)):
+        return None
+
+    @app.post("/create")
+    async def create(handler=Depends(command_dep), user=Depends(user_dep), clock=Depends(clock_dep)):
+        return None
+
+
+async def _call(app, scope: dict) -> None:
+    messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+    async def receive():
+        return next(messages, {"type": "http.disconnect"})
+
+    async def send(message):
+        pass
+
+    await app(dict(scope, state={"user_uuid": uuid4()}), receive, send)
+
+
+async def measure(app, endpoint: str, requests: int) -> float:
+    """Mean microseconds per request for one endpoint."""
+    method = "GET" if endpoint in ("nearby", "messages") else "POST"
+    path = f"/{endpoint}"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+        "app": app,
+    }
+    for _ in range(100):
+        await _call(app, scope)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await _call(app, scope)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(requests: int) -> None:
+    redis = FakeAsyncRedis(decode_responses=True)
+    legacy, container = build_legacy_app(redis), build_container_app(redis)
+    print(f"{'endpoint':<10} {'legacy':>10} {'container':>10}")
+    for endpoint in ENDPOINTS:
+        before = await measure(legacy, endpoint, requests)
+        after = await measure(container, endpoint, requests)
+        print(f"{endpoint:<10} {before:>8.1f}us {after:>8.1f}us  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,105 @@
+"""
+GDPR erasure cost: per-key round trips vs one ERASE_USER script call.
+
+"legacy" replays the old DELETE /auth/me/data handler: SMEMBERS, then a
+DEL + ZREM per owned intent, then one DEL per identity key, all awaited
+sequentially. "script" is ErasureRepository.erase_user, which also
+strips the user's joins, flags and messages from everyone else's
+intents. Each round seeds a user with `--intents` owned intents (with
+messages and joins) plus as many foreign intents they joined and
+posted in.
+
+    python -m backend.benchmarks.erasure [--intents 1000] [--rounds 5] [--redis redis://localhost:6379/0]
+"""
+import argparse
+import asyncio
+import time
+from datetime import UTC, datetime
+from uuid import uuid4
+
+from fakeredis import FakeAsyncRedis
+from redis.asyncio import Redis
+
+from ..core.models.intent import Intent
+from ..core.models.message import Message
+from ..infra.persistence.erasure_repo import RATE_LIMITED_ACTIONS, ErasureRepository
+from ..infra.persistence.intent_repo import IntentRepository
+from ..infra.persistence.join_repo import JoinRepository
+from ..infra.persistence.keys import RedisKeys
+from ..infra.persistence.message_repo import MessageRepository
+
+
+async def seed(redis: Redis, intents: int) -> str:
+    """A user owning `intents` intents and active in as many foreign ones."""
+    user_id, other_id = uuid4(), uuid4()
+    now = datetime.now(UTC)
+    intent_repo, join_repo, message_repo = IntentRepository(redis), JoinRepository(redis), MessageRepository(redis)
+    for i in range(intents):
+        lat, lon = 40.0 + i * 1e-4, -73.0
+        owned = Intent(title="owned", emoji="🧪", latitude=lat, longitude=lon, user_id=str(user_id), created_at=now)
+        foreign = Intent(title="foreign", emoji="🧪", latitude=lat, longitude=lon, user_id=str(other_id), created_at=now)
+        for intent in (owned, foreign):
+            await intent_repo.save_intent(intent)
+            await join_repo.save_join(intent.id, user_id)
+            await join_repo.save_join(intent.id, other_id)
+            await message_repo.save_message(Message(intent_id=intent.id, user_id=user_id, content="hi", created_at=now))
+            await message_repo.save_message(Message(intent_id=intent.id, user_id=other_id, content="yo", created_at=now))
+    for action in RATE_LIMITED_ACTIONS:
+        await redis.set(RedisKeys.rate_limit(str(user_id), action), 1)
+    await redis.set(RedisKeys.spam_last_hash(str(user_id)), "h")
+    return str(user_id)
+
+
+async def legacy_erase(redis: Redis, uid: str) -> None:
+    user_intents_key = RedisKeys.user_intents(uid)
+    for intent_id in await redis.smembers(user_intents_key):
+        await redis.delete(
+            RedisKeys.intent(intent_id),
+            RedisKeys.intent_messages(intent_id),
+            RedisKeys.intent_joins(intent_id),
+            RedisKeys.intent_flags(intent_id),
+        )
+        await redis.zrem(RedisKeys.intent_geo(), intent_id)
+        await redis.zrem(RedisKeys.intent_geo_unverified(), intent_id)
+    await redis.delete(user_intents_key)
+    for action in RATE_LIMITED_ACTIONS:
+        await redis.delete(RedisKeys.rate_limit(uid, action))
+    await redis.delete(RedisKeys.spam_last_hash(uid))
+
+
+async def measure(redis: Redis, intents: int, rounds: int) -> dict[str, float]:
+    """Mean milliseconds per erasure for each strategy."""
+    repo = ErasureRepository(redis)
+    strategies = {"legacy": lambda uid: legacy_erase(redis, uid), "script": repo.erase_user}
+    results = {}
+    for name, erase in strategies.items():
+        elapsed = 0.0
+        for _ in range(rounds):
+            await redis.flushdb()
+            uid = await seed(redis, intents)
+            start = time.perf_counter()
+            await erase(uid)
+            elapsed += time.perf_counter() - start
+        results[name] = elapsed / rounds * 1000
+    await redis.flushdb()
+    return results
+
+
+async def main(intents: int, rounds: int, redis_url: str | None) -> None:
+    redis = Redis.from_url(redis_url, decode_responses=True) if redis_url else FakeAsyncRedis(decode_responses=True)
+    try:
+        results = await measure(redis, intents, rounds)
+    finally:
+        await redis.aclose()
+    for name, ms in results.items():
+        print(f"{name:<8} {ms:>10.2f}ms")
+    print(f"speedup  {results['legacy'] / results['script']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--intents", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--redis", default=None, help="Real Redis URL (default: in-process fakeredis)")
+    args = parser.parse_args()
+    asyncio.run(main(args.intents, args.rounds, args.redis))
@@ -0,0 +1,72 @@
+"""
+Point-in-viewport matching at scale: brute-force scan vs SpatialIndex.
+
+Registers --subscriptions circles (0.1-50 km, the /ws/nearby radius range)
+scattered over a --spread degree square, then times matching --points
+event locations against them: a haversine scan over every circle, one
+`query` per point, and a single `query_many` batch. Also reports insert
+and remove cost per subscription.
+
+    python -m backend.benchmarks.geo_index [--subscriptions 100000] [--points 1000] [--cell-deg 0.1]
+"""
+import argparse
+import random
+import time
+
+from ..core.models.geo import SpatialIndex, haversine_km
+
+
+def _brute_force(circles: list[tuple[float, float, float]], points: list[tuple[float, float]]) -> int:
+    hits = 0
+    for lat, lon in points:
+        hits += sum(1 for c_lat, c_lon, r in circles if haversine_km(lat, lon, c_lat, c_lon) <= r)
+    return hits
+
+
+def main(subscriptions: int, points: int, cell_deg: float, spread: float, seed: int) -> None:
+    rng = random.Random(seed)
+    circles = [
+        (51.0 + rng.uniform(0, spread), -1.0 + rng.uniform(0, spread), rng.uniform(0.1, 50))
+        for _ in range(subscriptions)
+    ]
+    events = [(51.0 + rng.uniform(0, spread), -1.0 + rng.uniform(0, spread)) for _ in range(points)]
+
+    index = SpatialIndex(cell_deg=cell_deg)
+    start = time.perf_counter()
+    for key, circle in enumerate(circles):
+        index.insert_circle(key, *circle)
+    insert_us = (time.perf_counter() - start) / subscriptions * 1e6
+    print(f"insert       {insert_us:>9.2f}us/subscription ({len(index._cells)} cells)")
+
+    # The scan is O(subscriptions) per point: time a sample and scale up
+    sample = events[: max(1, min(points, 2_000_000 // subscriptions))]
+    start = time.perf_counter()
+    _brute_force(circles, sample)
+    scan_us = (time.perf_counter() - start) / len(sample) * 1e6
+    print(f"brute force  {scan_us:>9.2f}us/point (sampled {len(sample)})")
+
+    start = time.perf_counter()
+    hits = sum(len(index.query(lat, lon)) for lat, lon in events)
+    query_us = (time.perf_counter() - start) / points * 1e6
+    print(f"query        {query_us:>9.2f}us/point ({hits / points:.0f} matches/point)")
+
+    start = time.perf_counter()
+    index.query_many(events)
+    batch_us = (time.perf_counter() - start) / points * 1e6
+    print(f"query_many   {batch_us:>9.2f}us/point")
+
+    start = time.perf_counter()
+    for key in range(subscriptions):
+        index.remove(key)
+    print(f"remove       {(time.perf_counter() - start) / subscriptions * 1e6:>9.2f}us/subscription")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscriptions", type=int, default=100_000)
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--cell-deg", type=float, default=0.1)
+    parser.add_argument("--spread", type=float, default=2.0, help="side of the area in degrees")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.subscriptions, args.points, args.cell_deg, args.spread, args.seed)
@@ -0,0 +1,52 @@
+"""
+Cold import cost of the app module, from `python -X importtime`.
+
+Runs the import in a fresh interpreter (so nothing is cached in
+sys.modules) and prints the total plus the heaviest packages by
+cumulative time. backend/tests/test_startup.py uses `measure` to keep
+Postgres-only code off the Redis-only import path.
+
+    python -m backend.benchmarks.import_time [--module backend.main] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+def measure(module: str = "backend.main", env: dict | None = None) -> dict[str, int]:
+    """Cumulative import time in microseconds per module imported by `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+        check=True,
+    )
+    timings: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # A module may appear more than once (re-entrant imports); keep the largest
+        timings[name.strip()] = max(int(cumulative), timings.get(name.strip(), 0))
+    return timings
+
+
+def main(module: str, top: int) -> None:
+    timings = measure(module)
+    print(f"{module}: {timings.get(module, 0) / 1000:.1f}ms cumulative")
+    packages: dict[str, int] = {}
+    for name, cumulative in timings.items():
+        root = name.split(".")[0]
+        packages[root] = max(cumulative, packages.get(root, 0))
+    for name, cumulative in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {name:<24} {cumulative / 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    main(args.module, args.top)
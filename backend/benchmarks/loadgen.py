@@ -0,0 +1,328 @@
+"""
+Async load generator for the API hot paths.
+
+Seeds N intents through `seed_ambient_intents`, then drives each scenario
+through the full ASGI app (middleware, dependencies, Redis) at a fixed
+concurrency and reports throughput, p50 and p99. Runs against an in-process
+fakeredis by default, or a real Redis with --redis URL (seeded keys are left
+to expire with their TTL; nothing is flushed).
+
+Scenarios: nearby, trending, clusters, create, join, message, ws_broadcast. The last
+one fans a chat payload out to --ws-clients sockets through the WebSocket
+ConnectionManager, which is the part of a message post that grows with
+room size.
+
+    python -m backend.benchmarks.loadgen [--scenarios nearby,clusters] [--requests 1000]
+    python -m backend.benchmarks.loadgen --save backend/benchmarks/baselines/loadgen.json
+    python -m backend.benchmarks.loadgen --check backend/benchmarks/baselines/loadgen.json
+
+--check exits non-zero when a scenario's p99 or throughput is worse than
+the baseline by more than --tolerance, or when it errors more often.
+Baselines are only comparable on the same hardware and Python: CI saves
+one from the target commit in the same job and checks against that. The
+committed baselines/loadgen.json is a local reference only.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+SCENARIOS = ("nearby", "trending", "clusters", "create", "join", "message", "ws_broadcast")
+CENTER = (40.7128, -74.0060)
+
+
+class _FakeWebSocket:
+    """Encodes like Starlette's send_text and drops the bytes."""
+
+    async def send_text(self, data: str) -> None:
+        data.encode()
+
+
+class LoadContext:
+    def __init__(self, client, intents, requests: int, ws_clients: int):
+        from ..auth.jwt import create_access_token
+
+        self.client = client
+        self.intents = intents
+        self.ws_clients = ws_clients
+        # One identity per operation so per-user rate limits never trip
+        self.users = [uuid4() for _ in range(requests)]
+        self.auth = [
+            {"Authorization": f"Bearer {create_access_token({'sub': str(u)})}"} for u in self.users
+        ]
+
+    def intent(self, i: int) -> UUID:
+        return self.intents[i % len(self.intents)].id
+
+
+async def _nearby(ctx: LoadContext, i: int) -> bool:
+    lat, lon = CENTER
+    res = await ctx.client.get("/intents/nearby", params={"lat": lat, "lon": lon, "radius": 2, "view": "compact"})
+    return res.status_code == 200
+
+
+async def _trending(ctx: LoadContext, i: int) -> bool:
+    lat, lon = CENTER
+    res = await ctx.client.get("/intents/trending", params={"lat": lat, "lon": lon})
+    return res.status_code == 200
+
+
+async def _clusters(ctx: LoadContext, i: int) -> bool:
+    lat, lon = CENTER
+    res = await ctx.client.get("/intents/clusters", params={"lat": lat, "lon": lon, "radius": 10})
+    return res.status_code == 200
+
+
+async def _create(ctx: LoadContext, i: int) -> bool:
+    lat, lon = CENTER
+    res = await ctx.client.post(
+        "/intents/",
+        json={"title": "Load test", "emoji": "🧪", "latitude": lat, "longitude": lon},
+        headers=ctx.auth[i],
+    )
+    return res.status_code == 201
+
+
+async def _join(ctx: LoadContext, i: int) -> bool:
+    res = await ctx.client.post(f"/intents/{ctx.intent(i)}/join", headers=ctx.auth[i])
+    return res.status_code == 200
+
+
+async def _message(ctx: LoadContext, i: int) -> bool:
+    # Digits spaced out so the spam filter's repeated-character check never fires
+    res = await ctx.client.post(
+        f"/intents/{ctx.intent(i)}/messages",
+        json={"content": "load test " + " ".join(str(i))},
+        headers=ctx.auth[i],
+    )
+    return res.status_code == 200
+
+
+async def _ws_broadcast(ctx: LoadContext, i: int) -> bool:
+    from ..api.ws import get_ws_manager
+
+    await get_ws_manager().broadcast(str(ctx.intent(0)), {
+        "type": "new_message",
+        "message": {
+            "id": str(uuid4()),
+            "user_id": str(ctx.users[i]),
+            "content": "load test",
+            "created_at": datetime.now(UTC).isoformat(),
+        },
+    })
+    return True
+
+
+async def _setup_message(ctx: LoadContext) -> None:
+    from ..infra.persistence.join_repo import JoinRepository
+    from ..infra.persistence.redis import RedisClient
+
+    repo = JoinRepository(RedisClient.get_client())
+    for i, user in enumerate(ctx.users):
+        await repo.save_join(ctx.intent(i), user)
+
+
+async def _setup_trending(ctx: LoadContext) -> None:
+    from ..infra.persistence.join_repo import JoinRepository
+    from ..infra.persistence.redis import RedisClient
+
+    # One join per seeded intent puts each in its area's leaderboard
+    repo = JoinRepository(RedisClient.get_client())
+    for n, intent in enumerate(ctx.intents):
+        await repo.save_join(intent.id, ctx.users[n % len(ctx.users)])
+
+
+async def _setup_ws_broadcast(ctx: LoadContext) -> None:
+    from ..api.ws import get_ws_manager
+
+    manager = get_ws_manager()
+    room = str(ctx.intent(0))
+    for _ in range(ctx.ws_clients):
+        manager.join(room, _FakeWebSocket())
+
+
+async def _teardown_ws_broadcast(ctx: LoadContext) -> None:
+    from ..api.ws import get_ws_manager
+
+    manager = get_ws_manager()
+    room = str(ctx.intent(0))
+    for ws in manager.members(room):
+        manager.leave(room, ws)
+
+
+_OPS = {
+    "nearby": _nearby,
+    "trending": _trending,
+    "clusters": _clusters,
+    "create": _create,
+    "join": _join,
+    "message": _message,
+    "ws_broadcast": _ws_broadcast,
+}
+_SETUP = {"trending": _setup_trending, "message": _setup_message, "ws_broadcast": _setup_ws_broadcast}
+_TEARDOWN = {"ws_broadcast": _teardown_ws_broadcast}
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(ctx: LoadContext, scenario: str, requests: int, concurrency: int) -> dict:
+    op = _OPS[scenario]
+    if scenario in _SETUP:
+        await _SETUP[scenario](ctx)
+
+    latencies: list[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in pending:
+            start = time.perf_counter()
+            try:
+                ok = await op(ctx, i)
+            except Exception:  # noqa: BLE001 - any failure counts against the scenario
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    if scenario in _TEARDOWN:
+        await _TEARDOWN[scenario](ctx)
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "throughput": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "errors": errors,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Human-readable regressions of `results` against a saved baseline."""
+    regressions = []
+    for scenario, current in results.items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if base is None:
+            continue
+        if current["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario}: p99 {current['p99_ms']}ms vs baseline {base['p99_ms']}ms")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario}: throughput {current['throughput']}/s vs baseline {base['throughput']}/s"
+            )
+        if current["errors"] / current["requests"] > base["errors"] / base["requests"]:
+            regressions.append(f"{scenario}: {current['errors']} errors vs baseline {base['errors']}")
+    return regressions
+
+
+async def _connect(redis_url: str | None):
+    from ..infra.persistence.redis import RedisClient
+
+    if redis_url:
+        await RedisClient.connect(redis_url)
+    else:
+        from fakeredis import FakeAsyncRedis
+        RedisClient._client = FakeAsyncRedis(decode_responses=True)
+    return RedisClient
+
+
+def _write_json(path: str, document: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _read_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+async def main(args) -> int:
+    from httpx import ASGITransport, AsyncClient
+
+    from ..api.container import Container
+    from ..config import settings
+    from ..infra.persistence.intent_repo import IntentRepository
+    from ..main import app
+    from ..tasks.seeder import seed_ambient_intents
+
+    # Keep logging off the measurement; failures are counted per scenario instead
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    redis_client = await _connect(args.redis)
+    app.state.container = Container(redis_client.get_client(), redis_client.get_reader(), settings)
+    try:
+        intents = await seed_ambient_intents(
+            IntentRepository(redis_client.get_client()), *CENTER, count=args.intents, radius_km=2.0
+        )
+        transport = ASGITransport(app=app, client=("127.0.0.1", 5000))
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            ctx = LoadContext(client, intents, args.requests, args.ws_clients)
+            results = {}
+            for scenario in args.scenarios:
+                results[scenario] = await run_scenario(ctx, scenario, args.requests, args.concurrency)
+                r = results[scenario]
+                print(
+                    f"{scenario:<13} {r['throughput']:>9.1f} req/s  p50 {r['p50_ms']:>8.2f}ms  "
+                    f"p99 {r['p99_ms']:>8.2f}ms  errors {r['errors']}"
+                )
+    finally:
+        await redis_client.disconnect()
+
+    if args.save:
+        await asyncio.to_thread(_write_json, args.save, {
+            "meta": {
+                "intents": args.intents,
+                "redis": "url" if args.redis else "fakeredis",
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+            },
+            "scenarios": results,
+        })
+        print(f"baseline saved to {args.save}")
+
+    if args.check:
+        baseline = await asyncio.to_thread(_read_json, args.check)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--intents", type=int, default=200)
+    parser.add_argument("--ws-clients", type=int, default=100)
+    parser.add_argument("--redis", default=None, help="Redis URL (default: in-process fakeredis)")
+    parser.add_argument("--save", default=None, help="Write results as a JSON baseline")
+    parser.add_argument("--check", default=None, help="Compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    sys.exit(asyncio.run(main(args)))
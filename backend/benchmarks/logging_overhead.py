@@ -0,0 +1,95 @@
+"""
+Time spent on the request path by per-request logging.
+
+"legacy" is the old setup: two f-string INFO lines per request, formatted
+to JSON and written to the stream synchronously in the caller. "queued" is
+the current setup: one access line at the default sample rate, handed to
+a QueueHandler and formatted/written on the listener thread.
+
+    python -m backend.benchmarks.logging_overhead [--requests 20000]
+"""
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from datetime import UTC, datetime
+
+from ..config import settings
+from ..core.logging import ContextQueueHandler, JSONFormatter, request_id_var
+
+
+class LegacyJSONFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            "timestamp": datetime.now(UTC).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "module": record.module,
+            "func": record.funcName,
+            "request_id": request_id_var.get("-"),
+        })
+
+
+def _logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def bench_legacy(requests: int, sink) -> float:
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(LegacyJSONFormatter())
+    logger = _logger("legacy", handler)
+    method, path, status = "GET", "/intents/nearby", 200
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        logger.info(f"{method} {path}")
+        logger.info(f"{method} {path} -> {status}")
+    return (time.perf_counter() - start) / requests
+
+
+def bench_queued(requests: int, sink, sample_rate: float) -> float:
+    stream = logging.StreamHandler(sink)
+    stream.setFormatter(JSONFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, stream)
+    listener.start()
+    logger = _logger("queued", ContextQueueHandler(log_queue))
+    method, path, status, duration_ms = "GET", "/intents/nearby", 200, 1.2
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        if random.random() < sample_rate:
+            logger.info("%s %s -> %d in %.1fms", method, path, status, duration_ms)
+    elapsed = time.perf_counter() - start
+    listener.stop()  # drain outside the timed region: that work is off the request path
+    return elapsed / requests
+
+
+def main(requests: int, sample_rate: float) -> None:
+    with open(os.devnull, "w") as sink:
+        legacy = bench_legacy(requests, sink)
+        queued_all = bench_queued(requests, sink, 1.0)
+        queued = bench_queued(requests, sink, sample_rate)
+    rows = [
+        ("legacy (2 sync lines/request)", legacy),
+        ("queued (1 line/request, unsampled)", queued_all),
+        (f"queued (sample rate {sample_rate})", queued),
+    ]
+    for label, seconds in rows:
+        print(f"{label + ':':40} {seconds * 1e6:7.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sample-rate", type=float, default=settings.ACCESS_LOG_SAMPLE_RATE)
+    args = parser.parse_args()
+    main(args.requests, args.sample_rate)
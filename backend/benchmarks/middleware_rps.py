@@ -0,0 +1,138 @@
+"""
+Before/after throughput of the HTTP middleware stack on a trivial endpoint.
+
+"legacy" rebuilds the old chain (two BaseHTTPMiddleware classes plus two
+@app.middleware("http") functions); "fused" is the current RequestMiddleware.
+Requests are driven straight through the ASGI interface so the numbers
+measure middleware overhead, not a client library.
+
+    python -m backend.benchmarks.middleware_rps [--requests 20000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from ..api.middleware import HSTS_HEADER, SECURITY_HEADERS, RequestMiddleware
+from ..auth.middleware import resolve_identity
+from ..core.logging import request_id_var
+
+
+def _base_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return JSONResponse({"status": "ok"})
+
+    return app
+
+
+def build_legacy_app() -> FastAPI:
+    app = _base_app()
+    headers = {k.decode(): v.decode() for k, v in SECURITY_HEADERS + [HSTS_HEADER]}
+
+    class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            response = await call_next(request)
+            response.headers.update(headers)
+            return response
+
+    class AuthMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            user_id, _user_uuid, authed = resolve_identity(request.headers.get("Authorization"))
+            request.state.user_id = user_id
+            request.state.is_authenticated = authed
+            return await call_next(request)
+
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(AuthMiddleware)
+
+    @app.middleware("http")
+    async def limit_body_size(request: Request, call_next):
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > 1_048_576:
+            return JSONResponse(status_code=413, content={"detail": "Request body too large"})
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def request_id_middleware(request: Request, call_next):
+        rid = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        token = request_id_var.set(rid)
+        try:
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = rid
+            return response
+        finally:
+            request_id_var.reset(token)
+
+    return app
+
+
+def build_fused_app() -> FastAPI:
+    app = _base_app()
+    app.add_middleware(RequestMiddleware)
+    return app
+
+
+async def _call(app, scope: dict) -> None:
+    messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+
+    async def receive():
+        return next(messages, {"type": "http.disconnect"})
+
+    async def send(message):
+        pass
+
+    await app(dict(scope), receive, send)
+
+
+async def measure(app, requests: int, concurrency: int) -> float:
+    """Return requests per second for GET /health."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    # Warm up routing and middleware stack construction
+    for _ in range(100):
+        await _call(app, scope)
+
+    per_worker = requests // concurrency
+
+    async def worker():
+        for _ in range(per_worker):
+            await _call(app, scope)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return per_worker * concurrency / elapsed
+
+
+async def main(requests: int, concurrency: int) -> None:
+    legacy = await measure(build_legacy_app(), requests, concurrency)
+    fused = await measure(build_fused_app(), requests, concurrency)
+    print(f"legacy BaseHTTPMiddleware chain: {legacy:10.0f} req/s")
+    print(f"fused RequestMiddleware:         {fused:10.0f} req/s  ({fused / legacy:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,201 @@
+"""
+Offline replay of recorded nearby searches through every ranking strategy.
+
+With RANKING_QUERY_SAMPLE_RATE > 0 a share of nearby searches is recorded
+in the event stream as NearbyQueried, carrying the score inputs of every
+candidate. Each recorded search is re-scored by every strategy in
+RANKING_STRATEGIES as of the time it was made, and compared on:
+
+- latency: score + sort per search (mean and p99), and
+- quality against later joins: a candidate is relevant if it was joined
+  (IntentJoined) within `--window` minutes after the search. NDCG@k, MRR
+  and hit rate@k are averaged over searches with at least one relevant
+  candidate. Searches carry no user id, so this is a population-level
+  proxy, not "this user joined what they were shown".
+
+Without `--redis` it replays synthetic searches written to an in-process
+fakeredis, whose joins follow a hidden taste for close, fresh, popular
+intents. On a real stream the window is bounded by MAX_STREAM_LEN.
+
+    python -m backend.benchmarks.ranking_replay [--k 10] [--window 30] [--redis redis://localhost:6379/0]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from bisect import bisect_right
+from datetime import UTC, datetime
+from math import exp, log2
+from typing import NamedTuple
+from uuid import UUID, uuid4
+
+from fakeredis import FakeAsyncRedis
+from redis.asyncio import Redis
+
+from ..config import settings
+from ..core.events import CandidateFeatures, IntentJoined, NearbyQueried
+from ..core.models.ranking import RANKING_STRATEGIES, CandidateBatch, log1p_count
+from ..infra.persistence.event_store import RedisEventStore
+from ..services.ranking_service import RankingService
+from .loadgen import percentile
+
+
+class ReplayQuery(NamedTuple):
+    event: NearbyQueried
+    relevant: frozenset[UUID]
+
+
+async def load_queries(redis: Redis, window_seconds: float) -> list[ReplayQuery]:
+    """Recorded searches from the stream, each with the candidates joined within the window after it."""
+    store = RedisEventStore(redis)
+    queries: list[NearbyQueried] = []
+    joins: dict[UUID, list[float]] = {}
+    last_id = "-"
+    while True:
+        entries = await store.read_since(last_id, count=1000)
+        for entry in entries:
+            if entry["event_type"] == "NearbyQueried":
+                queries.append(NearbyQueried.model_validate(entry["data"]))
+            elif entry["event_type"] == "IntentJoined":
+                joined = IntentJoined.model_validate(entry["data"])
+                joins.setdefault(joined.intent_id, []).append(joined.timestamp.timestamp())
+        if len(entries) < 1000:
+            break
+        last_id = "(" + entries[-1]["id"]
+
+    for times in joins.values():
+        times.sort()
+    replay = []
+    for query in queries:
+        start = query.timestamp.timestamp()
+        relevant = frozenset(
+            c.intent_id for c in query.candidates
+            if _joined_within(joins.get(c.intent_id), start, start + window_seconds)
+        )
+        replay.append(ReplayQuery(query, relevant))
+    return replay
+
+
+def _joined_within(times: list[float] | None, start: float, end: float) -> bool:
+    if not times:
+        return False
+    i = bisect_right(times, start)
+    return i < len(times) and times[i] <= end
+
+
+def evaluate(queries: list[ReplayQuery], ranking: RankingService, k: int = 10) -> dict[str, dict]:
+    """Latency and quality of every strategy over the same searches."""
+    batches = [
+        CandidateBatch(
+            [c.created_ts for c in q.event.candidates],
+            [log1p_count(c.join_count) for c in q.event.candidates],
+            [c.dist_km for c in q.event.candidates],
+            [c.online_count for c in q.event.candidates],
+            [c.area_activity for c in q.event.candidates],
+        )
+        for q in queries
+    ]
+    ideal_dcg = [sum(1.0 / log2(pos + 2) for pos in range(n)) for n in range(k + 1)]
+
+    results = {}
+    for name in RANKING_STRATEGIES:
+        latencies = []
+        judged = hits = 0
+        ndcg = mrr = 0.0
+        for query, batch in zip(queries, batches, strict=True):
+            event = query.event
+            start = time.perf_counter()
+            scores = ranking.scores(batch, event.radius_km, name, now_ts=event.timestamp.timestamp())
+            order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+            latencies.append(time.perf_counter() - start)
+            if not query.relevant:
+                continue
+
+            judged += 1
+            ranked = [event.candidates[n].intent_id in query.relevant for n in order]
+            dcg = sum(1.0 / log2(pos + 2) for pos, relevant in enumerate(ranked[:k]) if relevant)
+            ndcg += dcg / ideal_dcg[min(k, len(query.relevant))]
+            first = ranked.index(True)
+            mrr += 1.0 / (first + 1)
+            hits += first < k
+
+        latencies.sort()
+        results[name] = {
+            "queries": len(queries),
+            "judged": judged,
+            "mean_us": sum(latencies) / len(latencies) * 1e6 if latencies else 0.0,
+            "p99_us": percentile(latencies, 0.99) * 1e6,
+            "ndcg": ndcg / judged if judged else 0.0,
+            "mrr": mrr / judged if judged else 0.0,
+            "hit_rate": hits / judged if judged else 0.0,
+        }
+    return results
+
+
+async def seed_synthetic(redis: Redis, queries: int, candidates: int, seed: int) -> None:
+    """Synthetic searches a minute apart, each followed by joins drawn from a hidden preference."""
+    rng = random.Random(seed)
+    store = RedisEventStore(redis)
+    start = time.time() - queries * 60
+    for q in range(queries):
+        asked = start + q * 60
+        features = [
+            CandidateFeatures(
+                intent_id=uuid4(),
+                dist_km=round(rng.uniform(0.0, 2.0), 1),
+                created_ts=asked - rng.uniform(0, 2 * 86400),
+                join_count=int(rng.expovariate(0.3)),
+                online_count=rng.choice((0, 0, 0, 1, 2, 5)),
+            )
+            for _ in range(candidates)
+        ]
+        await store.append(NearbyQueried(
+            geohash="dr5ru7", radius_km=2.0, limit=candidates, strategy="linear",
+            candidates=features, timestamp=datetime.fromtimestamp(asked, UTC),
+        ))
+        for c in features:
+            age = (asked - c.created_ts) / 86400
+            appeal = exp(-c.dist_km / 0.4) * exp(-age) * (1 + c.join_count) ** 0.5 * (1 + c.online_count)
+            if rng.random() < min(1.0, 0.1 * appeal):
+                joined = asked + rng.uniform(1, 1800)
+                await store.append(IntentJoined(
+                    intent_id=c.intent_id, user_id=uuid4(), timestamp=datetime.fromtimestamp(joined, UTC),
+                ))
+
+
+async def main(args: argparse.Namespace) -> None:
+    redis = Redis.from_url(args.redis, decode_responses=True) if args.redis else FakeAsyncRedis(decode_responses=True)
+    try:
+        if not args.redis:
+            await seed_synthetic(redis, args.queries, args.candidates, args.seed)
+        queries = await load_queries(redis, args.window * 60)
+    finally:
+        await redis.aclose()
+    if not queries:
+        print("no NearbyQueried events in the stream (is RANKING_QUERY_SAMPLE_RATE > 0?)")
+        return
+
+    results = evaluate(queries, RankingService(settings), args.k)
+    judged = next(iter(results.values()))["judged"]
+    print(f"{len(queries)} searches, {judged} with a join within {args.window:g} min")
+    print(f"{'strategy':<10} {'mean':>9} {'p99':>9} {f'ndcg@{args.k}':>9} {'mrr':>7} {f'hit@{args.k}':>7}")
+    for name, r in results.items():
+        print(
+            f"{name:<10} {r['mean_us']:>7.1f}us {r['p99_us']:>7.1f}us"
+            f" {r['ndcg']:>9.3f} {r['mrr']:>7.3f} {r['hit_rate']:>7.3f}"
+        )
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--window", type=float, default=30.0, help="minutes after a search a join still counts")
+    parser.add_argument("--queries", type=int, default=500, help="synthetic searches (fakeredis only)")
+    parser.add_argument("--candidates", type=int, default=50, help="candidates per synthetic search")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="also print the results as JSON")
+    parser.add_argument("--redis", default=None, help="Real Redis URL (default: in-process fakeredis)")
+    asyncio.run(main(parser.parse_args()))
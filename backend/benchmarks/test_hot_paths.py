@@ -0,0 +1,110 @@
+"""
+pytest-benchmark micro-benchmarks for the pure-Python parts of the hot
+paths. Not collected by the default test run (see pytest.ini testpaths):
+
+    pytest backend/benchmarks --benchmark-autosave
+    pytest backend/benchmarks --benchmark-compare --benchmark-compare-fail=mean:25%
+
+End-to-end latency under concurrency is measured by loadgen.py instead.
+"""
+import asyncio
+import random
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from backend.api.schemas import CompactIntent, CompactNearbyResponse, NearbyResponse
+from backend.config import settings
+from backend.core.models.intent import Intent
+from backend.services.clustering_service import ClusteringService
+from backend.services.ranking_service import RankingService
+
+LAT, LON = 40.7128, -74.0060
+
+
+def _intents(n: int) -> list[tuple[Intent, float]]:
+    rng = random.Random(42)
+    now = datetime.now(UTC)
+    return [
+        (
+            Intent(
+                id=uuid4(),
+                user_id="bench",
+                title="Anyone for coffee?",
+                emoji="☕️",
+                latitude=LAT + rng.uniform(-0.02, 0.02),
+                longitude=LON + rng.uniform(-0.02, 0.02),
+                created_at=now - timedelta(seconds=rng.randint(0, 86400)),
+                join_count=rng.randint(0, 20),
+            ),
+            rng.uniform(0, 2.0),
+        )
+        for _ in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def pairs():
+    return _intents(1000)
+
+
+def test_rank_1000(benchmark, pairs):
+    ranking = RankingService(settings)
+    result = benchmark(ranking.rank, pairs, 2.0, 50)
+    assert len(result) == 50
+
+
+def test_cluster_1000_points(benchmark, pairs):
+    points = [(str(i.id), i.longitude, i.latitude) for i, _ in pairs]
+    clusters = benchmark(ClusteringService.cluster, points, 10.0, zoom=13)
+    assert clusters
+
+
+def test_serialize_nearby_full(benchmark, pairs):
+    intents = [i for i, _ in pairs[:100]]
+    body = benchmark(lambda: NearbyResponse(intents=intents, count=len(intents)).model_dump_json())
+    assert body
+
+
+def test_serialize_nearby_compact(benchmark, pairs):
+    intents = [i for i, _ in pairs[:100]]
+    body = benchmark(
+        lambda: CompactNearbyResponse(
+            intents=[CompactIntent.from_intent(i) for i in intents], count=len(intents)
+        ).model_dump_json()
+    )
+    assert body
+
+
+def test_nearby_endpoint_fakeredis(benchmark):
+    """One GET /intents/nearby through the full ASGI stack over 200 seeded intents."""
+    from fakeredis import FakeAsyncRedis
+    from httpx import ASGITransport, AsyncClient
+
+    from backend.api.container import Container
+    from backend.infra.persistence.intent_repo import IntentRepository
+    from backend.infra.persistence.redis import RedisClient
+    from backend.main import app
+    from backend.tasks.seeder import seed_ambient_intents
+
+    loop = asyncio.new_event_loop()
+    previous = RedisClient._client
+    RedisClient._client = FakeAsyncRedis(decode_responses=True)
+    app.state.container = Container(RedisClient._client, RedisClient._client, settings)
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+    try:
+        loop.run_until_complete(
+            seed_ambient_intents(IntentRepository(RedisClient._client), LAT, LON, count=200, radius_km=1.0)
+        )
+        res = benchmark(
+            lambda: loop.run_until_complete(client.get("/intents/nearby", params={"lat": LAT, "lon": LON}))
+        )
+        assert res.status_code == 200
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+        RedisClient._client = previous
+        app.state.container = None
@@ -0,0 +1,97 @@
+"""
+Idle-timeout cost per WebSocket receive: per-receive timer vs shared wheel.
+
+"wait_for" is the old receive loop: every frame goes through
+asyncio.wait_for(receive, 60), which arms and cancels a timer handle.
+"wheel" awaits the receive directly and stamps `last_seen`; the shared
+Heartbeat sweep then runs once per tick over all connections. Frames are
+fed through in-memory queues, so the numbers isolate the timeout
+machinery. Also reports one full-wheel sweep at --connections.
+
+    python -m backend.benchmarks.ws_heartbeat [--connections 10000] [--frames 20]
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from ..api.heartbeat import Heartbeat
+from ..api.ws import ConnectionManager
+
+
+class _QueueSocket:
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def receive_text(self) -> str:
+        return await self.queue.get()
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+async def _wait_for_loop(ws: _QueueSocket, frames: int) -> None:
+    for _ in range(frames):
+        await asyncio.wait_for(ws.receive_text(), timeout=60)
+
+
+async def _wheel_loop(ws: _QueueSocket, conn, frames: int) -> None:
+    for _ in range(frames):
+        await ws.receive_text()
+        conn.last_seen = time.monotonic()
+
+
+async def measure_receive(mode: str, connections: int, frames: int) -> float:
+    """Mean microseconds per received frame, across all connections."""
+    manager = ConnectionManager(max_per_room=connections, max_total=connections)
+    heartbeat = Heartbeat(manager, idle_timeout=60.0, tick=1.0, room_check_interval=30.0)
+    intent_id = uuid4()
+    sockets = [_QueueSocket() for _ in range(connections)]
+    tasks = []
+    for ws in sockets:
+        conn = manager.join(intent_id, ws)
+        heartbeat.track(conn)
+        loop = _wait_for_loop(ws, frames) if mode == "wait_for" else _wheel_loop(ws, conn, frames)
+        tasks.append(asyncio.create_task(loop))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for ws in sockets:
+            ws.queue.put_nowait("ping")
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return (time.perf_counter() - start) / (connections * frames) * 1e6
+
+
+async def measure_sweep(connections: int) -> float:
+    """Milliseconds for one sweep that re-buckets every connection."""
+    now = [0.0]
+    manager = ConnectionManager(max_per_room=connections, max_total=connections)
+    heartbeat = Heartbeat(manager, idle_timeout=60.0, tick=1.0, room_check_interval=30.0, clock=lambda: now[0])
+    intent_id = uuid4()
+    conns = [manager.join(intent_id, _QueueSocket()) for _ in range(connections)]
+    for conn in conns:
+        conn.last_seen = 0.0
+        heartbeat.track(conn)
+    for conn in conns:
+        conn.last_seen = 30.0  # all seen since: every one is re-bucketed
+    now[0] = 60.0
+    start = time.perf_counter()
+    await heartbeat.sweep()
+    return (time.perf_counter() - start) * 1000
+
+
+async def main(connections: int, frames: int) -> None:
+    for mode in ("wait_for", "wheel"):
+        us = await measure_receive(mode, connections, frames)
+        print(f"{mode:<9} {us:>8.2f}us/frame")
+    print(f"sweep     {await measure_sweep(connections):>8.2f}ms for {connections} connections (once per tick)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--frames", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.connections, args.frames))
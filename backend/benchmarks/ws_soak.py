@@ -0,0 +1,166 @@
+"""
+Resident memory of a worker holding idle WebSocket connections.
+
+Starts `uvicorn backend.main:app` in a subprocess (DEBUG on, limits lifted),
+opens idle sockets to /ws/intents/{id}/messages in steps, and after each
+step reads the server's VmRSS from /proc and the manager's own footprint
+from /debug/ws. Use the per-socket figure to size WS_MAX_TOTAL_CONNECTIONS
+and worker counts. Needs a uvicorn WebSocket implementation (`websockets`
+or `wsproto`), Linux /proc, and an fd limit above the largest step (both
+client and server run under the raised soft limit). The rooms are seeded
+as real intents joined by the socket user (the handshake checks
+membership) in the Redis at REDIS_DSN; they expire with their TTL. Idle
+sockets don't touch Redis after that.
+
+    python -m backend.benchmarks.ws_soak [--steps 10000,50000] [--per-room 100]
+"""
+import argparse
+import asyncio
+import base64
+import os
+import resource
+import socket
+import sys
+import time
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+import httpx
+
+
+def raise_fd_limit(wanted: int) -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = hard if hard == resource.RLIM_INFINITY else min(hard, max(soft, wanted))
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError(f"no VmRSS for pid {pid}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def open_idle_socket(port: int, path: str) -> asyncio.StreamWriter:
+    """HTTP upgrade handshake only; the socket then sits idle."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\n"
+        f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+    )
+    status = await reader.readuntil(b"\r\n\r\n")
+    if b" 101 " not in status.split(b"\r\n", 1)[0]:
+        writer.close()
+        raise RuntimeError(status.split(b"\r\n", 1)[0].decode())
+    return writer
+
+
+async def wait_until_up(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"http://127.0.0.1:{port}/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def manager_usage(port: int) -> dict:
+    async with httpx.AsyncClient() as client:
+        res = await client.get(f"http://127.0.0.1:{port}/debug/ws")
+        return res.json() if res.status_code == 200 else {}
+
+
+async def seed_rooms(count: int, user_id: UUID) -> list[UUID]:
+    """Create `count` intents in the server's Redis, each joined by `user_id`."""
+    from redis.asyncio import Redis
+
+    from ..config import settings
+    from ..core.models.intent import Intent
+    from ..infra.persistence.intent_repo import IntentRepository
+    from ..infra.persistence.join_repo import JoinRepository
+
+    redis = Redis.from_url(settings.REDIS_DSN, decode_responses=True)
+    try:
+        intents, joins = IntentRepository(redis), JoinRepository(redis)
+        rooms = []
+        for _ in range(count):
+            intent = Intent(title="Soak", emoji="🧪", latitude=0.0, longitude=0.0, created_at=datetime.now(UTC))
+            await intents.save_intent(intent)
+            await joins.save_join(intent.id, user_id)
+            rooms.append(intent.id)
+        return rooms
+    finally:
+        await redis.aclose()
+
+
+async def main(steps: list[int], per_room: int, batch: int) -> None:
+    from ..auth.jwt import create_access_token
+
+    limit = raise_fd_limit(steps[-1] * 2 + 256)
+    if steps[-1] + 128 > limit:
+        print(f"fd limit {limit} is too low for {steps[-1]} sockets; capping steps", file=sys.stderr)
+        steps = [s for s in steps if s + 128 <= limit] or [limit - 128]
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "DEBUG": "true",
+        "WS_MAX_TOTAL_CONNECTIONS": str(steps[-1] + 1),
+        "WS_MAX_CONNECTIONS_PER_ROOM": str(per_room),
+    }
+    server = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port),
+        "--log-level", "warning", "--backlog", "4096",
+        env=env,
+    )
+    writers: list[asyncio.StreamWriter] = []
+    try:
+        await wait_until_up(port)
+        user_id = uuid4()
+        token = create_access_token({"sub": str(user_id)})
+        rooms = await seed_rooms(steps[-1] // per_room + 1, user_id)
+        base = rss_kib(server.pid)
+        print(f"idle server: {base / 1024:.1f} MiB RSS")
+        print(f"{'sockets':>8} {'rss MiB':>9} {'KiB/socket':>11} {'manager B/socket':>17}")
+        for step in steps:
+            while len(writers) < step:
+                n = min(batch, step - len(writers))
+                start = len(writers)
+                writers += await asyncio.gather(*(
+                    open_idle_socket(port, f"/ws/intents/{rooms[(start + i) // per_room]}/messages?token={token}")
+                    for i in range(n)
+                ))
+            await asyncio.sleep(1.0)
+            rss = rss_kib(server.pid)
+            usage = await manager_usage(port)
+            print(
+                f"{step:>8} {rss / 1024:>9.1f} {(rss - base) / step:>11.2f} "
+                f"{usage.get('bytes_per_connection', float('nan')):>17}"
+            )
+    finally:
+        for writer in writers:
+            writer.close()
+        server.terminate()
+        await asyncio.wait_for(server.wait(), timeout=10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", default="10000,50000", help="Cumulative socket counts to measure at")
+    parser.add_argument("--per-room", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=500, help="Concurrent handshakes")
+    args = parser.parse_args()
+    asyncio.run(main(sorted(int(s) for s in args.steps.split(",")), args.per_room, args.batch))
@@ -18,11 +18,19 @@ class Settings(BaseSettings):
     )
     POSTGRES_ENABLED: bool = Field(default=False, validation_alias="POSTGRES_ENABLED")
     DEVICE_TOKEN_SECRET: str = Field(default="devsecret", validation_alias="DEVICE_TOKEN_SECRET")
+    # Optional read replica for query-side reads; empty = separate read pool on the primary
+    REDIS_REPLICA_DSN: str = Field(default="", validation_alias="REDIS_REPLICA_DSN")
+    REDIS_WRITE_POOL_SIZE: int = Field(default=20, validation_alias="REDIS_WRITE_POOL_SIZE")
+    REDIS_READ_POOL_SIZE: int = Field(default=20, validation_alias="REDIS_READ_POOL_SIZE")
+    # Seconds a caller may queue for a pooled connection before failing
+    REDIS_POOL_TIMEOUT: float = Field(default=2.0, validation_alias="REDIS_POOL_TIMEOUT")
     REDIS_TTL_SECONDS: int = Field(default=60 * 60 * 6, validation_alias="REDIS_TTL_SECONDS")
 
     # Explicit JWT settings (lowercase to match usage in jwt.py)
     jwt_secret: str = Field(default="devsecret", validation_alias="JWT_SECRET")
     jwt_algorithm: str = Field(default="HS256", validation_alias="JWT_ALGORITHM")
+    # Verified-token LRU per worker (see auth/jwt.py)
+    JWT_CACHE_SIZE: int = Field(default=10000, validation_alias="JWT_CACHE_SIZE")
 
     # CORS — comma-separated allowed origins (e.g. "https://nowhere.app,https://www.nowhere.app")
     ALLOWED_ORIGINS: str = Field(default="", validation_alias="ALLOWED_ORIGINS")
@@ -31,7 +39,55 @@ class Settings(BaseSettings):
     RANKING_W_DIST: float = Field(default=1.0, validation_alias="RANKING_W_DIST")
     RANKING_W_FRESH: float = Field(default=2.0, validation_alias="RANKING_W_FRESH")
     RANKING_W_POP: float = Field(default=0.5, validation_alias="RANKING_W_POP")
+    RANKING_W_ONLINE: float = Field(default=0.5, validation_alias="RANKING_W_ONLINE")
     RANKING_DECAY_SECONDS: int = Field(default=86400, validation_alias="RANKING_DECAY_SECONDS")
+    # Area popularity (log of the cell's decayed activity); 0 skips the density lookup
+    RANKING_W_AREA: float = Field(default=0.0, validation_alias="RANKING_W_AREA")
+    # Ranking strategy (core/models/ranking.py RANKING_STRATEGIES): linear, distance, gravity, learned
+    RANKING_STRATEGY: str = Field(default="linear", validation_alias="RANKING_STRATEGY")
+    # A/B test as "<strategy>:<percent>", e.g. "gravity:10"; users are bucketed by id
+    RANKING_EXPERIMENT: str = Field(default="", validation_alias="RANKING_EXPERIMENT")
+    # Offline-fitted "w_dist,w_fresh,w_pop,w_online,w_area" for "learned"; empty = the weights above
+    RANKING_LEARNED_WEIGHTS: str = Field(default="", validation_alias="RANKING_LEARNED_WEIGHTS")
+    # Fraction of nearby queries recorded as NearbyQueried events for offline replay
+    # (benchmarks/ranking_replay.py); they share the capped event stream
+    RANKING_QUERY_SAMPLE_RATE: float = Field(default=0.0, validation_alias="RANKING_QUERY_SAMPLE_RATE")
+
+    # Area density (services/density_service.py): decaying per-geohash-cell
+    # activity counters, read by DynamicRateLimiter and ranking
+    DENSITY_GEOHASH_PRECISION: int = Field(default=6, validation_alias="DENSITY_GEOHASH_PRECISION")
+    DENSITY_HALF_LIFE_SECONDS: int = Field(default=3600, validation_alias="DENSITY_HALF_LIFE_SECONDS")
+    # Activity above which DynamicRateLimiter scales limits down (limit * busy / activity)
+    DENSITY_BUSY_ACTIVITY: float = Field(default=50.0, validation_alias="DENSITY_BUSY_ACTIVITY")
+
+    # Trending (services/trending_service.py): per-geohash-cell leaderboards
+    # of the most-joined intents; a lookup merges a point's cell and its 8 neighbours
+    TRENDING_GEOHASH_PRECISION: int = Field(default=5, validation_alias="TRENDING_GEOHASH_PRECISION")
+    TRENDING_CELL_SIZE: int = Field(default=100, validation_alias="TRENDING_CELL_SIZE")
+
+    # /intents/clusters (services/clustering_service.py): "grid" bins into latitude-corrected
+    # cells; "greedy" merges clusters across cell edges, at a few times the cost
+    CLUSTERING_METHOD: str = Field(default="grid", validation_alias="CLUSTERING_METHOD")
+
+    # Access logging — errors and slow requests are always logged
+    ACCESS_LOG_SAMPLE_RATE: float = Field(default=0.1, validation_alias="ACCESS_LOG_SAMPLE_RATE")
+    ACCESS_LOG_SLOW_MS: float = Field(default=500.0, validation_alias="ACCESS_LOG_SLOW_MS")
+
+    # Redis command tracing (infra/persistence/tracing.py) — off by default
+    REDIS_TRACE_ENABLED: bool = Field(default=False, validation_alias="REDIS_TRACE_ENABLED")
+    REDIS_TRACE_SAMPLE_RATE: float = Field(default=0.01, validation_alias="REDIS_TRACE_SAMPLE_RATE")
+
+    # WebSocket limits per worker (api/ws.py)
+    WS_MAX_CONNECTIONS_PER_ROOM: int = Field(default=100, validation_alias="WS_MAX_CONNECTIONS_PER_ROOM")
+    WS_MAX_TOTAL_CONNECTIONS: int = Field(default=10000, validation_alias="WS_MAX_TOTAL_CONNECTIONS")
+    WS_MAX_NEARBY_SUBSCRIPTIONS: int = Field(default=10000, validation_alias="WS_MAX_NEARBY_SUBSCRIPTIONS")
+    # Minimum gap between snapshot queries for one /ws/nearby socket
+    WS_NEARBY_RESUBSCRIBE_SECONDS: float = Field(default=1.0, validation_alias="WS_NEARBY_RESUBSCRIBE_SECONDS")
+    # Shared heartbeat (api/heartbeat.py): silent sockets are closed after the
+    # idle timeout; rooms are checked against their intent every interval
+    WS_IDLE_TIMEOUT_SECONDS: float = Field(default=60.0, validation_alias="WS_IDLE_TIMEOUT_SECONDS")
+    WS_HEARTBEAT_TICK_SECONDS: float = Field(default=1.0, validation_alias="WS_HEARTBEAT_TICK_SECONDS")
+    WS_ROOM_CHECK_SECONDS: float = Field(default=30.0, validation_alias="WS_ROOM_CHECK_SECONDS")
 
     model_config = ConfigDict(env_file=".env")
 
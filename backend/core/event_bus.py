@@ -1,7 +1,10 @@
 import asyncio
-from typing import Protocol, List, Callable, Awaitable, Dict
-from .events import DomainEvent
 import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Protocol
+
+from .events import DomainEvent
+from .metrics import EVENT_HANDLER_SECONDS, EVENTS_PUBLISHED
 
 logger = logging.getLogger(__name__)
 
@@ -41,15 +44,26 @@ class InMemoryEventBus:
                 logger.error("Failed to persist event %s: %s", type(event).__name__, e, exc_info=True)
 
         event_type = type(event)
+        EVENTS_PUBLISHED.labels(event_type.__name__).inc()
         handlers = self._handlers.get(event_type, [])
 
         if not handlers:
             return
 
         results = await asyncio.gather(
-            *[handler(event) for handler in handlers],
+            *[_timed_handler(handler, event) for handler in handlers],
             return_exceptions=True,
         )
         for r in results:
             if isinstance(r, Exception):
                 logger.error("Event handler failed for %s: %s", event_type.__name__, r, exc_info=True)
+
+
+async def _timed_handler(handler: EventHandler, event: DomainEvent) -> None:
+    start = time.perf_counter()
+    try:
+        await handler(event)
+    finally:
+        EVENT_HANDLER_SECONDS.labels(
+            type(event).__name__, getattr(handler, "__qualname__", repr(handler))
+        ).observe(time.perf_counter() - start)
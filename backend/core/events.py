@@ -38,3 +38,25 @@ class IntentFlagged(DomainEvent):
     """Event emitted when an intent is flagged."""
     intent_id: UUID
     new_flag_count: int
+
+
+class CandidateFeatures(BaseModel):
+    """Score inputs of one ranked candidate, as recorded in NearbyQueried."""
+    intent_id: UUID
+    dist_km: float
+    created_ts: float
+    join_count: int
+    online_count: int
+    area_activity: float = 0.0
+
+
+class NearbyQueried(DomainEvent):
+    """Event recorded for a sampled nearby search, for offline replay of ranking strategies.
+    Carries the features of every candidate ranked. Location is only a coarse geohash,
+    distances are rounded to 100m, and there is no user id.
+    """
+    geohash: str
+    radius_km: float
+    limit: int
+    strategy: str
+    candidates: list[CandidateFeatures]
@@ -1,20 +1,25 @@
-from typing import Protocol, List, Optional
-from uuid import UUID
 from datetime import datetime
+from typing import Protocol
+from uuid import UUID
+
 from ..models.intent import Intent
 from ..models.message import Message
 
+
 class IntentRepository(Protocol):
     async def save_intent(self, intent: Intent) -> None:
         ...
 
-    async def get_intent(self, intent_id: str) -> Optional[Intent]:
+    async def get_intent(self, intent_id: str) -> Intent | None:
+        ...
+
+    async def get_intents(self, intent_ids: list[str]) -> list[Intent | None]:
         ...
 
-    async def find_nearby(self, lat: float, lon: float, radius_km: float = 1.0, limit: int = 50) -> List[Intent]:
+    async def find_nearby(self, lat: float, lon: float, radius_km: float = 1.0, limit: int = 50) -> list[Intent]:
         ...
         
-    async def get_clusters(self, lat: float, lon: float, radius_km: float = 10.0) -> List[dict]:
+    async def get_clusters(self, lat: float, lon: float, radius_km: float = 10.0) -> list[dict]:
         ...
 
     async def flag_intent(self, intent_id: UUID) -> int:
@@ -27,14 +32,25 @@ class JoinRepository(Protocol):
     async def save_join(self, intent_id: UUID, user_id: UUID) -> bool:
         ...
         
-    async def is_member(self, intent_id: UUID, user_id: UUID) -> bool:
+    async def is_member(self, intent_id: UUID, user_id: UUID, primary: bool = False) -> bool:
+        ...
+
+    async def get_joined_intents(self, user_id: UUID) -> list[str]:
         ...
 
 class MessageRepository(Protocol):
     async def save_message(self, message: Message) -> None:
         ...
         
-    async def get_messages(self, intent_id: UUID, limit: int = 50) -> List[Message]:
+    async def get_messages(
+        self, intent_id: UUID, limit: int = 50, since: datetime | None = None
+    ) -> list[Message]:
+        ...
+
+    async def get_version(self, intent_id: UUID) -> int:
+        ...
+
+    async def get_posted_intents(self, user_id: UUID) -> list[str]:
         ...
 
 class MetricsRepository(Protocol):
@@ -1,38 +1,111 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-import json
-import contextvars
-from datetime import datetime, timezone
+import time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 # Context var for request-scoped correlation ID
 request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
 
+# Access log records go through their own logger so they can be sampled/silenced separately
+access_logger = logging.getLogger("nowhere.access")
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _dumps(obj: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
 
 class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line. Runs on the listener thread, so it reads the
+    request ID stamped on the record at emit time, not the context var.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # Timestamps: render the second once, then only append milliseconds
+        self._last_second = -1
+        self._second_prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._last_second:
+            self._last_second = second
+            self._second_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._second_prefix}.{int((created - second) * 1000):03d}+00:00"
+
     def format(self, record):
         log_obj = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
             "func": record.funcName,
-            "request_id": request_id_var.get("-"),
+            "request_id": getattr(record, "request_id", None) or request_id_var.get("-"),
         }
 
         if record.exc_info:
             log_obj["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_obj)
+        return _dumps(log_obj)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records without formatting them on the event loop.
+    Only the request ID (a context var, invisible from the listener thread)
+    is captured eagerly; message interpolation and JSON encoding happen on
+    the writer thread.
+    """
+
+    def prepare(self, record):
+        record.request_id = request_id_var.get("-")
+        return record
 
 
 def configure_logging():
+    """
+    Route all logging through a queue to a single writer thread so that
+    formatting and stdout writes never block the event loop.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
     root = logging.getLogger()
     root.setLevel(logging.INFO)
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JSONFormatter())
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JSONFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
 
     root.handlers = []
-    root.addHandler(handler)
+    root.addHandler(ContextQueueHandler(log_queue))
 
     logging.getLogger("uvicorn.access").disabled = True
+
+
+def flush_logging():
+    """Stop the writer thread after draining the queue (idempotent)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(flush_logging)
@@ -0,0 +1,158 @@
+"""
+In-process Prometheus instrumentation. Nothing here touches Redis: samples
+are aggregated in memory and rendered on scrape.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py) before
+the app is imported; each worker then writes its samples to mmap files and
+`render_metrics` merges them with a MultiProcessCollector.
+"""
+import functools
+import inspect
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+
+# Latency buckets tuned for a Redis-backed API: sub-ms to a couple of seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "nowhere_http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REDIS_CALL_SECONDS = Histogram(
+    "nowhere_redis_call_duration_seconds",
+    "Latency of repository methods backed by Redis",
+    ["repository", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Only fed when REDIS_TRACE_ENABLED (see infra/persistence/tracing.py)
+REDIS_COMMAND_SECONDS = Histogram(
+    "nowhere_redis_command_duration_seconds",
+    "Wire latency of individual Redis commands by key pattern",
+    ["command", "pattern"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REDIS_POOL_WAIT_SECONDS = Histogram(
+    "nowhere_redis_pool_wait_seconds",
+    "Time spent waiting for a pooled Redis connection (includes connecting)",
+    ["role"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# livesum: under gunicorn, the fleet-wide value is the sum over live workers
+REDIS_POOL_IN_USE = Gauge(
+    "nowhere_redis_pool_in_use",
+    "Redis connections currently checked out of the pool",
+    ["role"],
+    multiprocess_mode="livesum",
+)
+
+REDIS_POOL_MAX = Gauge(
+    "nowhere_redis_pool_max_connections",
+    "Configured Redis pool size",
+    ["role"],
+    multiprocess_mode="livesum",
+)
+
+WS_CONNECTIONS = Gauge(
+    "nowhere_ws_connections",
+    "Open WebSocket connections held by the connection manager",
+    multiprocess_mode="livesum",
+)
+
+# Updated by auth/jwt.py's VerifiedTokenCache, so they survive multiprocess mode
+JWT_CACHE_LOOKUPS = Counter(
+    "nowhere_jwt_cache_lookups",
+    "Verified-token cache lookups by result",
+    ["result"],
+)
+
+JWT_CACHE_SIZE = Gauge(
+    "nowhere_jwt_cache_size",
+    "Entries in the verified-token cache",
+    multiprocess_mode="livesum",
+)
+
+EVENT_HANDLER_SECONDS = Histogram(
+    "nowhere_event_handler_duration_seconds",
+    "Event bus handler duration",
+    ["event", "handler"],
+    buckets=LATENCY_BUCKETS,
+)
+
+EVENTS_PUBLISHED = Counter(
+    "nowhere_events_published",
+    "Domain events published on the event bus",
+    ["event"],
+)
+
+
+def route_label(scope: dict) -> str:
+    """Route template (e.g. /intents/{intent_id}/join) to keep label cardinality bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def instrument_repository(name: str):
+    """
+    Class decorator: time every public coroutine method of a repository into
+    REDIS_CALL_SECONDS{repository=name, method=...}. Inside a unit of work the
+    write client is a pipeline, so those samples measure queueing, not I/O.
+    """
+    def decorate(cls):
+        for attr, fn in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.iscoroutinefunction(fn):
+                continue
+            setattr(cls, attr, _timed(fn, REDIS_CALL_SECONDS.labels(name, attr)))
+        return cls
+    return decorate
+
+
+def _timed(fn, histogram):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+
+def render_metrics(extra: list[GaugeMetricFamily] | None = None) -> tuple[bytes, str]:
+    """Prometheus text exposition of all collectors plus any scrape-time gauges."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    output = generate_latest(registry)
+    if extra:
+        scrape_registry = CollectorRegistry()
+        scrape_registry.register(_StaticCollector(extra))
+        output += generate_latest(scrape_registry)
+    return output, CONTENT_TYPE_LATEST
+
+
+class _StaticCollector:
+    def __init__(self, families):
+        self._families = families
+
+    def collect(self):
+        return iter(self._families)
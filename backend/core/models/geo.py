@@ -1,2 +1,239 @@
+from collections.abc import Hashable, Iterable, Iterator
+from math import asin, cos, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.195
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
 def round_coord(val: float, precision: int = 3) -> float:
     return round(val, precision)
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 6) -> str:
+    """Standard base32 geohash; 6 chars is a ~1.2 x 0.6 km cell."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars = []
+    bits = value = 0
+    even = True  # bits alternate lon, lat, starting with lon
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            bit = lon >= mid
+            lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            bit = lat >= mid
+            lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+        value = (value << 1) | bit
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def geohash_cells_around(lat: float, lon: float, precision: int = 6) -> list[str]:
+    """
+    Geohash cell of (lat, lon) followed by its neighbours: a 3 x 3 block
+    reaching at least one cell past the point in every direction. Wraps the
+    antimeridian; rows past a pole are left out.
+    """
+    lon_bits = (5 * precision + 1) // 2
+    lat_step = 180.0 / 2 ** (5 * precision - lon_bits)
+    lon_step = 360.0 / 2 ** lon_bits
+    cells: dict[str, None] = {}
+    for dlat in (0, -1, 1):
+        row = lat + dlat * lat_step
+        if not -90.0 <= row <= 90.0:
+            continue
+        for dlon in (0, -1, 1):
+            col = (lon + dlon * lon_step + 180.0) % 360.0 - 180.0
+            cells[geohash_encode(row, col, precision)] = None
+    return list(cells)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km (same model Redis GEO uses, within ~0.5%)."""
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+class _Circle:
+    """
+    Point-in-circle test without asin/sqrt: distance <= r  <=>  the haversine
+    term a <= sin²(r / 2R), so the right-hand side is computed once here.
+    """
+
+    __slots__ = ("cells", "cos_lat", "lat", "lon", "threshold")
+
+    def __init__(self, lat: float, lon: float, radius_km: float):
+        self.lat = radians(lat)
+        self.lon = radians(lon)
+        self.cos_lat = cos(self.lat)
+        half_angle = min(radius_km / (2 * EARTH_RADIUS_KM), 1.5707963267948966)
+        self.threshold = sin(half_angle) ** 2
+        self.cells: list[tuple[int, int]] = []
+
+    def contains(self, lat: float, lon: float, cos_lat: float) -> bool:
+        # lat/lon in radians, cos_lat precomputed by the caller (once per point)
+        a = sin((lat - self.lat) / 2) ** 2 + self.cos_lat * cos_lat * sin((lon - self.lon) / 2) ** 2
+        return a <= self.threshold
+
+
+class _Rect:
+    """Lat/lon box; west > east means it crosses the antimeridian."""
+
+    __slots__ = ("cells", "east", "north", "south", "west")
+
+    def __init__(self, south: float, west: float, north: float, east: float):
+        self.south, self.north = radians(south), radians(north)
+        self.west, self.east = radians(west), radians(east)
+        self.cells: list[tuple[int, int]] = []
+
+    def contains(self, lat: float, lon: float, cos_lat: float) -> bool:
+        if not self.south <= lat <= self.north:
+            return False
+        if self.west <= self.east:
+            return self.west <= lon <= self.east
+        return lon >= self.west or lon <= self.east
+
+
+class SpatialIndex:
+    """
+    In-memory index of keyed circles and rectangles answering "which shapes
+    contain this point". Shapes are registered in every cell of a uniform
+    lat/lon grid that their bounding box touches; a point query reads one
+    cell and tests only the shapes in it, so cost follows local density
+    rather than the total number of shapes. `query_many` groups points by
+    cell so each cell is looked up once per batch.
+
+    Cell size trades memory for precision: a shape spans
+    ~(extent / cell)² cells, a query tests every shape in its cell. The
+    default 0.1° (~11 km) suits viewports of 0.1-50 km.
+    """
+
+    def __init__(self, cell_deg: float = 0.1):
+        self.cell_deg = cell_deg
+        self._lon_cells = round(360 / cell_deg)
+        self._cells: dict[tuple[int, int], dict[Hashable, None]] = {}  # ordered set per cell
+        self._shapes: dict[Hashable, _Circle | _Rect] = {}
+
+    def __len__(self) -> int:
+        return len(self._shapes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._shapes
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return int((lat + 90) // self.cell_deg), int((lon + 180) // self.cell_deg) % self._lon_cells
+
+    def _box_cells(self, south: float, west: float, north: float, east: float) -> Iterator[tuple[int, int]]:
+        """Cells touched by a box; east < west wraps the antimeridian."""
+        row_min = self._cell(max(-90.0, south), -180.0)[0]
+        row_max = self._cell(min(90.0, north), -180.0)[0]
+        if east < west:
+            east += 360
+        col_min = int((west + 180) // self.cell_deg)
+        col_max = int((east + 180) // self.cell_deg)
+        if col_max - col_min + 1 >= self._lon_cells:
+            cols: Iterable[int] = range(self._lon_cells)
+        else:
+            cols = [c % self._lon_cells for c in range(col_min, col_max + 1)]
+        for row in range(row_min, row_max + 1):
+            for col in cols:
+                yield row, col
+
+    def _circle_cells(self, lat: float, lon: float, radius_km: float) -> Iterator[tuple[int, int]]:
+        dlat = radius_km / KM_PER_DEG_LAT
+        south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        # Widest longitude span is at the latitude edge nearest a pole
+        cos_edge = cos(radians(max(abs(south), abs(north))))
+        if cos_edge < 1e-6 or radius_km / (KM_PER_DEG_LAT * cos_edge) >= 180:
+            return self._box_cells(south, -180.0, north, 180.0)
+        dlon = radius_km / (KM_PER_DEG_LAT * cos_edge)
+        return self._box_cells(south, lon - dlon, north, lon + dlon)
+
+    def _register(self, key: Hashable, shape: _Circle | _Rect, cells: Iterable[tuple[int, int]]) -> None:
+        if key in self._shapes:
+            self.remove(key)
+        shape.cells = list(dict.fromkeys(cells))
+        for cell in shape.cells:
+            self._cells.setdefault(cell, {})[key] = None
+        self._shapes[key] = shape
+
+    def insert_circle(self, key: Hashable, lat: float, lon: float, radius_km: float) -> None:
+        """Add or replace the shape under `key` with a circle."""
+        self._register(key, _Circle(lat, lon, radius_km), self._circle_cells(lat, lon, radius_km))
+
+    def insert_rect(self, key: Hashable, south: float, west: float, north: float, east: float) -> None:
+        """Add or replace the shape under `key` with a box (west > east crosses the antimeridian)."""
+        self._register(key, _Rect(south, west, north, east), self._box_cells(south, west, north, east))
+
+    def remove(self, key: Hashable) -> None:
+        shape = self._shapes.pop(key, None)
+        if shape is None:
+            return
+        for cell in shape.cells:
+            members = self._cells.get(cell)
+            if members is not None:
+                members.pop(key, None)
+                if not members:
+                    del self._cells[cell]
+
+    def query(self, lat: float, lon: float) -> list[Hashable]:
+        """Keys of all shapes containing (lat, lon)."""
+        members = self._cells.get(self._cell(lat, lon))
+        if not members:
+            return []
+        lat_r, lon_r = radians(lat), radians(lon)
+        cos_lat = cos(lat_r)
+        shapes = self._shapes
+        return [key for key in members if shapes[key].contains(lat_r, lon_r, cos_lat)]
+
+    def query_many(self, points: Iterable[tuple[float, float]]) -> list[list[Hashable]]:
+        """
+        `query` for each point, in order. Points are grouped by cell so each
+        cell's shapes are read once per batch, and circle tests are inlined
+        rather than dispatched per shape. Not vectorized with NumPy: a
+        batch is one feed tick (at most a few hundred events) spread over
+        many cells, each with a handful of shapes, so the cost is in the
+        dict lookups and grouping rather than in the arithmetic.
+        """
+        points = list(points)
+        results: list[list[Hashable]] = [[] for _ in points]
+        by_cell: dict[tuple[int, int], list[int]] = {}
+        for i, (lat, lon) in enumerate(points):
+            by_cell.setdefault(self._cell(lat, lon), []).append(i)
+
+        shapes = self._shapes
+        for cell, indexes in by_cell.items():
+            members = self._cells.get(cell)
+            if not members:
+                continue
+            if len(indexes) == 1:
+                lat, lon = points[indexes[0]]
+                results[indexes[0]] = self.query(lat, lon)
+                continue
+            candidates = []
+            for key in members:
+                shape = shapes[key]
+                if type(shape) is _Circle:
+                    candidates.append((key, shape.lat, shape.lon, shape.cos_lat, shape.threshold, None))
+                else:
+                    candidates.append((key, 0.0, 0.0, 0.0, 0.0, shape))
+            for i in indexes:
+                lat, lon = points[i]
+                lat_r, lon_r = radians(lat), radians(lon)
+                cos_lat = cos(lat_r)
+                hits = results[i]
+                for key, c_lat, c_lon, c_cos, threshold, rect in candidates:
+                    if rect is None:
+                        if sin((lat_r - c_lat) / 2) ** 2 + c_cos * cos_lat * sin((lon_r - c_lon) / 2) ** 2 <= threshold:
+                            hits.append(key)
+                    elif rect.contains(lat_r, lon_r, cos_lat):
+                        hits.append(key)
+        return results
@@ -1,9 +1,17 @@
-from datetime import datetime, timezone
+from datetime import UTC, datetime
+from math import log1p
+from typing import Any
 from uuid import UUID, uuid4
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-import re
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
+
 from ..exceptions import InvalidAction
 
+# Unverified intents (0 joins, not system) are only shown this close
+UNVERIFIED_RADIUS_KM = 0.2
+# Intents flagged this many times are hidden from every listing
+MAX_VISIBLE_FLAGS = 3
+
 class Intent(BaseModel):
     model_config = ConfigDict(frozen=True)
 
@@ -16,8 +24,30 @@ class Intent(BaseModel):
     created_at: datetime
     is_system: bool = False
     join_count: int = 0
+    online_count: int = 0  # live WebSocket presence, hydrated on read
     flags: int = 0
 
+    # Request-independent ranking inputs, computed once at hydration (not serialized)
+    _created_ts: float = PrivateAttr(default=0.0)
+    _log_popularity: float = PrivateAttr(default=0.0)
+
+    def model_post_init(self, context: Any) -> None:
+        created_at = self.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=UTC)
+        self._created_ts = created_at.timestamp()
+        self._log_popularity = log1p(self.join_count)
+
+    @property
+    def created_ts(self) -> float:
+        """created_at as epoch seconds (naive datetimes are taken as UTC)."""
+        return self._created_ts
+
+    @property
+    def log_popularity(self) -> float:
+        """log1p(join_count)."""
+        return self._log_popularity
+
     @field_validator('latitude', 'longitude', mode='before')
     @classmethod
     def round_coordinates(cls, v: float) -> float:
@@ -49,14 +79,24 @@ class Intent(BaseModel):
         """
         if count < 0:
             raise InvalidAction("Join count cannot be negative")
-        return self.model_copy(update={"join_count": count})
+        intent = self.model_copy(update={"join_count": count})
+        intent._log_popularity = log1p(count)
+        return intent
+
+    def with_counts(self, join_count: int, online_count: int) -> "Intent":
+        """
+        Returns a new instance with updated join and online counts.
+        """
+        if join_count < 0 or online_count < 0:
+            raise InvalidAction("Counts cannot be negative")
+        intent = self.model_copy(update={"join_count": join_count, "online_count": online_count})
+        intent._log_popularity = log1p(join_count)
+        return intent
 
     def is_visible(self, distance_km: float) -> bool:
         """
         Determines if the intent is visible at a given distance.
         Unverified intents (0 joins) are only visible within 200m.
         """
-        if self.join_count == 0 and not self.is_system and distance_km > 0.2:
-            return False
-        return True
+        return self.join_count > 0 or self.is_system or distance_km <= UNVERIFIED_RADIUS_KM
 
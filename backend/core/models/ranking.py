@@ -1,37 +1,217 @@
-from datetime import datetime, timezone
-from math import log1p
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime
+from math import log, log1p
+from typing import NamedTuple
+
 from .intent import Intent
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speedup
+    np = None
+
+# Below this many candidates NumPy's array conversions cost more than the scoring loop
+NUMPY_MIN_CANDIDATES = 200
+# log1p of small counts (joins, people online), looked up rather than recomputed per candidate
+_LOG1P_COUNTS = tuple(log1p(n) for n in range(1024))
+
+
+def log1p_count(n: int) -> float:
+    return _LOG1P_COUNTS[n] if n < len(_LOG1P_COUNTS) else log1p(n)
+
+
+def score_terms(intent: Intent) -> tuple[float, float]:
+    """The request-independent score inputs of an intent, cached on it at hydration."""
+    return intent.created_ts, intent.log_popularity
+
+
+class ScoreWeights(NamedTuple):
+    w_dist: float = 1.0
+    w_fresh: float = 2.0
+    w_pop: float = 0.5
+    w_online: float = 0.0
+    w_area: float = 0.0
+    decay_seconds: int = 86400
+
+
+class CandidateBatch(NamedTuple):
+    """Score inputs of a set of candidates as parallel arrays, one entry per intent."""
+
+    created_ts: Sequence[float]
+    log_pop: Sequence[float]
+    dist_km: Sequence[float]
+    online_count: Sequence[int]
+    area_activity: Sequence[float] | None = None
+
+    @classmethod
+    def from_pairs(
+        cls, pairs: Sequence[tuple[Intent, float]], area_activity: Sequence[float] | None = None
+    ) -> "CandidateBatch":
+        return cls(
+            [intent.created_ts for intent, _ in pairs],
+            [intent.log_popularity for intent, _ in pairs],
+            [dist_km for _, dist_km in pairs],
+            [intent.online_count for intent, _ in pairs],
+            area_activity,
+        )
+
+
+def linear_scores(
+    created_ts: Sequence[float],
+    log_pop: Sequence[float],
+    dist_km: Sequence[float],
+    online_count: Sequence[int],
+    area_activity: Sequence[float] | None,
+    now_ts: float,
+    radius_km: float = 1.0,
+    w_dist: float = 1.0,
+    w_fresh: float = 2.0,
+    w_pop: float = 0.5,
+    decay_seconds: int = 86400,
+    w_online: float = 0.0,
+    w_area: float = 0.0,
+) -> list[float]:
+    """
+    `calculate_score` over parallel arrays of candidates. The parts that
+    depend on the request are folded into constants first, using
+    1 - (now - created) / decay == (created - (now - decay)) / decay,
+    so each candidate costs a few float ops and table lookups. With NumPy,
+    batches of NUMPY_MIN_CANDIDATES or more are scored as arrays.
+    """
+    if np is not None and len(dist_km) >= NUMPY_MIN_CANDIDATES:
+        return _linear_scores_numpy(
+            created_ts, log_pop, dist_km, online_count, area_activity, now_ts,
+            radius_km, w_dist, w_fresh, w_pop, decay_seconds, w_online, w_area,
+        )
+    inv_radius = 1.0 / radius_km
+    cutoff = now_ts - decay_seconds
+    inv_decay = 1.0 / decay_seconds
+    table, size = _LOG1P_COUNTS, len(_LOG1P_COUNTS)
+    scores = []
+    for created, pop, dist, online in zip(created_ts, log_pop, dist_km, online_count, strict=True):
+        dist_score = 1.0 - dist * inv_radius
+        freshness_score = (created - cutoff) * inv_decay
+        scores.append(
+            # Inline clamps: a max() call costs ~10x the conditional expression
+            w_dist * (dist_score if dist_score > 0.0 else 0.0)  # noqa: FURB136
+            + w_fresh * (freshness_score if freshness_score > 0.0 else 0.0)  # noqa: FURB136
+            + w_pop * pop
+            + w_online * (table[online] if online < size else log1p(online))
+        )
+    if area_activity is not None and w_area:
+        scores = [score + w_area * log1p(activity) for score, activity in zip(scores, area_activity, strict=True)]
+    return scores
+
+
+def _linear_scores_numpy(
+    created_ts, log_pop, dist_km, online_count, area_activity, now_ts,
+    radius_km, w_dist, w_fresh, w_pop, decay_seconds, w_online, w_area,
+) -> list[float]:
+    """`linear_scores` over NumPy arrays."""
+    created = np.asarray(created_ts, dtype=np.float64)
+    scores = (
+        w_dist * np.maximum(0.0, 1.0 - np.asarray(dist_km, dtype=np.float64) / radius_km)
+        + w_fresh * np.maximum(0.0, (created - (now_ts - decay_seconds)) / decay_seconds)
+        + w_pop * np.asarray(log_pop, dtype=np.float64)
+        + w_online * np.log1p(np.asarray(online_count, dtype=np.float64))
+    )
+    if area_activity is not None and w_area:
+        scores += w_area * np.log1p(np.asarray(area_activity, dtype=np.float64))
+    return scores.tolist()
+
 
 def calculate_score(
     intent: Intent,
     dist_km: float,
     radius_km: float = 1.0,
-    now: datetime = None,
+    now: datetime | None = None,
     w_dist: float = 1.0,
     w_fresh: float = 2.0,
     w_pop: float = 0.5,
     decay_seconds: int = 86400,
+    w_online: float = 0.0,
+    area_activity: float = 0.0,
+    w_area: float = 0.0,
 ) -> float:
     """
-    Calculates Liveness Score based on Distance, Freshness (Time Decay), and Popularity.
+    Calculates Liveness Score based on Distance, Freshness (Time Decay),
+    Popularity, Presence (people in the room right now) and Area popularity
+    (decayed activity of the intent's geohash cell).
     Weights and decay window are configurable.
     """
     if now is None:
-        now = datetime.now(timezone.utc)
+        now = datetime.now(UTC)
+
+    created_ts, log_pop = score_terms(intent)
+    return linear_scores(
+        [created_ts], [log_pop], [dist_km], [intent.online_count], [area_activity], now.timestamp(),
+        radius_km, w_dist, w_fresh, w_pop, decay_seconds, w_online, w_area,
+    )[0]
+
+
+# A ranking strategy scores a whole batch at once: (batch, now_ts, radius_km, weights) -> scores
+RankingStrategy = Callable[[CandidateBatch, float, float, ScoreWeights], list[float]]
 
-    # 1. Distance Score (0 to 1, 1 is closest)
-    dist_score = max(0, 1.0 - (dist_km / radius_km))
+# Distance offset of the gravity model, so the nearest intents don't dominate without bound
+GRAVITY_SOFTENING_KM = 0.1
+# Freshness floor of the gravity model: intents past the decay window keep a little mass
+GRAVITY_FRESH_FLOOR = 0.1
+
+
+def linear_strategy(batch: CandidateBatch, now_ts: float, radius_km: float, weights: ScoreWeights) -> list[float]:
+    """The weighted sum of `calculate_score`."""
+    return linear_scores(
+        batch.created_ts, batch.log_pop, batch.dist_km, batch.online_count, batch.area_activity, now_ts,
+        radius_km, weights.w_dist, weights.w_fresh, weights.w_pop, weights.decay_seconds,
+        weights.w_online, weights.w_area,
+    )
+
+
+def distance_strategy(batch: CandidateBatch, now_ts: float, radius_km: float, weights: ScoreWeights) -> list[float]:
+    """Nearest first; nothing else counts."""
+    return [-dist for dist in batch.dist_km]
+
+
+def gravity_strategy(batch: CandidateBatch, now_ts: float, radius_km: float, weights: ScoreWeights) -> list[float]:
+    """
+    Gravity model: mass / (distance + softening)^(2 w_dist), where mass is
+    (joins + 1)^w_pop (online + 1)^w_online (freshness + floor)^w_fresh.
+    Pull falls off with distance instead of ending at the search radius.
+    Scored as the log of that, which ranks the same.
+    """
+    if np is not None and len(batch.dist_km) >= NUMPY_MIN_CANDIDATES:
+        return _gravity_numpy(batch, now_ts, weights)
+    cutoff = now_ts - weights.decay_seconds
+    inv_decay = 1.0 / weights.decay_seconds
+    w_dist, w_fresh, w_pop, w_online = 2.0 * weights.w_dist, weights.w_fresh, weights.w_pop, weights.w_online
+    scores = []
+    for created, pop, dist, online in zip(batch.created_ts, batch.log_pop, batch.dist_km, batch.online_count, strict=True):
+        freshness_score = (created - cutoff) * inv_decay
+        scores.append(
+            w_pop * pop + w_online * log1p_count(online)
+            + w_fresh * log(GRAVITY_FRESH_FLOOR + (freshness_score if freshness_score > 0.0 else 0.0))  # noqa: FURB136
+            - w_dist * log(dist + GRAVITY_SOFTENING_KM)
+        )
+    return scores
 
-    # 2. Freshness Score (Decay over configured window)
-    created_at = intent.created_at
-    if created_at.tzinfo is None:
-        created_at = created_at.replace(tzinfo=timezone.utc)
 
-    age_seconds = (now - created_at).total_seconds()
-    freshness_score = max(0, 1.0 - (age_seconds / decay_seconds))
+def _gravity_numpy(batch: CandidateBatch, now_ts: float, weights: ScoreWeights) -> list[float]:
+    """`gravity_strategy` over NumPy arrays."""
+    created = np.asarray(batch.created_ts, dtype=np.float64)
+    freshness = np.maximum(0.0, (created - (now_ts - weights.decay_seconds)) / weights.decay_seconds)
+    return (
+        weights.w_pop * np.asarray(batch.log_pop, dtype=np.float64)
+        + weights.w_online * np.log1p(np.asarray(batch.online_count, dtype=np.float64))
+        + weights.w_fresh * np.log(GRAVITY_FRESH_FLOOR + freshness)
+        - 2.0 * weights.w_dist * np.log(np.asarray(batch.dist_km, dtype=np.float64) + GRAVITY_SOFTENING_KM)
+    ).tolist()
 
-    # 3. Popularity Score (Logarithmic)
-    pop_score = log1p(intent.join_count)
 
-    return (w_dist * dist_score) + (w_fresh * freshness_score) + (w_pop * pop_score)
+# Strategies selectable by name (RANKING_STRATEGY, RANKING_EXPERIMENT, ?ranking=).
+# "learned" is the linear formula over RANKING_LEARNED_WEIGHTS, fitted offline.
+RANKING_STRATEGIES: dict[str, RankingStrategy] = {
+    "linear": linear_strategy,
+    "distance": distance_strategy,
+    "gravity": gravity_strategy,
+    "learned": linear_strategy,
+}
@@ -0,0 +1,29 @@
+# ruff: noqa: N999 - gunicorn looks for *.conf.py; this is not an importable module
+"""
+Gunicorn config for multi-worker deployments:
+
+    gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+Prometheus metrics are aggregated across workers through mmap files in
+PROMETHEUS_MULTIPROC_DIR, which must be set before any worker imports the app.
+"""
+import os
+import shutil
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/nowhere-prometheus")
+
+
+def on_starting(server):
+    # Stale files from a previous run would be merged into the new totals
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
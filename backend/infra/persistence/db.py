@@ -1,27 +1,48 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+
 from backend.config import settings
-import logging
 
 logger = logging.getLogger(__name__)
 
-# Engine with production-ready pool configuration
-engine = create_async_engine(
-    settings.POSTGRES_DSN,
-    echo=False,
-    pool_size=10,
-    max_overflow=20,
-    pool_timeout=10,
-    pool_recycle=3600,
-    pool_pre_ping=True,
-)
+# Created on first use: importing this module must not open a pool
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
 
-# Session Factory
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-    class_=AsyncSession,
-)
+
+def get_engine() -> AsyncEngine:
+    """Engine with production-ready pool configuration."""
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.POSTGRES_DSN,
+            echo=False,
+            pool_size=10,
+            max_overflow=20,
+            pool_timeout=10,
+            pool_recycle=3600,
+            pool_pre_ping=True,
+        )
+    return _engine
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(
+            bind=get_engine(),
+            expire_on_commit=False,
+            class_=AsyncSession,
+        )
+    return _sessionmaker
 
 
 class Base(DeclarativeBase):
@@ -29,19 +50,26 @@ class Base(DeclarativeBase):
 
 
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with get_sessionmaker()() as session:
         yield session
 
 
-import asyncio
-
-
 async def init_db():
+    from . import models  # noqa: F401 - registers tables on Base.metadata
+
     logger.info("Initializing Database...")
     try:
         async with asyncio.timeout(3.0):
-            async with engine.begin() as conn:
+            async with get_engine().begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
         logger.info("Database tables initialized.")
     except Exception as e:
         logger.warning("Failed to initialize DB: %s", e)
+
+
+async def dispose_engine():
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _sessionmaker = None
@@ -0,0 +1,81 @@
+import logging
+import time
+from collections.abc import Iterable
+from typing import NamedTuple
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from backend.core.metrics import instrument_repository
+from backend.core.models.geo import geohash_encode
+
+from .keys import RedisKeys
+from .lua_scripts import LuaScripts
+
+logger = logging.getLogger(__name__)
+
+DENSITY_FIELDS = ("creates", "joins", "messages")
+# Idle areas are dropped once their counters have decayed to ~1/256
+_TTL_HALF_LIVES = 8
+
+
+class AreaDensity(NamedTuple):
+    """Decayed activity counters of one geohash cell."""
+
+    creates: float = 0.0
+    joins: float = 0.0
+    messages: float = 0.0
+
+    @property
+    def activity(self) -> float:
+        return self.creates + self.joins + self.messages
+
+
+@instrument_repository("density")
+class DensityRepository:
+    def __init__(self, redis: Redis, reader: Redis | None = None, half_life_seconds: int = 3600, precision: int = 6):
+        """
+        :param redis: Write client (must be Redis instance, not a pipeline)
+        :param reader: Read client (must be Redis instance)
+        """
+        self.redis = redis
+        self.reader = reader or redis
+        self.half_life = half_life_seconds
+        self.precision = precision
+
+    def cell(self, lat: float, lon: float) -> str:
+        return geohash_encode(lat, lon, self.precision)
+
+    async def record(self, intent_id: UUID | str, field: str, now: float | None = None) -> bool:
+        """
+        Count one `field` event in the area of an intent, in one script call
+        that also finds the area. False if the intent has left the geo index.
+        """
+        now = time.time() if now is None else now
+        value = await self.redis.eval(
+            LuaScripts.RECORD_AREA_ACTIVITY, 2, RedisKeys.intent_geo(), RedisKeys.intent_geo_unverified(),
+            str(intent_id), field, now, self.half_life, self.half_life * _TTL_HALF_LIVES, self.precision,
+        )
+        return value is not None
+
+    async def get(self, lat: float, lon: float, now: float | None = None) -> AreaDensity:
+        cell = self.cell(lat, lon)
+        return (await self.get_many([cell], now))[cell]
+
+    async def get_many(self, geohashes: Iterable[str], now: float | None = None) -> dict[str, AreaDensity]:
+        """Counters of each area decayed to `now`, in one round trip; unknown areas are zero."""
+        geohashes = list(dict.fromkeys(geohashes))
+        if not geohashes:
+            return {}
+        now = time.time() if now is None else now
+        pipe = self.reader.pipeline(transaction=False)
+        for geohash in geohashes:
+            pipe.hmget(RedisKeys.area_hash(geohash), *DENSITY_FIELDS, "at")
+        densities = {}
+        for geohash, (*values, at) in zip(geohashes, await pipe.execute(), strict=True):
+            if at is None:
+                densities[geohash] = AreaDensity()
+                continue
+            factor = 0.5 ** (max(0.0, now - float(at)) / self.half_life)
+            densities[geohash] = AreaDensity(*(float(v or 0) * factor for v in values))
+        return densities
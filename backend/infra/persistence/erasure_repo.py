@@ -0,0 +1,52 @@
+import logging
+from typing import NamedTuple
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from backend.core.metrics import instrument_repository
+
+from .keys import RedisKeys
+from .lua_scripts import LuaScripts
+
+logger = logging.getLogger(__name__)
+
+# Actions guarded by RateLimiter / DynamicRateLimiter (identity:{id}:limits:{action})
+RATE_LIMITED_ACTIONS = ("create_intent", "join", "message", "flag")
+
+
+class ErasureResult(NamedTuple):
+    keys_deleted: int
+    memberships_removed: int
+    messages_removed: int
+
+
+@instrument_repository("erasure")
+class ErasureRepository:
+    def __init__(self, redis: Redis):
+        """
+        :param redis: Write client (must be Redis instance, not a pipeline)
+        """
+        self.redis = redis
+
+    async def erase_user(self, user_id: UUID | str) -> ErasureResult:
+        """
+        Remove everything tied to a user in a single ERASE_USER call: their
+        intents (data, messages, joins, flaggers, presence, geo and expiry
+        entries), identity-scoped keys and reverse indexes, and their joins,
+        presence, flags and messages in the intents those indexes point at.
+        """
+        uid = str(user_id)
+        keys = [
+            RedisKeys.user_intents(uid),
+            RedisKeys.intent_geo(),
+            RedisKeys.intent_geo_unverified(),
+            RedisKeys.expiry_queue(),
+            RedisKeys.user_joined(uid),
+            RedisKeys.user_posted(uid),
+            RedisKeys.user_flagged(uid),
+            RedisKeys.spam_last_hash(uid),
+            *(RedisKeys.rate_limit(uid, action) for action in RATE_LIMITED_ACTIONS),
+        ]
+        deleted, memberships, messages = await self.redis.eval(LuaScripts.ERASE_USER, len(keys), *keys, uid)
+        return ErasureResult(int(deleted), int(memberships), int(messages))
@@ -1,8 +1,11 @@
 import json
 import logging
 from typing import List
+
 from redis.asyncio import Redis
+
 from backend.core.events import DomainEvent
+from backend.core.metrics import instrument_repository
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +13,7 @@ STREAM_KEY = "nowhere:events"
 MAX_STREAM_LEN = 10000
 
 
+@instrument_repository("event_store")
 class RedisEventStore:
     """Persists domain events to a Redis Stream for auditing and replay."""
 
@@ -25,7 +29,7 @@ class RedisEventStore:
         entry_id = await self.redis.xadd(
             STREAM_KEY, payload, maxlen=MAX_STREAM_LEN, approximate=True
         )
-        logger.debug(f"Event persisted: {type(event).__name__} -> {entry_id}")
+        logger.debug("Event persisted: %s -> %s", type(event).__name__, entry_id)
         return entry_id
 
     async def read_since(self, last_id: str = "0-0", count: int = 100) -> List[dict]:
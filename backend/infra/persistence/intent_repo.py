@@ -1,20 +1,30 @@
-from datetime import datetime, timedelta, timezone
+import json
 import logging
+import time
+from datetime import datetime, timedelta, timezone
+from math import sqrt
 from uuid import UUID
-from backend.core.models.intent import Intent
-from backend.infra.persistence.redis import RedisClient, get_redis_client
-from .keys import RedisKeys
+
 from fastapi import Depends
 from redis.asyncio import Redis
+
+from backend.core.metrics import instrument_repository
+from backend.core.models.intent import MAX_VISIBLE_FLAGS, UNVERIFIED_RADIUS_KM, Intent
+from backend.infra.persistence.redis import RedisClient, get_redis_client
+
 from .keys import RedisKeys
-from backend.core.models.intent import Intent
 from .lua_scripts import LuaScripts
-import json
-import logging
+from .presence_repo import queue_online_count
+
 logger = logging.getLogger(__name__)
 
 INTENT_TTL_SECONDS = 24 * 60 * 60 # 24h
+# find_nearby searches in rings: the first ring is this wide, and GEOSEARCH
+# COUNT may grow up to limit * NEARBY_MAX_FETCH_FACTOR in dense areas
+NEARBY_START_RADIUS_KM = 2.0
+NEARBY_MAX_FETCH_FACTOR = 8
 
+@instrument_repository("intent")
 class IntentRepository:
     def __init__(self, redis: Redis = Depends(get_redis_client), reader: Redis | None = None):
         """
@@ -30,8 +40,13 @@ class IntentRepository:
         data = intent.model_dump_json()
         await self.redis.set(key, data, ex=INTENT_TTL_SECONDS)
         
-        # Add to geo index
-        await self.redis.geoadd(RedisKeys.intent_geo(), (intent.longitude, intent.latitude, str(intent.id)))
+        # Add to geo index: verified tier if visible at any distance,
+        # unverified until SAVE_JOIN promotes it on the first join
+        verified = intent.is_system or intent.join_count > 0
+        geo_key = RedisKeys.intent_geo() if verified else RedisKeys.intent_geo_unverified()
+        await self.redis.geoadd(geo_key, (intent.longitude, intent.latitude, str(intent.id)))
+        if intent.is_system:
+            await self.redis.sadd(RedisKeys.system_intents(), str(intent.id))
         
         # Add to Expiration Queue
         expire_at = datetime.now(timezone.utc) + timedelta(seconds=INTENT_TTL_SECONDS)
@@ -42,7 +57,7 @@ class IntentRepository:
             await self.redis.sadd(RedisKeys.user_intents(intent.user_id), str(intent.id))
             await self.redis.expire(RedisKeys.user_intents(intent.user_id), INTENT_TTL_SECONDS)
         
-        logger.info(f"Saved intent {intent.id} with TTL {INTENT_TTL_SECONDS}s")
+        logger.debug("Saved intent %s with TTL %ds", intent.id, INTENT_TTL_SECONDS)
 
     async def get_intent(self, intent_id: str) -> Intent | None:
         key = RedisKeys.intent(intent_id)
@@ -51,11 +66,30 @@ class IntentRepository:
             return None
         intent = Intent.model_validate_json(data)
         
-        # Populate join count
-        join_key = RedisKeys.intent_joins(intent_id)
-        count = await self.reader.scard(join_key)
-        intent = intent.with_join_count(count)
-        return intent
+        # Populate join and online counts
+        pipeline = self.reader.pipeline()
+        pipeline.scard(RedisKeys.intent_joins(intent_id))
+        queue_online_count(pipeline, intent_id, time.time())
+        count, online = await pipeline.execute()
+        return intent.with_counts(count, online)
+
+    async def get_intents(self, intent_ids: list[str]) -> list[Intent | None]:
+        """get_intent for many ids, in order, in one round trip; None where expired."""
+        pipeline = self.reader.pipeline(transaction=False)
+        pipeline.mget([RedisKeys.intent(i) for i in intent_ids])
+        now = time.time()
+        for intent_id in intent_ids:
+            pipeline.scard(RedisKeys.intent_joins(intent_id))
+            queue_online_count(pipeline, intent_id, now)
+        json_list, *counts = await pipeline.execute()
+        intents = []
+        for n, json_str in enumerate(json_list):
+            if not json_str:
+                intents.append(None)
+                continue
+            intent = Intent.model_validate_json(json_str)
+            intents.append(intent.with_counts(counts[2 * n], counts[2 * n + 1]))
+        return intents
 
     async def find_nearby(
         self, lat: float, lon: float, radius_km: float = 1.0, limit: int = 50
@@ -63,61 +97,99 @@ class IntentRepository:
         """
         Find nearby intents with distances. Returns (intent, distance_km) tuples
         for external ranking. Handles geo-search, hydration, and expired cleanup.
-        """
-        results = await self.reader.geosearch(
-            RedisKeys.intent_geo(),
-            longitude=lon,
-            latitude=lat,
-            radius=radius_km,
-            unit="km",
-            sort="ASC",
-            count=limit * 2,
-            withdist=True,
-        )
 
-        if not results:
-            return []
+        Unverified (0-join) intents live in their own geo tier, which is only
+        searched within UNVERIFIED_RADIUS_KM; the verified tier is searched in
+        rings starting at NEARBY_START_RADIUS_KM until there are `limit * 2`
+        visible candidates: while a ring is sparse the radius grows (up to
+        `radius_km`) by the area its visible density says is missing, and
+        while a ring is full but mostly hidden COUNT doubles. Join counts and
+        expiry are checked before any JSON is fetched, so expired members and
+        intents that lost their joins never reach the MGET.
+        """
+        wanted = limit * 2
+        radius = min(radius_km, NEARBY_START_RADIUS_KM)
+        count = wanted
+        checked: dict[str, tuple[bool, int, bool]] = {}  # member -> (live, joins, is_system)
 
-        member_ids = [m[0] for m in results]
-        distances = {m[0]: m[1] for m in results}
+        # First ring and the unverified tier share one round trip
+        pipeline = self.reader.pipeline(transaction=False)
+        _geosearch_nearest(pipeline, RedisKeys.intent_geo_unverified(), lat, lon, min(radius_km, UNVERIFIED_RADIUS_KM), wanted)
+        _geosearch_nearest(pipeline, RedisKeys.intent_geo(), lat, lon, radius, count)
+        unverified, results = await pipeline.execute()
+        while True:
+            found = {**dict(unverified), **dict(results)}  # a join may promote between the two searches
+            await self._check_members([m for m in found if m not in checked], checked)
+            visible = sorted(
+                ((m, dist) for m, dist in found.items() if _prefilter(checked[m], dist)),
+                key=lambda pair: pair[1],
+            )
+            if len(visible) >= wanted:
+                break
+            if len(results) == count:
+                # Full ring: a wider radius returns the same nearest members
+                if count >= limit * NEARBY_MAX_FETCH_FACTOR:
+                    break
+                count = min(count * 2, limit * NEARBY_MAX_FETCH_FACTOR)
+            elif radius < radius_km:
+                # Extrapolate the area still needed from the density seen so far
+                growth = 1.25 * sqrt(wanted / len(visible)) if visible else 4.0
+                radius = min(radius * min(max(growth, 2.0), 8.0), radius_km)
+            else:
+                break
+            results = await _geosearch_nearest(self.reader, RedisKeys.intent_geo(), lat, lon, radius, count)
 
-        keys = [RedisKeys.intent(mid) for mid in member_ids]
-        json_list = await self.reader.mget(keys)
+        expired_members = [m for m, (live, _, _) in checked.items() if not live]
+        visible = visible[:wanted]
+        json_list = await self.reader.mget([RedisKeys.intent(m) for m, _ in visible]) if visible else []
 
         candidates = []
-        expired_members = []
-
         pipeline = self.reader.pipeline()
+        now = time.time()
+        for (member, dist), json_str in zip(visible, json_list, strict=True):
+            if not json_str:
+                expired_members.append(member)  # expired since the check
+                continue
+            intent = Intent.model_validate_json(json_str)
+            if intent.flags < MAX_VISIBLE_FLAGS:
+                candidates.append((intent, checked[member][1], dist))
+                queue_online_count(pipeline, intent.id, now)
 
-        for i, json_str in enumerate(json_list):
-            if json_str:
-                intent = Intent.model_validate_json(json_str)
-                if intent.flags < 3:
-                    candidates.append(intent)
-                    pipeline.scard(RedisKeys.intent_joins(intent.id))
-            else:
-                expired_members.append(member_ids[i])
+        if expired_members:
+            await self.redis.zrem(RedisKeys.intent_geo(), *expired_members)
+            await self.redis.zrem(RedisKeys.intent_geo_unverified(), *expired_members)
+            await self.redis.srem(RedisKeys.system_intents(), *expired_members)
 
         if not candidates:
-            if expired_members:
-                await self.redis.zrem(RedisKeys.intent_geo(), *expired_members)
             return []
 
-        counts = await pipeline.execute()
+        online_counts = await pipeline.execute()
 
         result_pairs = []
-        for intent, count in zip(candidates, counts):
-            intent = intent.with_join_count(count)
-            dist = distances.get(str(intent.id), radius_km)
+        for (intent, joins, dist), online in zip(candidates, online_counts, strict=True):
+            intent = intent.with_counts(joins, online)
             if not intent.is_visible(dist):
                 continue
             result_pairs.append((intent, dist))
-
-        if expired_members:
-            await self.redis.zrem(RedisKeys.intent_geo(), *expired_members)
-
         return result_pairs
 
+    async def _check_members(self, members: list[str], checked: dict[str, tuple[bool, int, bool]]) -> None:
+        """
+        Record (live, join count, is_system) for each member in one round trip.
+        Liveness comes from the expiry queue score, not a per-member EXISTS.
+        """
+        if not members:
+            return
+        pipeline = self.reader.pipeline(transaction=False)  # plain reads, no MULTI needed
+        for member in members:
+            pipeline.scard(RedisKeys.intent_joins(member))
+        pipeline.zmscore(RedisKeys.expiry_queue(), members)
+        pipeline.smismember(RedisKeys.system_intents(), members)
+        *joins, expiries, system = await pipeline.execute()
+        now = time.time()
+        for member, count, expires_at, is_system in zip(members, joins, expiries, system, strict=True):
+            checked[member] = (expires_at is not None and expires_at > now, count, bool(is_system))
+
     async def has_user_flagged(self, intent_id: UUID, user_id: UUID) -> bool:
         """Check if this user has already flagged this intent."""
         key = RedisKeys.intent_flags(intent_id)
@@ -125,9 +197,18 @@ class IntentRepository:
 
     async def record_user_flag(self, intent_id: UUID, user_id: UUID) -> None:
         """Record that this user flagged this intent."""
+        # Scored by the intent's remaining TTL, like the joined and posted indexes
+        ttl = await self.reader.ttl(RedisKeys.intent(intent_id))
+        if ttl <= 0:
+            return  # expired meanwhile: nothing left to flag
         key = RedisKeys.intent_flags(intent_id)
         await self.redis.sadd(key, str(user_id))
-        await self.redis.expire(key, INTENT_TTL_SECONDS)
+        await self.redis.expire(key, ttl)
+        now = int(time.time())
+        await self.redis.eval(
+            LuaScripts.INDEX_USER_ACTIVITY, 1, RedisKeys.user_flagged(user_id),
+            str(intent_id), now + ttl, now,
+        )
 
     async def flag_intent(self, intent_id: UUID) -> int:
         key = RedisKeys.intent(intent_id)
@@ -148,38 +229,53 @@ class IntentRepository:
         self, lat: float, lon: float, radius_km: float = 10.0
     ) -> list[tuple[str, float, float]]:
         """
-        Fetch raw geo points within radius.
+        Fetch raw geo points within radius, from both geo tiers.
         Returns list of (member_id, longitude, latitude).
         """
-        res = await self.reader.geosearch(
-            name=RedisKeys.intent_geo(),
-            longitude=lon,
-            latitude=lat,
-            radius=radius_km,
-            unit="km",
-            count=1000,
-            withcoord=True,
-        )
-        if not res:
-            return []
-
-        return [(member, point[0], point[1]) for member, point in res]
+        pipeline = self.reader.pipeline(transaction=False)
+        for key in (RedisKeys.intent_geo(), RedisKeys.intent_geo_unverified()):
+            pipeline.geosearch(
+                name=key,
+                longitude=lon,
+                latitude=lat,
+                radius=radius_km,
+                unit="km",
+                count=1000,
+                withcoord=True,
+            )
+        verified, unverified = await pipeline.execute()
+        return [(member, point[0], point[1]) for member, point in (*verified, *unverified)]
 
     async def count_nearby(self, lat: float, lon: float, radius_km: float = 1.0) -> int:
         try:
-           # GEOSEARCH key FROMLONLAT lon lat BYRADIUS radius km ASC count 100
-           res = await self.redis.geosearch(
-               name=RedisKeys.intent_geo(),
-               longitude=lon,
-               latitude=lat,
-               radius=radius_km,
-               unit="km",
-               sort="ASC",
-               count=100
-           )
-           logger.info(f"Count nearby lat={lat} lon={lon} r={radius_km} -> {len(res)} items")
-           return len(res)
+           # GEOSEARCH key FROMLONLAT lon lat BYRADIUS radius km ASC count 100, per geo tier
+           pipeline = self.redis.pipeline(transaction=False)
+           for key in (RedisKeys.intent_geo(), RedisKeys.intent_geo_unverified()):
+               pipeline.geosearch(
+                   name=key,
+                   longitude=lon,
+                   latitude=lat,
+                   radius=radius_km,
+                   unit="km",
+                   sort="ASC",
+                   count=100
+               )
+           count = min(100, sum(len(res) for res in await pipeline.execute()))
+           logger.debug("Count nearby lat=%s lon=%s r=%s -> %d items", lat, lon, radius_km, count)
+           return count
         except Exception as e:
-            logger.error(f"Count nearby failed: {e}")
+            logger.error("Count nearby failed: %s", e)
             return 0
 
+
+def _geosearch_nearest(client, key: str, lat: float, lon: float, radius_km: float, count: int):
+    """GEOSEARCH nearest-first with distances; queued when `client` is a pipeline."""
+    return client.geosearch(
+        key, longitude=lon, latitude=lat, radius=radius_km, unit="km", sort="ASC", count=count, withdist=True,
+    )
+
+
+def _prefilter(check: tuple[bool, int, bool], distance_km: float) -> bool:
+    """Intent.is_visible on what is known before hydration (flags come later)."""
+    live, joins, is_system = check
+    return live and (joins > 0 or is_system or distance_km <= UNVERIFIED_RADIUS_KM)
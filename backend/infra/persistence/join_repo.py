@@ -1,13 +1,21 @@
 import logging
+import time
 from uuid import UUID
-from backend.infra.persistence.redis import RedisClient, get_redis_client
-from .keys import RedisKeys
+
 from fastapi import Depends
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from backend.config import settings
+from backend.core.metrics import instrument_repository
+from backend.infra.persistence.redis import RedisClient, get_redis_client
+
+from .keys import RedisKeys
 from .lua_scripts import LuaScripts
 
 logger = logging.getLogger(__name__)
 
+@instrument_repository("join")
 class JoinRepository:
     def __init__(self, redis: Redis = Depends(get_redis_client), reader: Redis | None = None):
         """
@@ -20,13 +28,21 @@ class JoinRepository:
     async def save_join(self, intent_id: UUID, user_id: UUID) -> bool:
         """
         Adds user to intent joins using atomic Lua script.
-        Checks if intent exists before joining.
+        Checks if intent exists before joining, records the intent in the
+        user's joined index, on the first join moves it to the verified geo
+        tier, and rescores it in its area's trending leaderboard.
         """
         intent_key = RedisKeys.intent(intent_id)
         join_key = RedisKeys.intent_joins(intent_id)
+        joined_key = RedisKeys.user_joined(user_id)
         
-        # Atomic Lua: Check Intent Exists -> SADD -> EXPIRE
-        result = await self.redis.eval(LuaScripts.SAVE_JOIN, 2, str(intent_key), str(join_key), str(user_id))
+        # Atomic Lua: Check Intent Exists -> SADD -> EXPIRE -> index under user -> promote geo tier -> trending
+        result = await self.redis.eval(
+            LuaScripts.SAVE_JOIN, 5, str(intent_key), str(join_key), joined_key,
+            RedisKeys.intent_geo(), RedisKeys.intent_geo_unverified(),
+            str(user_id), str(intent_id), int(time.time()),
+            settings.TRENDING_GEOHASH_PRECISION, settings.TRENDING_CELL_SIZE,
+        )
         
         # Handling pipeline result (Promise) vs Direct result
         if hasattr(self.redis, "execute_command"):
@@ -35,7 +51,7 @@ class JoinRepository:
             
             added = (result == 1)
             if added:
-                logger.info(f"User {user_id} joined intent {intent_id}")
+                logger.debug("User %s joined intent %s", user_id, intent_id)
             return added
             
         # Pipeline: We can't know result yet. Return True optimistically?
@@ -47,6 +63,16 @@ class JoinRepository:
         join_key = RedisKeys.intent_joins(intent_id)
         return await self.reader.scard(join_key)
 
-    async def is_member(self, intent_id: UUID, user_id: UUID) -> bool:
+    async def is_member(self, intent_id: UUID, user_id: UUID, primary: bool = False) -> bool:
+        """
+        `primary` reads the write client instead of the reader, which may be
+        a lagging replica: access checks must see a join made a moment ago.
+        """
         join_key = RedisKeys.intent_joins(intent_id)
-        return await self.reader.sismember(join_key, str(user_id))
+        # Inside a unit of work the writer is a pipeline; its reader is already the primary
+        client = self.redis if primary and not isinstance(self.redis, Pipeline) else self.reader
+        return await client.sismember(join_key, str(user_id))
+
+    async def get_joined_intents(self, user_id: UUID) -> list[str]:
+        """Ids of live intents the user has joined, soonest-expiring first."""
+        return await self.reader.zrangebyscore(RedisKeys.user_joined(user_id), int(time.time()), "+inf")
@@ -3,23 +3,39 @@ from uuid import UUID
 class RedisKeys:
     @staticmethod
     def intent(intent_id: UUID | str) -> str:
-        return f"intent:{str(intent_id)}"
+        return f"intent:{intent_id!s}"
 
     @staticmethod
     def intent_geo() -> str:
-        return "intents:geo" # Global geo index
+        return "intents:geo"  # Verified tier: joined or system intents, searched at any radius
+
+    @staticmethod
+    def intent_geo_unverified() -> str:
+        return "intents:geo:unverified"  # 0-join intents, only searched within 200m
+
+    @staticmethod
+    def system_intents() -> str:
+        return "intents:system"  # Set of system intent ids (visible at any distance)
 
     @staticmethod
     def intent_messages(intent_id: UUID | str) -> str:
-        return f"intent:{str(intent_id)}:msgs"
+        return f"intent:{intent_id!s}:msgs"
+
+    @staticmethod
+    def intent_messages_version(intent_id: UUID | str) -> str:
+        return f"intent:{intent_id!s}:msgs:ver"  # Bumped on every saved message
 
     @staticmethod
     def intent_joins(intent_id: UUID | str) -> str:
-        return f"intent:{str(intent_id)}:joins" # Set of user_ids
+        return f"intent:{intent_id!s}:joins" # Set of user_ids
 
     @staticmethod
     def intent_flags(intent_id: UUID | str) -> str:
-        return f"intent:{str(intent_id)}:flaggers"  # Set of user_ids who flagged
+        return f"intent:{intent_id!s}:flaggers"  # Set of user_ids who flagged
+
+    @staticmethod
+    def presence(intent_id: UUID | str) -> str:
+        return f"presence:{intent_id!s}"  # ZSET user_id -> last seen (epoch s)
 
     @staticmethod
     def rate_limit(user_id: str, action: str) -> str:
@@ -29,9 +45,25 @@ class RedisKeys:
     def user_intents(user_id: str) -> str:
         return f"user:{user_id}:intents"
 
+    @staticmethod
+    def user_joined(user_id: UUID | str) -> str:
+        return f"user:{user_id!s}:joined"  # ZSET intent_id -> intent expiry (epoch s)
+
+    @staticmethod
+    def user_posted(user_id: UUID | str) -> str:
+        return f"user:{user_id!s}:posted"  # ZSET intent_id -> intent expiry (epoch s)
+
+    @staticmethod
+    def user_flagged(user_id: UUID | str) -> str:
+        return f"user:{user_id!s}:flagged"  # ZSET intent_id -> intent expiry (epoch s)
+
     @staticmethod
     def area_hash(geohash: str) -> str:
-        return f"area:{geohash}"
+        return f"area:{geohash}"  # HASH of decaying activity counters (creates, joins, messages, at)
+
+    @staticmethod
+    def area_trending(geohash: str) -> str:
+        return f"trending:{geohash}"  # ZSET intent_id -> join count, the area's top intents
 
     @staticmethod
     def spam_last_hash(user_id: str) -> str:
@@ -22,19 +22,187 @@ class LuaScripts:
     end
     """
 
-    # SAVE_JOIN: Add user to set if intent exists.
+    # SAVE_JOIN: Add user to set if intent exists, and index the intent
+    # in the user's joined ZSET (same semantics as INDEX_USER_ACTIVITY).
+    # The first join promotes the intent from the unverified geo tier to the
+    # verified one (GEOPOS returns the cell centre, which GEOADD re-encodes
+    # to the same geohash). Every new join rescores the intent, by its join
+    # count, in the trending leaderboard of its area (a prefix of its GEOHASH),
+    # which keeps only its top ARGV[5] intents and lives as long as its
+    # longest-lived member. Readers prune expired members.
+    # Single-node only: the leaderboard key (mirrors RedisKeys.area_trending)
+    # is derived inside the script.
     # KEYS[1] = intent key
     # KEYS[2] = join key
+    # KEYS[3] = user joined index
+    # KEYS[4] = verified geo index
+    # KEYS[5] = unverified geo index
     # ARGV[1] = user_id
+    # ARGV[2] = intent_id
+    # ARGV[3] = now (epoch seconds)
+    # ARGV[4] = trending geohash precision
+    # ARGV[5] = trending leaderboard size
     SAVE_JOIN = """
     if redis.call("EXISTS", KEYS[1]) == 1 then
         local added = redis.call("SADD", KEYS[2], ARGV[1])
         local ttl = redis.call("TTL", KEYS[1])
         if ttl > 0 then
             redis.call("EXPIRE", KEYS[2], ttl)
+            redis.call("ZADD", KEYS[3], tonumber(ARGV[3]) + ttl, ARGV[2])
+            redis.call("ZREMRANGEBYSCORE", KEYS[3], "-inf", ARGV[3])
+            if redis.call("TTL", KEYS[3]) < ttl then
+                redis.call("EXPIRE", KEYS[3], ttl)
+            end
+        end
+        if added == 1 then
+            local pos = redis.call("GEOPOS", KEYS[5], ARGV[2])[1]
+            if pos then
+                redis.call("GEOADD", KEYS[4], pos[1], pos[2], ARGV[2])
+                redis.call("ZREM", KEYS[5], ARGV[2])
+            end
+            local geohash = redis.call("GEOHASH", KEYS[4], ARGV[2])[1]
+            if geohash and ttl > 0 then
+                local board = "trending:" .. string.sub(geohash, 1, tonumber(ARGV[4]))
+                redis.call("ZADD", board, redis.call("SCARD", KEYS[2]), ARGV[2])
+                redis.call("ZREMRANGEBYRANK", board, 0, -tonumber(ARGV[5]) - 1)
+                if redis.call("TTL", board) < ttl then
+                    redis.call("EXPIRE", board, ttl)
+                end
+            end
         end
         return added
     else
         return -1
     end
     """
+
+    # RECORD_AREA_ACTIVITY: Bump one decaying activity counter of the area
+    # an intent sits in. The area is a prefix of the intent's GEOHASH (from
+    # either geo tier); its counters share the `at` timestamp and are first
+    # decayed to `now` (halving every half-life), then the named one is
+    # incremented. Idle areas expire on their own.
+    # Single-node only: the area key (mirrors RedisKeys.area_hash) is derived
+    # inside the script, like ERASE_USER's per-intent keys.
+    # KEYS[1] = verified geo index   KEYS[2] = unverified geo index
+    # ARGV[1] = intent_id   ARGV[2] = counter field (creates / joins / messages)
+    # ARGV[3] = now (epoch seconds)   ARGV[4] = half-life (seconds)
+    # ARGV[5] = area key TTL (seconds)   ARGV[6] = geohash precision
+    # Returns the new counter value, or nil if the intent has no geo entry.
+    RECORD_AREA_ACTIVITY = """
+    local geohash = redis.call("GEOHASH", KEYS[1], ARGV[1])[1] or redis.call("GEOHASH", KEYS[2], ARGV[1])[1]
+    if not geohash then
+        return false
+    end
+    local key = "area:" .. string.sub(geohash, 1, tonumber(ARGV[6]))
+    local now = tonumber(ARGV[3])
+    local counters = redis.call("HMGET", key, "creates", "joins", "messages", "at")
+    local at = tonumber(counters[4]) or now
+    local factor = 1
+    if now > at then
+        factor = 0.5 ^ ((now - at) / tonumber(ARGV[4]))
+    end
+    local values = {}
+    for i, field in ipairs({"creates", "joins", "messages"}) do
+        values[field] = (tonumber(counters[i]) or 0) * factor
+    end
+    values[ARGV[2]] = values[ARGV[2]] + 1
+    redis.call("HSET", key, "creates", values.creates, "joins", values.joins, "messages", values.messages, "at", math.max(now, at))
+    redis.call("EXPIRE", key, ARGV[5])
+    return tostring(values[ARGV[2]])
+    """
+
+    # INDEX_USER_ACTIVITY: Record an intent in a per-user reverse index.
+    # Members are scored by the intent's expiry, so expired intents are pruned
+    # on every write and the key itself lives as long as its newest member.
+    # KEYS[1] = user reverse index (user:{id}:joined / :posted / :flagged)
+    # ARGV[1] = intent_id
+    # ARGV[2] = intent expiry (epoch seconds)
+    # ARGV[3] = now (epoch seconds)
+    INDEX_USER_ACTIVITY = """
+    local remaining = tonumber(ARGV[2]) - tonumber(ARGV[3])
+    if remaining <= 0 then
+        return 0
+    end
+    redis.call("ZADD", KEYS[1], ARGV[2], ARGV[1])
+    redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ARGV[3])
+    if redis.call("TTL", KEYS[1]) < remaining then
+        redis.call("EXPIRE", KEYS[1], math.ceil(remaining))
+    end
+    return 1
+    """
+
+    # ERASE_USER: GDPR erasure in one server-side call.
+    # KEYS[1] = user intents set   KEYS[2] = verified geo index   KEYS[3] = unverified geo index
+    # KEYS[4] = expiry queue       KEYS[5] = user joined index    KEYS[6] = user posted index
+    # KEYS[7] = user flagged index
+    # KEYS[8..] = identity-scoped keys (rate limits, spam hash), deleted outright
+    # ARGV[1] = user_id
+    # Per-intent key names mirror RedisKeys (intent:{id}, :msgs, :msgs:ver, :joins, :flaggers,
+    # presence:{id}).
+    # Owned intents are deleted; intents in the reverse indexes lose the
+    # user's join, presence, flag and messages, so the cost is O(user data). Messages
+    # match on the compact `"user_id":"<uid>"` of Message.model_dump_json
+    # (cjson is not available everywhere, e.g. fakeredis); quotes in content
+    # are escaped, so message text cannot forge it.
+    # Single-node only: per-intent keys are derived from the indexes inside
+    # the script rather than declared in KEYS (they can't be known up front
+    # without a racy read), which Redis Cluster rejects.
+    # Returns {keys_deleted, memberships_removed, messages_removed}.
+    ERASE_USER = """
+    local uid = ARGV[1]
+    local deleted = 0
+    local owned = {}
+
+    for _, id in ipairs(redis.call("SMEMBERS", KEYS[1])) do
+        owned[id] = true
+        local base = "intent:" .. id
+        deleted = deleted + redis.call(
+            "DEL", base, base .. ":msgs", base .. ":msgs:ver", base .. ":joins", base .. ":flaggers", "presence:" .. id
+        )
+        redis.call("ZREM", KEYS[2], id)
+        redis.call("ZREM", KEYS[3], id)
+        redis.call("ZREM", KEYS[4], id)
+    end
+
+    local memberships = 0
+    for _, id in ipairs(redis.call("ZRANGE", KEYS[5], 0, -1)) do
+        if not owned[id] then
+            memberships = memberships + redis.call("SREM", "intent:" .. id .. ":joins", uid)
+            -- Live sockets need membership, so presence only exists in joined intents
+            redis.call("ZREM", "presence:" .. id, uid)
+        end
+    end
+
+    for _, id in ipairs(redis.call("ZRANGE", KEYS[7], 0, -1)) do
+        if not owned[id] then
+            redis.call("SREM", "intent:" .. id .. ":flaggers", uid)
+        end
+    end
+
+    local messages = 0
+    local needle = '"user_id":"' .. uid .. '"'
+    for _, id in ipairs(redis.call("ZRANGE", KEYS[6], 0, -1)) do
+        if not owned[id] then
+            local base = "intent:" .. id
+            local removed = 0
+            for _, raw in ipairs(redis.call("LRANGE", base .. ":msgs", 0, -1)) do
+                if string.find(raw, needle, 1, true) then
+                    removed = removed + redis.call("LREM", base .. ":msgs", 0, raw)
+                end
+            end
+            if removed > 0 then
+                messages = messages + removed
+                if redis.call("EXISTS", base .. ":msgs:ver") == 1 then
+                    redis.call("INCR", base .. ":msgs:ver")
+                end
+            end
+        end
+    end
+
+    deleted = deleted + redis.call("DEL", KEYS[1])
+    for i = 5, #KEYS do
+        deleted = deleted + redis.call("DEL", KEYS[i])
+    end
+
+    return {deleted, memberships, messages}
+    """
@@ -1,14 +1,22 @@
 import logging
+import time
+from datetime import UTC, datetime
 from uuid import UUID
-from backend.infra.persistence.redis import RedisClient, get_redis_client
-from .keys import RedisKeys
-from backend.core.models.message import Message
-import json
+
 from fastapi import Depends
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from backend.core.metrics import instrument_repository
+from backend.core.models.message import Message
+from backend.infra.persistence.redis import get_redis_client
+
+from .keys import RedisKeys
+from .lua_scripts import LuaScripts
 
 logger = logging.getLogger(__name__)
 
+@instrument_repository("message")
 class MessageRepository:
     def __init__(self, redis: Redis = Depends(get_redis_client), reader: Redis | None = None):
         """
@@ -29,27 +37,64 @@ class MessageRepository:
             raise ValueError("Intent expired or not found")
         
         data = message.model_dump_json()
-        
-        # RPUSH to list (Write)
-        count = await self.redis.rpush(messages_key, data)
-        
-        # Trim (Write)
-        # Note: If count is Pipeline object (truthy), this always executes if condition is simplistic
-        # But we need result of rpush to decide.
-        # In pipeline, we can't decide.
-        # So we should ALWAYS trim? Or use Lua?
-        # For MVP Hardening, let's just blindly trim every time or use Lua.
-        # Let's blindly trim. It's safe.
-        await self.redis.ltrim(messages_key, -100, -1)
-            
+
+        # All writes go out in one MULTI: a crash can't leave the list changed
+        # with the version (and so the ETag) unbumped. Inside a unit of work
+        # the UoW pipeline already is that transaction.
+        writer = self.redis if isinstance(self.redis, Pipeline) else self.redis.pipeline(transaction=True)
+
+        # RPUSH to list, then trim blindly: in a pipeline the length isn't known yet
+        await writer.rpush(messages_key, data)
+        await writer.ltrim(messages_key, -100, -1)
+
         # Refresh TTL (Write)
-        await self.redis.expire(messages_key, ttl)
-        
-        logger.info(f"Saved message from {message.user_id} to intent {message.intent_id}")
+        await writer.expire(messages_key, ttl)
 
-    async def get_messages(self, intent_id: UUID, limit: int = 50) -> list[Message]:
+        # Bump the per-intent version so conditional reads can skip the list
+        version_key = RedisKeys.intent_messages_version(message.intent_id)
+        await writer.incr(version_key)
+        await writer.expire(version_key, ttl)
+
+        # Reverse index: which intents this user has posted in
+        now = int(time.time())
+        await writer.eval(
+            LuaScripts.INDEX_USER_ACTIVITY, 1, RedisKeys.user_posted(message.user_id),
+            str(message.intent_id), now + ttl, now,
+        )
+
+        if writer is not self.redis:
+            await writer.execute()
+
+        logger.debug("Saved message from %s to intent %s", message.user_id, message.intent_id)
+
+    async def get_messages(
+        self, intent_id: UUID, limit: int = 50, since: datetime | None = None
+    ) -> list[Message]:
+        """
+        Return the last `limit` messages, oldest first.
+        If `since` is given, only messages created strictly after it are returned.
+        """
         messages_key = RedisKeys.intent_messages(intent_id)
         # Get last N messages using reader
         raw_list = await self.reader.lrange(messages_key, -limit, -1)
-        
-        return [Message.model_validate_json(m) for m in raw_list]
+        messages = [Message.model_validate_json(m) for m in raw_list]
+
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=UTC)
+            messages = [m for m in messages if _as_utc(m.created_at) > since]
+
+        return messages
+
+    async def get_posted_intents(self, user_id: UUID) -> list[str]:
+        """Ids of live intents the user has posted in, soonest-expiring first."""
+        return await self.reader.zrangebyscore(RedisKeys.user_posted(user_id), int(time.time()), "+inf")
+
+    async def get_version(self, intent_id: UUID) -> int:
+        """Current message version for an intent (0 if nothing was ever posted)."""
+        value = await self.reader.get(RedisKeys.intent_messages_version(intent_id))
+        return int(value) if value else 0
+
+
+def _as_utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=UTC)
@@ -1,5 +1,3 @@
-from .db import AsyncSessionLocal
-from .models import IntentMetric, JoinMetric, MessageMetric
 from backend.core.models.intent import Intent
 import logging
 
@@ -16,9 +14,16 @@ def _coarse_geohash(lat: float, lon: float) -> str:
 
 
 class MetricsRepository:
+    """
+    Aggregate metrics in Postgres. SQLAlchemy and the models are imported on
+    first use so that a Redis-only deployment never loads them.
+    """
+
     async def log_intent_creation(self, intent: Intent):
+        from .db import get_sessionmaker
+        from .models import IntentMetric
         try:
-            async with AsyncSessionLocal() as session:
+            async with get_sessionmaker()() as session:
                 metric = IntentMetric(
                     intent_id=str(intent.id),
                     emoji=intent.emoji,
@@ -32,8 +37,10 @@ class MetricsRepository:
             logger.error("Failed to log intent metric: %s", e)
 
     async def log_join(self, intent_id: str, user_id: str):
+        from .db import get_sessionmaker
+        from .models import JoinMetric
         try:
-            async with AsyncSessionLocal() as session:
+            async with get_sessionmaker()() as session:
                 metric = JoinMetric(intent_id=str(intent_id))
                 session.add(metric)
                 await session.commit()
@@ -41,8 +48,10 @@ class MetricsRepository:
             logger.error("Failed to log join metric: %s", e)
 
     async def log_message(self, intent_id: str, user_id: str, content_length: int):
+        from .db import get_sessionmaker
+        from .models import MessageMetric
         try:
-            async with AsyncSessionLocal() as session:
+            async with get_sessionmaker()() as session:
                 metric = MessageMetric(
                     intent_id=str(intent_id),
                     content_length=content_length,
@@ -51,3 +60,16 @@ class MetricsRepository:
                 await session.commit()
         except Exception as e:
             logger.error("Failed to log message metric: %s", e)
+
+
+class NullMetricsRepository:
+    """Used when POSTGRES_ENABLED is false: aggregate metrics are dropped."""
+
+    async def log_intent_creation(self, intent: Intent):
+        pass
+
+    async def log_join(self, intent_id: str, user_id: str):
+        pass
+
+    async def log_message(self, intent_id: str, user_id: str, content_length: int):
+        pass
@@ -0,0 +1,55 @@
+import logging
+import time
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from backend.core.metrics import instrument_repository
+
+from .keys import RedisKeys
+
+logger = logging.getLogger(__name__)
+
+# A user counts as online while seen within this window. Clients ping every
+# 30s, so this tolerates two missed pings.
+PRESENCE_WINDOW_SECONDS = 90
+
+
+@instrument_repository("presence")
+class PresenceRepository:
+    def __init__(self, redis: Redis, reader: Redis | None = None):
+        """
+        :param redis: Write client (must be Redis instance, not a pipeline)
+        :param reader: Read client (must be Redis instance)
+        """
+        self.redis = redis
+        self.reader = reader or redis
+
+    async def record(self, seen: dict[UUID, set[str]], now: float | None = None) -> None:
+        """
+        Apply one heartbeat tick of presence in a single round trip: one ZADD
+        per room for users seen since the last tick (scored `now`). Closed
+        sockets are not removed: the user may still have a socket in the room
+        on another worker, so entries just age out of the window.
+        """
+        if not seen:
+            return
+        now = time.time() if now is None else now
+        pipe = self.redis.pipeline(transaction=False)
+        for intent_id, users in seen.items():
+            key = RedisKeys.presence(intent_id)
+            pipe.zadd(key, dict.fromkeys(users, now))
+            pipe.zremrangebyscore(key, "-inf", now - PRESENCE_WINDOW_SECONDS)
+            pipe.expire(key, PRESENCE_WINDOW_SECONDS * 2)
+        await pipe.execute()
+
+    async def online_count(self, intent_id: UUID | str) -> int:
+        pipe = self.reader.pipeline(transaction=False)
+        queue_online_count(pipe, intent_id, time.time())
+        (count,) = await pipe.execute()
+        return count
+
+
+def queue_online_count(pipeline, intent_id: UUID | str, now: float) -> None:
+    """Queue a ZCOUNT of users seen in the room within the presence window."""
+    pipeline.zcount(RedisKeys.presence(intent_id), f"({now - PRESENCE_WINDOW_SECONDS}", "+inf")
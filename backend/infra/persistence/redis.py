@@ -1,12 +1,21 @@
-from typing import Optional
+import logging
+import time
+from contextlib import asynccontextmanager
 from urllib.parse import urlparse
-from redis.asyncio import Redis, from_url
+
+from fastapi import FastAPI
+from redis.asyncio import BlockingConnectionPool, Redis
 from redis.asyncio.retry import Retry
 from redis.backoff import ExponentialBackoff
-from contextlib import asynccontextmanager
+
 from backend.config import settings
-from fastapi import FastAPI
-import logging
+from backend.core.metrics import (
+    REDIS_POOL_IN_USE,
+    REDIS_POOL_MAX,
+    REDIS_POOL_WAIT_SECONDS,
+)
+
+from .tracing import traced_connection_class
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +26,44 @@ def _safe_redis_url(url: str) -> str:
     return f"{parsed.scheme}://{parsed.hostname}:{parsed.port}{parsed.path}"
 
 
+class InstrumentedPool(BlockingConnectionPool):
+    """
+    Blocking pool (callers queue for up to `timeout` seconds instead of
+    failing with "Too many connections") that exports how long they waited
+    and how many connections are checked out, labelled by role.
+    """
+
+    def __init__(self, *args, role: str = "write", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.role = role
+        self._wait = REDIS_POOL_WAIT_SECONDS.labels(role)
+        self._in_use = REDIS_POOL_IN_USE.labels(role)
+        REDIS_POOL_MAX.labels(role).set(self.max_connections)
+
+    async def get_connection(self, command_name, *keys, **options):
+        start = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            self._wait.observe(time.perf_counter() - start)
+            self._in_use.set(len(self._in_use_connections))
+
+    async def release(self, connection):
+        await super().release(connection)
+        self._in_use.set(len(self._in_use_connections))
+
+
 class RedisClient:
-    _client: Optional[Redis] = None
+    """
+    Process-wide Redis clients, one pool per role:
+    - write: commands, rate limits, spam checks, event store
+    - read: query-side reads (find_nearby, get_messages, is_member), pointed
+      at a replica when REDIS_REPLICA_DSN is set, otherwise a separate pool
+      on the primary so read bursts cannot starve writes.
+    Unit-of-work reads stay on the write client (read-your-writes).
+    """
+    _client: Redis | None = None
+    _reader: Redis | None = None
 
     @classmethod
     def get_client(cls) -> Redis:
@@ -27,38 +72,65 @@ class RedisClient:
         return cls._client
 
     @classmethod
-    async def connect(cls, redis_url: str = "redis://localhost:6379"):
+    def get_reader(cls) -> Redis:
+        # Falls back to the write client when only that one was set up
+        return cls._reader or cls.get_client()
+
+    @classmethod
+    async def connect(cls, redis_url: str = "redis://localhost:6379", replica_url: str | None = None):
         logger.info("Connecting to Redis at %s", _safe_redis_url(redis_url))
-        cls._client = from_url(
-            redis_url,
+        cls._client = cls._create(redis_url, "write", settings.REDIS_WRITE_POOL_SIZE)
+        await cls._client.ping()
+
+        if replica_url:
+            logger.info("Reading from Redis replica at %s", _safe_redis_url(replica_url))
+        cls._reader = cls._create(replica_url or redis_url, "read", settings.REDIS_READ_POOL_SIZE)
+        await cls._reader.ping()
+        logger.info("Connected to Redis")
+
+    @staticmethod
+    def _create(url: str, role: str, max_connections: int) -> Redis:
+        pool = InstrumentedPool.from_url(
+            url,
+            role=role,
+            max_connections=max_connections,
+            timeout=settings.REDIS_POOL_TIMEOUT,
             encoding="utf-8",
             decode_responses=True,
-            max_connections=20,
             socket_timeout=5.0,
             socket_connect_timeout=5.0,
             retry_on_timeout=True,
             retry=Retry(ExponentialBackoff(), retries=3),
             health_check_interval=30,
         )
-        await cls._client.ping()
-        logger.info("Connected to Redis")
+        if settings.REDIS_TRACE_ENABLED:
+            pool.connection_class = traced_connection_class(pool.connection_class)
+            logger.info("Redis command tracing enabled (%s pool)", role)
+        return Redis.from_pool(pool)
 
     @classmethod
     async def disconnect(cls):
         if cls._client:
             logger.info("Disconnecting from Redis")
-            await cls._client.close()
+            await cls._client.aclose()
             cls._client = None
+        if cls._reader:
+            await cls._reader.aclose()
+            cls._reader = None
 
 
-# Dependency
+# Dependencies
 async def get_redis_client() -> Redis:
     return RedisClient.get_client()
 
 
+async def get_redis_reader() -> Redis:
+    return RedisClient.get_reader()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     redis_url = getattr(settings, "REDIS_DSN", "redis://localhost:6379")
-    await RedisClient.connect(redis_url)
+    await RedisClient.connect(redis_url, settings.REDIS_REPLICA_DSN or None)
     yield
     await RedisClient.disconnect()
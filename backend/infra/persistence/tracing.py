@@ -0,0 +1,210 @@
+"""
+Opt-in Redis command tracing (REDIS_TRACE_ENABLED).
+
+`traced_connection_class` wraps the pool's connection class so every command
+that goes over the wire is recorded with its name, key pattern, request size
+and latency. Pipelines are traced per command: each command's latency runs
+from when the pipeline was packed to when its reply was read (inside
+MULTI/EXEC the per-command replies are QUEUED acks, so the work shows up
+on EXEC).
+
+Samples go to three places:
+- per-pattern aggregates in this process (served by /debug/profile),
+- the per-request trace opened by `begin_request_trace` (sampled into logs
+  by RequestMiddleware, tagged with the request ID),
+- the nowhere_redis_command_duration_seconds histogram.
+"""
+import contextvars
+import logging
+import re
+import time
+from collections import deque
+from typing import NamedTuple
+
+from ...core.metrics import REDIS_COMMAND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Commands whose first argument is not a key
+_KEYLESS = frozenset({
+    "PING", "ECHO", "MULTI", "EXEC", "DISCARD", "WATCH", "UNWATCH", "INFO",
+    "SELECT", "HELLO", "AUTH", "CLIENT", "CONFIG", "SCRIPT", "FUNCTION",
+    "DBSIZE", "FLUSHDB", "FLUSHALL", "TIME", "SCAN", "PUBLISH", "SUBSCRIBE",
+})
+_EVAL = frozenset({"EVAL", "EVALSHA", "EVAL_RO", "EVALSHA_RO", "FCALL", "FCALL_RO"})
+
+# Any key segment with a digit in it (UUIDs, geohashes, numeric ids) is an identifier
+_ID_SEGMENT = re.compile(r"\d")
+
+
+class CommandSample(NamedTuple):
+    command: str
+    pattern: str
+    size: int
+    seconds: float
+
+
+class _PatternStats:
+    __slots__ = ("bytes", "count", "max", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes = 0
+
+
+_stats: dict[tuple[str, str], _PatternStats] = {}
+_request_trace: contextvars.ContextVar[list[CommandSample] | None] = contextvars.ContextVar(
+    "redis_trace", default=None
+)
+
+
+def key_pattern(key) -> str:
+    """intent:<uuid>:joins -> intent:*:joins"""
+    if isinstance(key, bytes):
+        key = key.decode("utf-8", "replace")
+    elif not isinstance(key, str):
+        return "*"
+    return ":".join("*" if _ID_SEGMENT.search(part) else part for part in key.split(":"))
+
+
+def describe_command(args: tuple) -> tuple[str, str]:
+    """(command name, key pattern) for a raw command tuple."""
+    name = args[0]
+    if isinstance(name, bytes):
+        name = name.decode()
+    name = name.split(" ", 1)[0].upper()
+
+    if name in _EVAL:
+        # EVALSHA sha numkeys key [key ...] arg [arg ...]
+        if len(args) > 3 and str(args[2]) != "0":
+            return name, key_pattern(args[3])
+        return name, "-"
+    if name in _KEYLESS or len(args) < 2:
+        return name, "-"
+    return name, key_pattern(args[1])
+
+
+def record(command: str, pattern: str, size: int, seconds: float) -> None:
+    stats = _stats.get((command, pattern))
+    if stats is None:
+        stats = _stats[(command, pattern)] = _PatternStats()
+    stats.count += 1
+    stats.total += seconds
+    stats.bytes += size
+    stats.max = max(stats.max, seconds)
+
+    REDIS_COMMAND_SECONDS.labels(command, pattern).observe(seconds)
+
+    trace = _request_trace.get()
+    if trace is not None:
+        trace.append(CommandSample(command, pattern, size, seconds))
+
+
+def begin_request_trace() -> contextvars.Token:
+    return _request_trace.set([])
+
+
+def end_request_trace(token: contextvars.Token) -> list[CommandSample]:
+    trace = _request_trace.get() or []
+    _request_trace.reset(token)
+    return trace
+
+
+def log_request_trace(method: str, path: str, trace: list[CommandSample]) -> None:
+    """One log line per traced request; runs inside the request ID context."""
+    if not trace:
+        return
+    slowest = max(trace, key=lambda s: s.seconds)
+    logger.info(
+        "redis trace %s %s: %d commands, %.2fms, %d bytes; slowest %s %s %.2fms",
+        method, path, len(trace),
+        sum(s.seconds for s in trace) * 1000,
+        sum(s.size for s in trace),
+        slowest.command, slowest.pattern, slowest.seconds * 1000,
+    )
+
+
+def slowest_patterns(limit: int = 20, order_by: str = "total") -> list[dict]:
+    """Aggregates per (command, key pattern), slowest first by total, max or mean latency."""
+    rows = [
+        {
+            "command": command,
+            "pattern": pattern,
+            "count": s.count,
+            "total_ms": round(s.total * 1000, 3),
+            "mean_ms": round(s.total / s.count * 1000, 3),
+            "max_ms": round(s.max * 1000, 3),
+            "bytes": s.bytes,
+        }
+        for (command, pattern), s in list(_stats.items())
+    ]
+    rows.sort(key=lambda r: r[f"{order_by}_ms"], reverse=True)
+    return rows[:limit]
+
+
+def reset_stats() -> None:
+    _stats.clear()
+
+
+class _TracingMixin:
+    """
+    Pairs every packed command with the reply read for it. Replies arrive in
+    send order on a connection, so a FIFO of pending samples is enough.
+    Health-check PINGs and handshake commands sent by connect() interleave
+    with an already packed command and are left untraced.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trace_pending: deque = deque()
+        self._trace_paused = False
+
+    def pack_command(self, *args):
+        packed = super().pack_command(*args)
+        if not self._trace_paused:
+            command, pattern = describe_command(args)
+            size = sum(len(chunk) for chunk in packed)
+            self._trace_pending.append((command, pattern, size, time.perf_counter()))
+        return packed
+
+    async def read_response(self, *args, **kwargs):
+        if self._trace_paused:
+            return await super().read_response(*args, **kwargs)
+        try:
+            return await super().read_response(*args, **kwargs)
+        finally:
+            if self._trace_pending:
+                command, pattern, size, start = self._trace_pending.popleft()
+                record(command, pattern, size, time.perf_counter() - start)
+
+    async def connect(self):
+        if self.is_connected:
+            return
+        await self._untraced(super().connect())
+
+    async def check_health(self):
+        await self._untraced(super().check_health())
+
+    async def disconnect(self, *args, **kwargs):
+        self._trace_pending.clear()
+        await super().disconnect(*args, **kwargs)
+
+    async def _untraced(self, coro):
+        paused, self._trace_paused = self._trace_paused, True
+        try:
+            await coro
+        finally:
+            self._trace_paused = paused
+
+
+_traced_classes: dict[type, type] = {}
+
+
+def traced_connection_class(base: type) -> type:
+    """Tracing subclass of a redis-py connection class (Connection, SSLConnection, ...)."""
+    cls = _traced_classes.get(base)
+    if cls is None:
+        cls = _traced_classes[base] = type(f"Traced{base.__name__}", (_TracingMixin, base), {})
+    return cls
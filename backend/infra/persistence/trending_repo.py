@@ -0,0 +1,43 @@
+import logging
+
+from redis.asyncio import Redis
+
+from backend.core.metrics import instrument_repository
+from backend.core.models.geo import geohash_cells_around
+
+from .keys import RedisKeys
+
+logger = logging.getLogger(__name__)
+
+
+@instrument_repository("trending")
+class TrendingRepository:
+    """
+    Reads the per-area trending leaderboards. They are written by SAVE_JOIN,
+    so a join and its rescoring are one atomic step.
+    """
+
+    def __init__(self, redis: Redis, reader: Redis | None = None, precision: int = 5):
+        """
+        :param redis: Write client (must be Redis instance, not a pipeline)
+        :param reader: Read client (must be Redis instance)
+        """
+        self.redis = redis
+        self.reader = reader or redis
+        self.precision = precision
+
+    def cells(self, lat: float, lon: float) -> list[str]:
+        """The leaderboards covering a point: its cell and the 8 around it."""
+        return geohash_cells_around(lat, lon, self.precision)
+
+    async def top(self, cells: list[str], count: int) -> list[tuple[str, int]]:
+        """Most-joined (intent_id, joins) across the leaderboards, in one ZUNION."""
+        ranked = await self.reader.zunion([RedisKeys.area_trending(cell) for cell in cells], withscores=True)
+        return [(member, int(score)) for member, score in reversed(ranked[-count:])]
+
+    async def prune(self, cells: list[str], members: list[str]) -> None:
+        """Drop expired or hidden intents; members are removed from every given leaderboard."""
+        pipeline = self.redis.pipeline(transaction=False)
+        for cell in cells:
+            pipeline.zrem(RedisKeys.area_trending(cell), *members)
+        await pipeline.execute()
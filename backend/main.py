@@ -1,23 +1,31 @@
 import asyncio
-import uuid
 import logging
 from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 
 # Import project modules
-from .config import settings
-from .core.logging import configure_logging, request_id_var
-from .core.exceptions import DomainError, IntentNotFound, InvalidAction, IntentExpired, SpamDetected
-from .infra.persistence.redis import lifespan as redis_lifespan, RedisClient
-from .infra.persistence.db import init_db
-from .api.intents import router as intents_router
 from .api.auth import router as auth_router
-from .api.ws import router as ws_router
+from .api.container import Container
+from .api.intents import router as intents_router
 from .api.metrics import router as metrics_router
-from .auth.middleware import AuthMiddleware
+from .api.middleware import RequestMiddleware
+from .api.ws import get_nearby_feed, get_ws_heartbeat, get_ws_manager
+from .api.ws import router as ws_router
+from .config import settings
+from .core.exceptions import (
+    DomainError,
+    IntentExpired,
+    IntentNotFound,
+    InvalidAction,
+    SpamDetected,
+)
+from .core.logging import configure_logging
+from .infra.persistence.redis import RedisClient
+from .infra.persistence.redis import lifespan as redis_lifespan
 
 # Configure logging
 configure_logging()
@@ -29,70 +37,61 @@ async def lifespan(app: FastAPI):
     # Determine Redis URL from settings or default
     redis_url = getattr(settings, "REDIS_DSN", "redis://localhost:6379")
     try:
-        await RedisClient.connect(redis_url)
+        await RedisClient.connect(redis_url, settings.REDIS_REPLICA_DSN or None)
         logger.info("Redis connected.")
+        app.state.container = Container(RedisClient.get_client(), RedisClient.get_reader(), settings)
     except Exception as e:
-        logger.error(f"Failed to connect to Redis: {e}")
+        logger.error("Failed to connect to Redis: %s", e)
         # We don't crash here to allow 'partial' start if user wants debugging
     
-    # Init DB (optional — only if Postgres is enabled for metrics)
+    # Init DB (optional — only if Postgres is enabled for metrics).
+    # Imported here so Redis-only workers never load SQLAlchemy.
     if settings.POSTGRES_ENABLED:
+        from .infra.persistence.db import init_db
         try:
             await init_db()
             logger.info("Database initialized.")
         except Exception as e:
-            logger.error(f"Failed to initialize Database: {e}")
+            logger.error("Failed to initialize Database: %s", e)
     else:
-        logger.info("PostgreSQL disabled — metrics stored in Redis only.")
+        logger.info("PostgreSQL disabled — aggregate metrics are not persisted.")
+
+    # One heartbeat task per worker: idle eviction, presence flush, closing rooms of expired intents
+    container = getattr(app.state, "container", None)
+    heartbeat_task = asyncio.create_task(
+        get_ws_heartbeat().run(container.reader, container.presence_repo)
+        if container else get_ws_heartbeat().run(None)
+    )
+    background = [heartbeat_task]
+    if container:
+        # Tails the event stream and pushes diffs to /ws/nearby subscribers
+        background.append(asyncio.create_task(
+            get_nearby_feed().run(container.reader, container.intent_repo, settings.WS_ROOM_CHECK_SECONDS)
+        ))
 
     yield
 
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+
     # Graceful shutdown: close all WebSocket connections before disconnecting Redis
-    from .api.ws import get_ws_manager
-    ws_manager = get_ws_manager()
-    for room in list(ws_manager._rooms.values()):
-        for ws in list(room):
-            try:
-                await ws.close(code=1001, reason="Server shutting down")
-            except Exception:
-                pass
-    ws_manager._rooms.clear()
-    ws_manager._total = 0
+    # (feed sockets included; their subscriptions drop as the handlers exit)
+    await get_ws_manager().close_all(code=1001, reason="Server shutting down")
 
+    app.state.container = None
     await RedisClient.disconnect()
 
+    if settings.POSTGRES_ENABLED:
+        from .infra.persistence.db import dispose_engine
+        await dispose_engine()
+
 # --- APP SETUP ---
 app = FastAPI(title=settings.APP_NAME, version="0.1.0", lifespan=lifespan)
 
-# --- SECURITY HEADERS MIDDLEWARE ---
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["Content-Security-Policy"] = (
-            "default-src 'self'; "
-            "script-src 'self'; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data:; "
-            "connect-src 'self' wss: ws:; "
-            "frame-ancestors 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self'"
-        )
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(self), camera=(), microphone=()"
-        if not settings.DEBUG:
-            response.headers["Strict-Transport-Security"] = "max-age=63072000; includeSubDomains; preload"
-        return response
-
 # --- MIDDLEWARE ---
 
-# 1. Security Headers
-app.add_middleware(SecurityHeadersMiddleware)
-
-# 2. CORS — restricted to configured origins
+# 1. CORS — restricted to configured origins
 _allowed_origins = [o.strip() for o in settings.ALLOWED_ORIGINS.split(",") if o.strip()]
 if settings.DEBUG and not _allowed_origins:
     # In debug mode, allow localhost origins for development
@@ -106,33 +105,18 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type", "X-Nowhere-Identity", "X-Request-ID"],
 )
 
-# 3. Auth Middleware
-app.add_middleware(AuthMiddleware)
-
-# 4. Request body size limit (1MB)
-@app.middleware("http")
-async def limit_body_size(request: Request, call_next):
-    content_length = request.headers.get("content-length")
-    if content_length and int(content_length) > 1_048_576:
-        return JSONResponse(status_code=413, content={"detail": "Request body too large"})
-    return await call_next(request)
-
-# 5. Request ID + correlation logging
-@app.middleware("http")
-async def request_id_middleware(request: Request, call_next):
-    rid = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-    token = request_id_var.set(rid)
-    logger.info(f"{request.method} {request.url.path}")
-    try:
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = rid
-        logger.info(f"{request.method} {request.url.path} -> {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"{request.method} {request.url.path} failed: {e}")
-        raise
-    finally:
-        request_id_var.reset(token)
+# 2. Compression — nearby lists and chat history compress well; small bodies are left alone
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# 3. Request ID, sampled access log, body size limit (1MB), JWT identity and
+#    security headers in one pure-ASGI pass. Added last so it is outermost.
+app.add_middleware(
+    RequestMiddleware,
+    hsts=not settings.DEBUG,
+    access_log_sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+    slow_request_ms=settings.ACCESS_LOG_SLOW_MS,
+    redis_trace_sample_rate=settings.REDIS_TRACE_SAMPLE_RATE if settings.REDIS_TRACE_ENABLED else None,
+)
 
 # --- ROUTERS ---
 app.include_router(intents_router, prefix="/intents", tags=["intents"])
@@ -162,7 +146,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 @app.exception_handler(DomainError)
 async def domain_error_handler(request: Request, exc: DomainError):
-    logger.warning(f"Domain Error: {exc}")
+    logger.warning("Domain Error: %s", exc)
     return JSONResponse(
         status_code=400,
         content={"detail": str(exc)},
@@ -186,8 +170,10 @@ async def spam_handler(request: Request, exc: SpamDetected):
 async def health_check():
     redis_ok = False
     try:
-        redis = RedisClient.get_client()
-        await asyncio.wait_for(redis.ping(), timeout=2.0)
+        await asyncio.wait_for(
+            asyncio.gather(RedisClient.get_client().ping(), RedisClient.get_reader().ping()),
+            timeout=2.0,
+        )
         redis_ok = True
     except Exception:
         pass
@@ -1,10 +1,31 @@
-from typing import List
+from math import cos, floor, radians
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speedup
+    np = None
+
+# Below this many points NumPy's per-call overhead outweighs the vectorized binning
+NUMPY_MIN_POINTS = 2000
+# Greedy clustering starts from a grid this many halvings finer than the cluster size
+GREEDY_LEVELS = 2
 
 
 class ClusteringService:
-    """Grid-based clustering of geo-coordinates with zoom-aware precision."""
+    """
+    Clustering of geo-coordinates with zoom-aware cell size.
 
-    # Zoom level to geohash decimal precision mapping
+    "grid" bins points into cells about as wide as they are tall: rows
+    are `cell` degrees of latitude, and each row is split into as many
+    columns as fit its circumference, so cells don't narrow towards the
+    poles. "greedy" is supercluster-style: points are first binned into a
+    grid 2^GREEDY_LEVELS times finer, then merged level by level, each
+    cluster (heaviest first) absorbing everything within half a cell of
+    it, at twice the radius each level. Clusters no longer split at grid
+    lines, at the cost of a few greedy passes.
+    """
+
+    # Zoom level to cell size, in decimal places of a degree of latitude
     # Lower precision = bigger grid cells = more aggregation
     ZOOM_PRECISION = {
         # zoom_level: decimal_places
@@ -15,6 +36,8 @@ class ClusteringService:
         range(16, 22): 4,    # building view
     }
 
+    METHODS = ("grid", "greedy")
+
     @staticmethod
     def _precision_for_zoom(zoom: int | None, radius_km: float) -> int:
         """Determine grid precision from zoom level or radius."""
@@ -36,38 +59,146 @@ class ClusteringService:
         points: list[tuple[str, float, float]],
         radius_km: float,
         zoom: int | None = None,
-    ) -> List[dict]:
+        method: str = "grid",
+    ) -> list[dict]:
         """
-        Cluster points by rounding to a grid.
+        Cluster points into cells of a zoom-dependent size.
         :param points: list of (member_id, longitude, latitude)
         :param radius_km: search radius — fallback for grid precision
         :param zoom: optional map zoom level for adaptive precision
+        :param method: "grid" or "greedy" (see the class docstring)
         :return: list of cluster dicts with centroid + count
         """
-        precision = ClusteringService._precision_for_zoom(zoom, radius_km)
+        if method not in ClusteringService.METHODS:
+            raise ValueError(f"Unknown clustering method {method!r} (expected one of {', '.join(ClusteringService.METHODS)})")
+        cell_deg = 10.0 ** -ClusteringService._precision_for_zoom(zoom, radius_km)
 
-        clusters: dict[tuple[float, float], dict] = {}
+        if method == "grid":
+            cells = _grid(points, cell_deg)
+        else:
+            cells = _grid(points, cell_deg / 2 ** GREEDY_LEVELS)
+            for level in range(GREEDY_LEVELS - 1, -1, -1):
+                cells = _greedy(cells, cell_deg / 2 ** level / 2)
 
-        for _member, r_lon, r_lat in points:
-            grid_lat = round(r_lat, precision)
-            grid_lon = round(r_lon, precision)
-            key = (grid_lat, grid_lon)
+        return [
+            {
+                "geohash": label,
+                "latitude": lat_sum / count,
+                "longitude": (lon_sum / count + 180.0) % 360.0 - 180.0,
+                "count": count,
+            }
+            for label, count, lat_sum, lon_sum in cells
+        ]
 
-            if key not in clusters:
-                clusters[key] = {"count": 0, "lat_sum": 0.0, "lon_sum": 0.0}
 
-            clusters[key]["count"] += 1
-            clusters[key]["lat_sum"] += r_lat
-            clusters[key]["lon_sum"] += r_lon
+# A cell or cluster: (label, count, sum of member latitudes, sum of member longitudes)
+_Cell = tuple[str, int, float, float]
 
-        results = []
-        for key, data in clusters.items():
-            count = data["count"]
-            results.append({
-                "geohash": f"{key[0]},{key[1]}",
-                "latitude": data["lat_sum"] / count,
-                "longitude": data["lon_sum"] / count,
-                "count": count,
-            })
 
-        return results
+def _row_columns(row: int, cell_deg: float) -> int:
+    """Columns in a grid row: as many `cell_deg`-wide cells as fit its circumference at mid-row."""
+    center = min(90.0, max(-90.0, (row + 0.5) * cell_deg))
+    return max(1, int(360.0 * cos(radians(center)) / cell_deg))
+
+
+def _grid(points: list[tuple[str, float, float]], cell_deg: float) -> list[_Cell]:
+    """Bin points into latitude-corrected cells of about cell_deg × cell_deg degrees of latitude."""
+    if np is not None and len(points) >= NUMPY_MIN_POINTS:
+        return _grid_numpy(points, cell_deg)
+    columns: dict[int, int] = {}
+    cells: dict[tuple[int, int], list] = {}
+    for _member, lon, lat in points:
+        row = floor(lat / cell_deg)
+        cols = columns.get(row)
+        if cols is None:
+            cols = columns[row] = _row_columns(row, cell_deg)
+        key = (row, int((lon + 180.0) * cols / 360.0) % cols)
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [1, lat, lon]
+        else:
+            cell[0] += 1
+            cell[1] += lat
+            cell[2] += lon
+    return [(f"{row}:{col}", count, lat_sum, lon_sum) for (row, col), (count, lat_sum, lon_sum) in cells.items()]
+
+
+def _grid_numpy(points: list[tuple[str, float, float]], cell_deg: float) -> list[_Cell]:
+    """`_grid` with the binning and the per-cell sums vectorized."""
+    lon = np.fromiter((p[1] for p in points), dtype=np.float64, count=len(points))
+    lat = np.fromiter((p[2] for p in points), dtype=np.float64, count=len(points))
+    row = np.floor(lat / cell_deg).astype(np.int64)
+    center = np.clip((row + 0.5) * cell_deg, -90.0, 90.0)
+    cols = np.maximum(1, (360.0 * np.cos(np.radians(center)) / cell_deg).astype(np.int64))
+    col = ((lon + 180.0) * cols / 360.0).astype(np.int64) % cols
+    width = int(360.0 / cell_deg) + 1  # more than any row's columns
+    keys, inverse = np.unique(row * width + col, return_inverse=True)
+    counts = np.bincount(inverse)
+    lat_sums = np.bincount(inverse, weights=lat)
+    lon_sums = np.bincount(inverse, weights=lon)
+    return [
+        (f"{r}:{c}", count, lat_sum, lon_sum)
+        for r, c, count, lat_sum, lon_sum in zip(
+            (keys // width).tolist(), (keys % width).tolist(), counts.tolist(), lat_sums.tolist(), lon_sums.tolist(),
+            strict=True,
+        )
+    ]
+
+
+def _greedy(cells: list[_Cell], radius_deg: float) -> list[_Cell]:
+    """
+    One greedy pass: heaviest first, each unclaimed cell absorbs every
+    unclaimed cell whose centroid is within `radius_deg` (of latitude,
+    ~radius_deg × 111 km) of its own. Neighbours are found through a
+    bucket grid of radius-sized cells, so each cell checks 9 buckets.
+    """
+    n = len(cells)
+    lats = [lat_sum / count for _, count, lat_sum, _ in cells]
+    lons = [(lon_sum / count + 180.0) % 360.0 - 180.0 for _, count, _, lon_sum in cells]
+    # Buckets are one radius tall and at least one radius wide at the widest latitude present
+    widest = min(89.0, max((abs(lat) for lat in lats), default=0.0))
+    cols = max(1, int(360.0 * cos(radians(widest)) / radius_deg))
+    buckets: dict[int, list[int]] = {}
+    rows, columns = [], []
+    for i in range(n):
+        row, col = floor(lats[i] / radius_deg), int((lons[i] + 180.0) * cols / 360.0) % cols
+        rows.append(row)
+        columns.append(col)
+        buckets.setdefault(row * cols + col, []).append(i)
+
+    radius_sq = radius_deg * radius_deg
+    claimed = [False] * n
+    merged: list[_Cell] = []
+    empty: list[int] = []
+    for i in sorted(range(n), key=lambda i: -cells[i][1]):
+        if claimed[i]:
+            continue
+        claimed[i] = True
+        label, count, lat_sum, lon_sum = cells[i]
+        lat, lon = lats[i], lons[i]
+        # Longitudes are summed relative to the seed so clusters across the antimeridian stay whole
+        lon_sum = count * lon
+        cos_lat = cos(radians(lat))
+        col = columns[i]
+        neighbour_cols = ((col - 1) % cols, col, (col + 1) % cols)
+        for row in (rows[i] - 1, rows[i], rows[i] + 1):
+            base = row * cols
+            for neighbour_col in neighbour_cols:
+                for j in buckets.get(base + neighbour_col, empty):
+                    if claimed[j]:
+                        continue
+                    d_lat = lats[j] - lat
+                    d_lon = lons[j] - lon
+                    if d_lon > 180.0:
+                        d_lon -= 360.0
+                    elif d_lon < -180.0:
+                        d_lon += 360.0
+                    d_lon *= cos_lat
+                    if d_lat * d_lat + d_lon * d_lon <= radius_sq:
+                        claimed[j] = True
+                        other = cells[j]
+                        count += other[1]
+                        lat_sum += other[2]
+                        lon_sum += other[1] * (lon + d_lon / cos_lat)
+        merged.append((label, count, lat_sum, lon_sum))
+    return merged
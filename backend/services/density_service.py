@@ -0,0 +1,39 @@
+import logging
+from collections.abc import Iterable
+
+from ..core.events import IntentCreated, IntentJoined, MessagePosted
+from ..infra.persistence.density_repo import AreaDensity, DensityRepository
+
+logger = logging.getLogger(__name__)
+
+
+class DensityService:
+    """
+    Per-area activity, kept as decaying counters (creates, joins, messages)
+    per geohash cell and updated from domain events. Lookups are one HMGET
+    per cell, so rate limits and ranking can ask on every request instead
+    of running a GEOSEARCH.
+    """
+
+    def __init__(self, density_repo: DensityRepository):
+        self.density_repo = density_repo
+
+    async def density(self, lat: float, lon: float) -> AreaDensity:
+        return await self.density_repo.get(lat, lon)
+
+    async def densities(self, points: Iterable[tuple[float, float]]) -> list[AreaDensity]:
+        """Density at each (lat, lon), in order; points in one cell share a lookup."""
+        cells = [self.density_repo.cell(lat, lon) for lat, lon in points]
+        by_cell = await self.density_repo.get_many(cells)
+        return [by_cell[cell] for cell in cells]
+
+    # Events carry no coordinates; the repository finds the intent's cell in Redis
+
+    async def on_intent_created(self, event: IntentCreated):
+        await self.density_repo.record(event.intent_id, "creates", now=event.timestamp.timestamp())
+
+    async def on_intent_joined(self, event: IntentJoined):
+        await self.density_repo.record(event.intent_id, "joins", now=event.timestamp.timestamp())
+
+    async def on_message_posted(self, event: MessagePosted):
+        await self.density_repo.record(event.intent_id, "messages", now=event.timestamp.timestamp())
@@ -1,16 +1,47 @@
-from typing import List
+import random
+from datetime import UTC, datetime
+from uuid import UUID
+
+from ..core.event_bus import InMemoryEventBus
+from ..core.events import CandidateFeatures, NearbyQueried
+from ..core.interfaces.repositories import (
+    IntentRepository,
+    JoinRepository,
+    MessageRepository,
+)
+from ..core.models.geo import geohash_encode
 from ..core.models.intent import Intent
-from ..core.interfaces.repositories import IntentRepository
-from .ranking_service import RankingService
+from ..core.models.message import Message
+from ..core.models.ranking import score_terms
 from .clustering_service import ClusteringService
+from .density_service import DensityService
+from .ranking_service import RankingService
 
 
 class IntentQueryService:
     """Handles read-only queries for intents (CQRS pattern)."""
 
-    def __init__(self, intent_repo: IntentRepository, ranking_service: RankingService):
+    def __init__(
+        self,
+        intent_repo: IntentRepository,
+        ranking_service: RankingService,
+        message_repo: MessageRepository | None = None,
+        join_repo: JoinRepository | None = None,
+        density_service: DensityService | None = None,
+        event_bus: InMemoryEventBus | None = None,
+        query_sample_rate: float = 0.0,
+        cluster_method: str = "grid",
+    ):
         self.intent_repo = intent_repo
         self.ranking_service = ranking_service
+        self.message_repo = message_repo
+        self.join_repo = join_repo
+        self.density_service = density_service
+        self.event_bus = event_bus
+        self.query_sample_rate = query_sample_rate
+        if cluster_method not in ClusteringService.METHODS:
+            raise ValueError(f"Unknown clustering method {cluster_method!r}")
+        self.cluster_method = cluster_method
 
     async def get_nearby(
         self,
@@ -18,10 +49,40 @@ class IntentQueryService:
         lon: float,
         radius: float = 1.0,
         limit: int = 50,
-    ) -> List[Intent]:
-        """Get intents near a location, ranked by composite score."""
+        strategy: str | None = None,
+        user_id: UUID | None = None,
+    ) -> list[Intent]:
+        """
+        Get intents near a location, ranked by composite score. `strategy`
+        overrides the ranking strategy; `user_id` picks the A/B bucket.
+        """
+        strategy = self.ranking_service.strategy_for(user_id, strategy)
         pairs = await self.intent_repo.find_nearby(lat, lon, radius, limit)
-        return self.ranking_service.rank(pairs, radius, limit)
+        area_activity = None
+        if self.ranking_service.weights_for(strategy).w_area and self.density_service and pairs:
+            densities = await self.density_service.densities((i.latitude, i.longitude) for i, _ in pairs)
+            area_activity = [d.activity for d in densities]
+        if self.event_bus and pairs and random.random() < self.query_sample_rate:
+            await self._record_query(lat, lon, radius, limit, strategy, pairs, area_activity)
+        return self.ranking_service.rank(pairs, radius, limit, area_activity, strategy)
+
+    async def _record_query(self, lat, lon, radius, limit, strategy, pairs, area_activity) -> None:
+        """Persist the candidates of this search as a NearbyQueried event for offline replay."""
+        candidates = [
+            CandidateFeatures(
+                intent_id=intent.id,
+                dist_km=round(dist, 1),
+                created_ts=score_terms(intent)[0],
+                join_count=intent.join_count,
+                online_count=intent.online_count,
+                area_activity=area_activity[n] if area_activity else 0.0,
+            )
+            for n, (intent, dist) in enumerate(pairs)
+        ]
+        await self.event_bus.publish(NearbyQueried(
+            geohash=geohash_encode(lat, lon, 6), radius_km=radius, limit=limit, strategy=strategy,
+            candidates=candidates, timestamp=datetime.now(UTC),
+        ))
 
     async def get_clusters(
         self,
@@ -32,5 +93,22 @@ class IntentQueryService:
     ) -> dict:
         """Get clustered view of intents in an area."""
         points = await self.intent_repo.get_geo_points(lat, lon, radius)
-        clusters = ClusteringService.cluster(points, radius, zoom=zoom)
+        clusters = ClusteringService.cluster(points, radius, zoom=zoom, method=self.cluster_method)
         return {"clusters": clusters}
+
+    async def can_read_messages(self, intent_id: UUID, user_id: UUID) -> bool:
+        """Only members of an intent may read its chat (checked on the primary: replica lag)."""
+        return await self.join_repo.is_member(intent_id, user_id, primary=True)
+
+    async def get_message_version(self, intent_id: UUID) -> int:
+        """Cheap change marker for an intent's chat, used for conditional reads."""
+        return await self.message_repo.get_version(intent_id)
+
+    async def get_messages(
+        self,
+        intent_id: UUID,
+        since: datetime | None = None,
+        limit: int = 50,
+    ) -> list[Message]:
+        """Get recent messages, optionally only those posted after `since`."""
+        return await self.message_repo.get_messages(intent_id, limit=limit, since=since)
@@ -1,45 +1,86 @@
-from datetime import datetime, timezone
-from backend.core.models.intent import Intent
-from backend.core.models.ranking import calculate_score
+import time
+from uuid import UUID
+
 from backend.config import Settings
+from backend.core.models.intent import Intent
+from backend.core.models.ranking import RANKING_STRATEGIES, CandidateBatch, ScoreWeights
 
 
 class RankingService:
-    """Ranks intents by composite score using configurable weights."""
+    """
+    Ranks intents by score using configurable weights and a strategy from
+    RANKING_STRATEGIES: the configured default, an A/B experiment for a
+    share of users, or one asked for by the request.
+    """
 
     def __init__(self, settings: Settings):
         self.w_dist = settings.RANKING_W_DIST
         self.w_fresh = settings.RANKING_W_FRESH
         self.w_pop = settings.RANKING_W_POP
+        self.w_online = settings.RANKING_W_ONLINE
         self.decay_seconds = settings.RANKING_DECAY_SECONDS
+        self.w_area = settings.RANKING_W_AREA
+        self.weights = ScoreWeights(
+            self.w_dist, self.w_fresh, self.w_pop, self.w_online, self.w_area, self.decay_seconds
+        )
+        self.learned_weights = self.weights
+        if settings.RANKING_LEARNED_WEIGHTS:
+            values = [float(w) for w in settings.RANKING_LEARNED_WEIGHTS.split(",")]
+            if len(values) != 5:
+                raise ValueError("RANKING_LEARNED_WEIGHTS must be 'w_dist,w_fresh,w_pop,w_online,w_area'")
+            self.learned_weights = ScoreWeights(*values, self.decay_seconds)
+
+        self.strategy = _known_strategy(settings.RANKING_STRATEGY)
+        self.experiment: tuple[str, int] | None = None
+        if settings.RANKING_EXPERIMENT:
+            name, _, percent = settings.RANKING_EXPERIMENT.partition(":")
+            self.experiment = (_known_strategy(name), int(percent or 100))
+
+    def strategy_for(self, user_id: UUID | None = None, requested: str | None = None) -> str:
+        """
+        The strategy to rank with: the one requested, else the experiment's
+        for users in its bucket (stable per user id), else the default.
+        """
+        if requested is not None:
+            return _known_strategy(requested)
+        if self.experiment is not None and user_id is not None and user_id.int % 100 < self.experiment[1]:
+            return self.experiment[0]
+        return self.strategy
+
+    def weights_for(self, strategy: str) -> ScoreWeights:
+        return self.learned_weights if strategy == "learned" else self.weights
+
+    def scores(
+        self, batch: CandidateBatch, radius_km: float, strategy: str | None = None, now_ts: float | None = None
+    ) -> list[float]:
+        """Score a batch with one strategy; `now_ts` lets replays score at the time a query was made."""
+        strategy = strategy or self.strategy
+        now_ts = time.time() if now_ts is None else now_ts
+        return RANKING_STRATEGIES[strategy](batch, now_ts, radius_km, self.weights_for(strategy))
 
     def rank(
         self,
         intents: list[tuple[Intent, float]],
         radius_km: float,
         limit: int,
+        area_activity: list[float] | None = None,
+        strategy: str | None = None,
     ) -> list[Intent]:
         """
         Rank intents by score.
         :param intents: list of (intent, distance_km) tuples
         :param radius_km: search radius for distance normalization
         :param limit: max results to return
+        :param area_activity: decayed activity of each intent's area, aligned with `intents`
+        :param strategy: a RANKING_STRATEGIES name; the default strategy if None
         """
-        now = datetime.now(timezone.utc)
-        scored = []
-
-        for intent, dist_km in intents:
-            score = calculate_score(
-                intent,
-                dist_km,
-                radius_km,
-                now,
-                w_dist=self.w_dist,
-                w_fresh=self.w_fresh,
-                w_pop=self.w_pop,
-                decay_seconds=self.decay_seconds,
-            )
-            scored.append((score, intent))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [item[1] for item in scored[:limit]]
+        scores = self.scores(CandidateBatch.from_pairs(intents, area_activity), radius_km, strategy)
+        # Stable: equal scores keep their search (nearest-first) order
+        order = sorted(range(len(intents)), key=scores.__getitem__, reverse=True)
+        return [intents[n][0] for n in order[:limit]]
+
+
+def _known_strategy(name: str) -> str:
+    if name not in RANKING_STRATEGIES:
+        raise ValueError(f"Unknown ranking strategy {name!r} (expected one of {', '.join(RANKING_STRATEGIES)})")
+    return name
@@ -0,0 +1,40 @@
+import logging
+
+from ..core.events import IntentFlagged
+from ..core.interfaces.repositories import IntentRepository
+from ..core.models.intent import MAX_VISIBLE_FLAGS, Intent
+from ..infra.persistence.trending_repo import TrendingRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingService:
+    """
+    Most-joined intents around a point. Each geohash cell keeps a bounded
+    leaderboard, rescored by every join (SAVE_JOIN); a lookup merges the
+    point's cell and its neighbours with one ZUNION and hydrates only the
+    winners, so no GEOSEARCH or per-candidate scoring is involved.
+    Intents leave the leaderboards once flagged MAX_VISIBLE_FLAGS times.
+    """
+
+    def __init__(self, trending_repo: TrendingRepository, intent_repo: IntentRepository):
+        self.trending_repo = trending_repo
+        self.intent_repo = intent_repo
+
+    async def trending(self, lat: float, lon: float, limit: int = 20) -> list[Intent]:
+        cells = self.trending_repo.cells(lat, lon)
+        top = await self.trending_repo.top(cells, limit * 2)  # slack for expired and flagged intents
+        if not top:
+            return []
+        intents = await self.intent_repo.get_intents([member for member, _ in top])
+        # No expiry event: intents whose TTL ran out are pruned here, as find_nearby prunes the geo index
+        expired = [member for (member, _), intent in zip(top, intents, strict=True) if intent is None]
+        if expired:
+            await self.trending_repo.prune(cells, expired)
+        return [i for i in intents if i is not None and i.flags < MAX_VISIBLE_FLAGS][:limit]
+
+    async def on_intent_flagged(self, event: IntentFlagged):
+        # The new count is only known once the flag's unit of work has run, so re-read it
+        intent = await self.intent_repo.get_intent(str(event.intent_id))
+        if intent is not None and intent.flags >= MAX_VISIBLE_FLAGS:
+            await self.trending_repo.prune(self.trending_repo.cells(intent.latitude, intent.longitude), [str(intent.id)])
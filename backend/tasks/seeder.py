@@ -26,7 +26,7 @@ async def seed_ambient_intents(
     """
     Seeds 'count' random ambient intents around (lat, lon) within 'radius_km'.
     """
-    logger.info(f"Seeding {count} ambient intents around {lat}, {lon}")
+    logger.info("Seeding %d ambient intents around %s, %s", count, lat, lon)
     
     seeded = []
     
@@ -58,5 +58,5 @@ async def seed_ambient_intents(
         await repo.save_intent(intent)
         seeded.append(intent)
         
-    logger.info(f"Successfully seeded {len(seeded)} intents.")
+    logger.info("Successfully seeded %d intents.", len(seeded))
     return seeded
@@ -0,0 +1,94 @@
+import random
+
+from backend.core.models.geo import (
+    SpatialIndex,
+    geohash_cells_around,
+    geohash_encode,
+    haversine_km,
+)
+
+
+def test_haversine_known_distance():
+    # London -> Paris is ~343.5 km
+    assert abs(haversine_km(51.5074, -0.1278, 48.8566, 2.3522) - 343.5) < 1.0
+
+
+def test_circles_match_brute_force():
+    rng = random.Random(42)
+    index = SpatialIndex(cell_deg=0.1)
+    circles = {}
+    for key in range(2000):
+        circle = (rng.uniform(50, 52), rng.uniform(-1, 1), rng.uniform(0.1, 50))
+        circles[key] = circle
+        index.insert_circle(key, *circle)
+
+    for _ in range(200):
+        lat, lon = rng.uniform(50, 52), rng.uniform(-1, 1)
+        expected = {k for k, (c_lat, c_lon, r) in circles.items() if haversine_km(lat, lon, c_lat, c_lon) <= r}
+        assert set(index.query(lat, lon)) == expected
+
+
+def test_rects_match_brute_force():
+    rng = random.Random(7)
+    index = SpatialIndex(cell_deg=0.1)
+    rects = {}
+    for key in range(1000):
+        south, west = rng.uniform(50, 52), rng.uniform(-1, 1)
+        rect = (south, west, south + rng.uniform(0.01, 0.5), west + rng.uniform(0.01, 0.5))
+        rects[key] = rect
+        index.insert_rect(key, *rect)
+
+    for _ in range(200):
+        lat, lon = rng.uniform(50, 52), rng.uniform(-1, 1)
+        expected = {k for k, (s, w, n, e) in rects.items() if s <= lat <= n and w <= lon <= e}
+        assert set(index.query(lat, lon)) == expected
+
+
+def test_query_many_matches_query():
+    rng = random.Random(1)
+    index = SpatialIndex()
+    for key in range(500):
+        index.insert_circle(key, rng.uniform(40, 41), rng.uniform(-74, -73), rng.uniform(0.1, 10))
+    index.insert_rect("box", 40.2, -73.8, 40.6, -73.2)
+
+    points = [(rng.uniform(40, 41), rng.uniform(-74, -73)) for _ in range(300)]
+    assert index.query_many(points) == [index.query(lat, lon) for lat, lon in points]
+
+
+def test_shapes_wrap_the_antimeridian():
+    index = SpatialIndex()
+    index.insert_circle("fiji", -17.0, 179.99, 5.0)
+    index.insert_rect("strip", -18.0, 179.5, -16.0, -179.5)
+    assert index.query(-17.0, -179.99) == ["fiji", "strip"]
+    assert index.query(-17.0, 179.6) == ["strip"]
+    assert index.query(-17.0, 0.0) == []
+
+
+def test_insert_replaces_and_remove_cleans_up():
+    index = SpatialIndex()
+    index.insert_circle("a", 0.0, 0.0, 1.0)
+    index.insert_rect("a", 9.9, 9.9, 10.1, 10.1)
+    assert index.query(0.0, 0.0) == []
+    assert index.query(10.0, 10.0) == ["a"]
+
+    index.remove("a")
+    index.remove("a")  # idempotent
+    assert "a" not in index
+    assert len(index) == 0
+    assert index._cells == {}
+
+
+def test_geohash_encode_known_values():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash_encode(51.5074, -0.1278, 6) == "gcpvj0"
+
+
+def test_geohash_cells_around_cover_the_neighbours():
+    cells = geohash_cells_around(51.5074, -0.1278, 5)
+    assert cells[0] == geohash_encode(51.5074, -0.1278, 5)
+    assert len(set(cells)) == 9
+    assert geohash_encode(51.5074 + 0.04, -0.1278 - 0.04, 5) in cells
+
+    # Across the antimeridian, and clipped at the pole
+    assert geohash_encode(0.0, -179.99, 5) in geohash_cells_around(0.0, 179.99, 5)
+    assert len(geohash_cells_around(89.99, 0.0, 5)) == 6
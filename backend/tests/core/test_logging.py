@@ -0,0 +1,31 @@
+import json
+import logging
+import queue
+
+from backend.core.logging import ContextQueueHandler, JSONFormatter, request_id_var
+
+
+def test_queue_handler_stamps_request_id_without_formatting():
+    q = queue.SimpleQueue()
+    handler = ContextQueueHandler(q)
+    logger = logging.getLogger("test.queue_handler")
+    logger.handlers = [handler]
+    logger.propagate = False
+
+    token = request_id_var.set("req-42")
+    try:
+        logger.warning("joined %s", "intent-1")
+    finally:
+        request_id_var.reset(token)
+
+    record = q.get_nowait()
+    assert record.request_id == "req-42"
+    # Interpolation is deferred to the listener thread
+    assert record.msg == "joined %s" and record.args == ("intent-1",)
+
+    # Formatting later (outside the request context) keeps the stamped ID
+    data = json.loads(JSONFormatter().format(record))
+    assert data["request_id"] == "req-42"
+    assert data["message"] == "joined intent-1"
+    assert data["level"] == "WARNING"
+    assert data["timestamp"].endswith("+00:00")
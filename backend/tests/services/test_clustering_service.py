@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from backend.core.models.geo import haversine_km
+from backend.services import clustering_service
+from backend.services.clustering_service import ClusteringService
+
+
+def _points(lat: float, lon: float, spread: float, count: int, seed: int = 1) -> list[tuple[str, float, float]]:
+    rng = random.Random(seed)
+    return [(str(i), lon + rng.uniform(-spread, spread), lat + rng.uniform(-spread, spread)) for i in range(count)]
+
+
+@pytest.mark.parametrize("method", ClusteringService.METHODS)
+def test_every_point_is_counted_once(method):
+    points = _points(40.7, -74.0, 0.05, 3000)
+    clusters = ClusteringService.cluster(points, 10.0, zoom=12, method=method)
+    assert sum(c["count"] for c in clusters) == len(points)
+    assert len({c["geohash"] for c in clusters}) == len(clusters)
+
+
+def test_numpy_and_python_binning_agree(monkeypatch):
+    if clustering_service.np is None:
+        pytest.skip("numpy not installed")
+    points = _points(-33.9, 151.2, 0.2, 5000)
+    with_numpy = ClusteringService.cluster(points, 10.0, zoom=10)
+    monkeypatch.setattr(clustering_service, "np", None)
+    without = ClusteringService.cluster(points, 10.0, zoom=10)
+
+    def by_cell(clusters):
+        return {c["geohash"]: (c["count"], round(c["latitude"], 9), round(c["longitude"], 9)) for c in clusters}
+
+    assert by_cell(with_numpy) == by_cell(without)
+
+
+def test_grid_cells_keep_their_width_at_high_latitudes():
+    # ~1.1 km cells: a 0.05° square of points spans ~5 cells either way at the equator
+    equator = ClusteringService.cluster(_points(0.0, 10.0, 0.025, 4000), 10.0, zoom=10)
+    north = ClusteringService.cluster(_points(65.0, 10.0, 0.025, 4000), 10.0, zoom=10)
+    # At 65° the same span of longitude is ~0.42 as wide, so it needs fewer columns
+    assert len(north) < 0.6 * len(equator)
+
+
+def test_greedy_keeps_a_hotspot_on_a_cell_edge_whole():
+    # A 20 m wide hotspot centred on a grid line of the ~110 m cells
+    rng = random.Random(3)
+    points = [(str(i), 2.35 + rng.uniform(-1e-4, 1e-4), 48.9 + rng.uniform(-1e-4, 1e-4)) for i in range(200)]
+
+    assert len(ClusteringService.cluster(points, 1.0, zoom=14)) > 1
+    [whole] = ClusteringService.cluster(points, 1.0, zoom=14, method="greedy")
+    assert whole["count"] == 200
+    assert haversine_km(48.9, 2.35, whole["latitude"], whole["longitude"]) < 0.01
+
+
+def test_greedy_merges_across_the_antimeridian():
+    points = [("a", 179.9999, 0.0), ("b", -179.9999, 0.0)]
+    [cluster] = ClusteringService.cluster(points, 1.0, zoom=14, method="greedy")
+    assert cluster["count"] == 2
+    assert abs(abs(cluster["longitude"]) - 180.0) < 1e-3
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        ClusteringService.cluster([], 1.0, method="kmeans")
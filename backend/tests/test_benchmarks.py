@@ -0,0 +1,68 @@
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from fakeredis import FakeAsyncRedis
+
+from backend.benchmarks.loadgen import compare, percentile
+from backend.benchmarks.ranking_replay import evaluate, load_queries
+from backend.config import settings
+from backend.core.event_bus import InMemoryEventBus
+from backend.core.events import IntentJoined, NearbyQueried
+from backend.core.models.geo import geohash_encode
+from backend.core.models.intent import Intent
+from backend.infra.persistence.event_store import RedisEventStore
+from backend.infra.persistence.intent_repo import IntentRepository
+from backend.services.intent_query_service import IntentQueryService
+from backend.services.ranking_service import RankingService
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.99) == 0.0
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    base = {"requests": 100, "throughput": 100.0, "p99_ms": 10.0, "errors": 0}
+    baseline = {"scenarios": {"nearby": base, "clusters": base}}
+    results = {
+        "nearby": {**base, "p99_ms": 14.0, "throughput": 80.0},  # within 50%
+        "clusters": {**base, "p99_ms": 16.0, "errors": 1},
+        "create": {**base, "errors": 100},  # not in the baseline yet
+    }
+
+    regressions = compare(results, baseline, tolerance=0.5)
+
+    assert len(regressions) == 2
+    assert all(line.startswith("clusters:") for line in regressions)
+
+
+async def test_sampled_searches_replay_against_later_joins():
+    redis = FakeAsyncRedis(decode_responses=True)
+    store = RedisEventStore(redis)
+    repo = IntentRepository(redis)
+    now = datetime.now(UTC)
+    near = Intent(title="near", emoji="🧪", latitude=40.0, longitude=-73.0, created_at=now - timedelta(hours=20), is_system=True)
+    far = Intent(title="far", emoji="🧪", latitude=40.008, longitude=-73.0, created_at=now, join_count=5, is_system=True)
+    for intent in (near, far):
+        await repo.save_intent(intent)
+    ranking = RankingService(settings)
+    service = IntentQueryService(repo, ranking, event_bus=InMemoryEventBus(event_store=store), query_sample_rate=1.0)
+
+    await service.get_nearby(40.0, -73.0, radius=1.0)
+    [entry] = await store.read_since()
+    recorded = NearbyQueried.model_validate(entry["data"])
+    assert recorded.geohash == geohash_encode(40.0, -73.0, 6)
+    assert {c.intent_id for c in recorded.candidates} == {near.id, far.id}
+
+    # The near one is joined soon after the search, the far one too late to count
+    await store.append(IntentJoined(intent_id=near.id, user_id=uuid4(), timestamp=recorded.timestamp + timedelta(minutes=5)))
+    await store.append(IntentJoined(intent_id=far.id, user_id=uuid4(), timestamp=recorded.timestamp + timedelta(hours=2)))
+    [query] = await load_queries(redis, window_seconds=1800)
+    assert query.relevant == {near.id}
+
+    results = evaluate([query], ranking, k=1)
+    assert results["distance"]["judged"] == 1
+    assert results["distance"]["mrr"] == results["distance"]["ndcg"] == 1.0
+    assert results["linear"]["mrr"] == 0.5 and results["linear"]["hit_rate"] == 0.0
@@ -0,0 +1,32 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.requests import Request
+
+from backend.api import deps
+from backend.main import app, lifespan
+
+
+def _request() -> Request:
+    return Request({"type": "http", "app": app, "headers": [], "state": {}})
+
+
+@pytest.mark.asyncio
+async def test_services_are_shared_and_unit_of_work_is_per_request():
+    async with lifespan(app):
+        first, second = _request(), _request()
+        assert await deps.get_intent_query_service(first) is await deps.get_intent_query_service(second)
+        assert await deps.get_spam_detector(first) is await deps.get_spam_detector(second)
+
+        handler_a = await deps.get_intent_command_handler(first)
+        handler_b = await deps.get_intent_command_handler(second)
+        assert handler_a.uow is not handler_b.uow
+        assert handler_a.uow.event_bus is handler_b.uow.event_bus
+
+
+@pytest.mark.asyncio
+async def test_unavailable_without_container():
+    # Outside the lifespan nothing is wired
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.get("/intents/nearby?lat=0&lon=0")
+    assert res.status_code == 503
@@ -0,0 +1,113 @@
+import random
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.api.limiter import DynamicRateLimiter
+from backend.auth.jwt import create_access_token
+from backend.config import settings
+from backend.core.events import IntentCreated, IntentJoined
+from backend.core.models.intent import Intent
+from backend.infra.persistence.density_repo import AreaDensity, DensityRepository
+from backend.infra.persistence.redis import RedisClient
+from backend.main import app, lifespan
+from backend.services.ranking_service import RankingService
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+def _intent() -> Intent:
+    # Random spot keeps runs from sharing a cell
+    return Intent(
+        title="Busy corner", emoji="🔥", latitude=random.uniform(10, 20), longitude=random.uniform(10, 20),
+        created_at=datetime.now(UTC),
+    )
+
+
+@pytest.mark.asyncio
+async def test_counters_decay_by_half_life():
+    container = app.state.container
+    intent = _intent()
+    await container.intent_repo.save_intent(intent)
+    repo = DensityRepository(RedisClient.get_client(), half_life_seconds=3600)
+    lat, lon, t0 = intent.latitude, intent.longitude, 1_700_000_000.0
+
+    assert await repo.record(intent.id, "joins", now=t0)
+    assert await repo.record(intent.id, "joins", now=t0)
+    assert await repo.record(intent.id, "creates", now=t0 + 3600)
+    assert not await repo.record(uuid4(), "joins", now=t0)  # not in the geo index
+
+    assert await repo.get(lat, lon, now=t0 + 3600) == pytest.approx(AreaDensity(creates=1.0, joins=1.0))
+    later = await repo.get(lat, lon, now=t0 + 7200)
+    assert later == pytest.approx(AreaDensity(creates=0.5, joins=0.5))
+    assert later.activity == pytest.approx(1.0)
+    assert await repo.get(-lat, -lon) == AreaDensity()
+
+
+@pytest.mark.asyncio
+async def test_events_feed_the_intent_cell():
+    container = app.state.container
+    intent = _intent()
+    await container.intent_repo.save_intent(intent)
+    lat, lon = intent.latitude, intent.longitude
+
+    now = datetime.now(UTC)
+    await container.event_bus.publish(IntentCreated(intent_id=intent.id, user_id="u", emoji="🔥", timestamp=now))
+    await container.event_bus.publish(IntentJoined(intent_id=intent.id, user_id=uuid4(), timestamp=now))
+    await container.event_bus.publish(IntentJoined(intent_id=intent.id, user_id=uuid4(), timestamp=now))
+
+    density = await container.density_service.density(lat, lon)
+    assert density.creates == pytest.approx(1.0, rel=0.01)
+    assert density.joins == pytest.approx(2.0, rel=0.01)
+    assert await container.density_service.density(-lat, -lon) == AreaDensity()
+
+
+def test_dynamic_limit_shrinks_in_busy_areas():
+    limiter = DynamicRateLimiter("create_intent", 5, 3600, busy_activity=50.0)
+    assert limiter.limit_for(0.0) == 5
+    assert limiter.limit_for(50.0) == 5
+    assert limiter.limit_for(100.0) == 2
+    assert limiter.limit_for(10_000.0) == 1
+
+
+@pytest.mark.asyncio
+async def test_intent_creation_is_limited_harder_in_busy_cells():
+    seeded = _intent()
+    await app.state.container.intent_repo.save_intent(seeded)
+    repo = DensityRepository(RedisClient.get_client())
+    # Far past DENSITY_BUSY_ACTIVITY: the limit of 5 drops to 1 in this cell
+    for _ in range(int(settings.DENSITY_BUSY_ACTIVITY * 6)):
+        await repo.record(seeded.id, "creates")
+    busy = {"latitude": seeded.latitude, "longitude": seeded.longitude}
+    quiet = {"latitude": -seeded.latitude, "longitude": -seeded.longitude}
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(uuid4())})}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers=headers) as client:
+        titles = iter(f"Plan {n}" for n in range(10))  # distinct titles get past the repeat check
+
+        async def create(location: dict, **params):
+            return await client.post("/intents/", json={"title": next(titles), "emoji": "🔥", **location}, params=params)
+
+        assert (await create(busy)).status_code == 201  # the first of a window skips the lookup
+        assert (await create(busy)).status_code == 429
+        # Same user and window, quiet cell: the limiter read the body and the endpoint still could
+        response = await create(quiet)
+        assert response.status_code == 201
+        assert (response.json()["latitude"], response.json()["longitude"]) == (quiet["latitude"], quiet["longitude"])
+        # Query params win over the body
+        assert (await create(quiet, lat=busy["latitude"], lon=busy["longitude"])).status_code == 429
+
+
+def test_area_popularity_breaks_ties():
+    ranking = RankingService(settings.model_copy(update={"RANKING_W_AREA": 1.0}))
+    now = datetime.now(UTC)
+    quiet, busy = (Intent(title=t, emoji="📍", latitude=0.0, longitude=0.0, created_at=now) for t in ("Quiet", "Busy"))
+
+    ranked = ranking.rank([(quiet, 0.5), (busy, 0.5)], radius_km=1.0, limit=2, area_activity=[0.0, 20.0])
+    assert [i.title for i in ranked] == ["Busy", "Quiet"]
@@ -0,0 +1,115 @@
+import time
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.core.models.intent import Intent
+from backend.core.models.message import Message
+from backend.infra.persistence.intent_repo import IntentRepository
+from backend.infra.persistence.join_repo import JoinRepository
+from backend.infra.persistence.keys import RedisKeys
+from backend.infra.persistence.message_repo import MessageRepository
+from backend.infra.persistence.presence_repo import PresenceRepository
+from backend.infra.persistence.redis import RedisClient
+from backend.main import app, lifespan
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+@pytest.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def _user(client: AsyncClient):
+    res = await client.post("/auth/handshake", json={})
+    user_id = uuid.UUID(res.json()["anon_id"])
+    return user_id, {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+async def _intent(owner: uuid.UUID) -> Intent:
+    intent = Intent(
+        title="Erasure test",
+        emoji="🧹",
+        latitude=20.0,
+        longitude=20.0,
+        user_id=str(owner),
+        created_at=datetime.now(UTC),
+    )
+    await IntentRepository(RedisClient.get_client()).save_intent(intent)
+    return intent
+
+
+async def _post(intent_id: uuid.UUID, user_id: uuid.UUID, content: str) -> None:
+    await MessageRepository(RedisClient.get_client()).save_message(
+        Message(intent_id=intent_id, user_id=user_id, content=content, created_at=datetime.now(UTC))
+    )
+
+
+@pytest.mark.asyncio
+async def test_delete_my_data_erases_owned_and_foreign_footprint(client: AsyncClient):
+    redis = RedisClient.get_client()
+    user_id, headers = await _user(client)
+    other_id, _ = await _user(client)
+
+    owned = await _intent(user_id)
+    await _post(owned.id, user_id, "mine")
+    foreign = await _intent(other_id)
+    await JoinRepository(redis).save_join(foreign.id, user_id)
+    await JoinRepository(redis).save_join(foreign.id, other_id)
+    await IntentRepository(redis).record_user_flag(foreign.id, user_id)
+    await _post(foreign.id, user_id, "hello")
+    await _post(foreign.id, other_id, "hi back")
+    # Quotes in content are escaped, so this cannot pass for the erased user's message
+    await _post(foreign.id, other_id, f'"user_id":"{user_id}"')
+    await redis.set(RedisKeys.spam_last_hash(str(user_id)), "abc")
+    now = int(time.time())
+    await PresenceRepository(redis).record({owned.id: {str(user_id)}, foreign.id: {str(user_id), str(other_id)}}, now=now)
+
+    res = await client.delete("/auth/me/data", headers=headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["status"] == "deleted"
+    assert body["memberships_removed"] == 1
+    assert body["messages_removed"] == 1
+    assert body["keys_removed"] >= 3
+
+    # Owned intent is gone everywhere
+    assert not await redis.exists(
+        RedisKeys.intent(owned.id), RedisKeys.intent_messages(owned.id), RedisKeys.presence(owned.id)
+    )
+    assert await redis.zscore(RedisKeys.intent_geo(), str(owned.id)) is None
+    assert await redis.zscore(RedisKeys.intent_geo_unverified(), str(owned.id)) is None
+    assert await redis.zscore(RedisKeys.expiry_queue(), str(owned.id)) is None
+    assert not await redis.exists(
+        RedisKeys.user_intents(str(user_id)),
+        RedisKeys.spam_last_hash(str(user_id)),
+        RedisKeys.user_joined(user_id),
+        RedisKeys.user_posted(user_id),
+        RedisKeys.user_flagged(user_id),
+    )
+
+    # Foreign intent survives, minus the erased user's footprint
+    assert await redis.exists(RedisKeys.intent(foreign.id))
+    assert await redis.smembers(RedisKeys.intent_joins(foreign.id)) == {str(other_id)}
+    assert not await redis.sismember(RedisKeys.intent_flags(foreign.id), str(user_id))
+    assert await redis.zrange(RedisKeys.presence(foreign.id), 0, -1) == [str(other_id)]
+    remaining = await MessageRepository(redis).get_messages(foreign.id)
+    assert [m.user_id for m in remaining] == [other_id, other_id]
+    assert remaining[0].content == "hi back"
+
+
+@pytest.mark.asyncio
+async def test_delete_my_data_without_data(client: AsyncClient):
+    _, headers = await _user(client)
+    res = await client.delete("/auth/me/data", headers=headers)
+    assert res.status_code == 200
+    assert res.json() == {"status": "deleted", "keys_removed": 0, "memberships_removed": 0, "messages_removed": 0}
@@ -1,6 +1,8 @@
+from datetime import UTC
+
 import pytest
-import httpx
 from httpx import ASGITransport, AsyncClient
+
 from backend.main import app, lifespan
 
 
@@ -48,3 +50,166 @@ async def test_empty_state(client: AsyncClient):
     data = response.json()
     assert data["count"] == 0
     assert data["message"] is not None
+
+
+async def _seed_system_intents(lat: float, lon: float, count: int):
+    from datetime import datetime
+
+    from backend.core.models.intent import Intent
+    from backend.infra.persistence.intent_repo import IntentRepository
+    from backend.infra.persistence.redis import RedisClient
+
+    repo = IntentRepository(RedisClient.get_client())
+    for i in range(count):
+        await repo.save_intent(Intent(
+            title=f"Seeded intent number {i}",
+            emoji="🧪",
+            latitude=lat + i * 0.0001,
+            longitude=lon,
+            created_at=datetime.now(UTC),
+            is_system=True,
+        ))
+
+
+@pytest.mark.asyncio
+async def test_nearby_conditional_and_compact(client: AsyncClient):
+    lat, lon = -33.8688, 151.2093
+    await _seed_system_intents(lat, lon, 3)
+
+    res = await client.get(f"/intents/nearby?lat={lat}&lon={lon}&view=compact")
+    assert res.status_code == 200
+    item = res.json()["intents"][0]
+    assert set(item) == {"id", "emoji", "title", "latitude", "longitude", "join_count", "online_count"}
+    etag = res.headers["ETag"]
+
+    res = await client.get(
+        f"/intents/nearby?lat={lat}&lon={lon}&view=compact",
+        headers={"If-None-Match": etag},
+    )
+    assert res.status_code == 304
+
+    # Full view is a different representation
+    res = await client.get(
+        f"/intents/nearby?lat={lat}&lon={lon}", headers={"If-None-Match": etag}
+    )
+    assert res.status_code == 200
+    assert "created_at" in res.json()["intents"][0]
+
+
+@pytest.mark.asyncio
+async def test_nearby_large_payload_is_gzipped(client: AsyncClient):
+    lat, lon = 51.5074, -0.1278
+    await _seed_system_intents(lat, lon, 20)
+
+    res = await client.get(
+        f"/intents/nearby?lat={lat}&lon={lon}", headers={"Accept-Encoding": "gzip"}
+    )
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.json()["count"] >= 20
+
+
+@pytest.mark.asyncio
+async def test_find_nearby_skips_hidden_intents_before_fetching_them(monkeypatch):
+    import random
+    from datetime import datetime
+    from uuid import uuid4
+
+    from backend.core.models.intent import Intent
+    from backend.infra.persistence.intent_repo import IntentRepository
+    from backend.infra.persistence.join_repo import JoinRepository
+    from backend.infra.persistence.keys import RedisKeys
+    from backend.infra.persistence.redis import RedisClient
+
+    redis = RedisClient.get_client()
+    repo = IntentRepository(redis)
+    lat, lon = random.uniform(60, 65), random.uniform(-25, -15)  # fresh area: earlier runs leave keys behind
+    far_lat = lat + 0.01  # ~1.1 km north
+
+    def make(**kwargs) -> Intent:
+        return Intent(title="Ring", emoji="💍", longitude=lon, created_at=datetime.now(UTC), **kwargs)
+
+    unverified, joined, system = make(latitude=far_lat), make(latitude=far_lat), make(latitude=far_lat, is_system=True)
+    remote = make(latitude=lat + 0.15)  # ~17 km: only reached by growing the rings
+    for intent in (unverified, joined, system, remote):
+        await repo.save_intent(intent)
+    await JoinRepository(redis).save_join(joined.id, uuid4())
+    await JoinRepository(redis).save_join(remote.id, uuid4())
+
+    fetched: list[str] = []
+    mget = redis.mget
+
+    async def spy(keys):
+        fetched.extend(keys)
+        return await mget(keys)
+
+    monkeypatch.setattr(redis, "mget", spy)
+    pairs = await repo.find_nearby(lat, lon, radius_km=20.0, limit=10)
+
+    assert {intent.id for intent, _ in pairs} == {joined.id, system.id, remote.id}
+    assert RedisKeys.intent(unverified.id) not in fetched
+    assert next(i for i, _ in pairs if i.id == joined.id).join_count == 1
+
+
+@pytest.mark.asyncio
+async def test_first_join_promotes_to_the_verified_geo_tier():
+    import random
+    from datetime import datetime
+    from uuid import uuid4
+
+    from backend.core.models.intent import Intent
+    from backend.infra.persistence.intent_repo import IntentRepository
+    from backend.infra.persistence.join_repo import JoinRepository
+    from backend.infra.persistence.keys import RedisKeys
+    from backend.infra.persistence.redis import RedisClient
+
+    redis = RedisClient.get_client()
+    repo = IntentRepository(redis)
+    lat, lon = random.uniform(-45, -40), random.uniform(170, 175)
+    intent = Intent(title="Tiered", emoji="🪜", latitude=lat + 0.01, longitude=lon, created_at=datetime.now(UTC))
+    await repo.save_intent(intent)
+
+    member = str(intent.id)
+    position = await redis.geopos(RedisKeys.intent_geo_unverified(), member)
+    assert position != [None]
+    assert await redis.geopos(RedisKeys.intent_geo(), member) == [None]
+    assert await repo.find_nearby(lat, lon, radius_km=5.0) == []  # ~1.1 km away, unverified
+
+    await JoinRepository(redis).save_join(intent.id, uuid4())
+    await JoinRepository(redis).save_join(intent.id, uuid4())  # later joins leave the tiers alone
+
+    assert await redis.geopos(RedisKeys.intent_geo_unverified(), member) == [None]
+    assert await redis.geopos(RedisKeys.intent_geo(), member) == position
+    assert [i.id for i, _ in await repo.find_nearby(lat, lon, radius_km=5.0)] == [intent.id]
+
+
+@pytest.mark.asyncio
+async def test_nearby_ranking_strategy_param(client: AsyncClient):
+    response = await client.get("/intents/nearby?lat=0&lon=0&ranking=distance")
+    assert response.status_code == 200
+    response = await client.get("/intents/nearby?lat=0&lon=0&ranking=nope")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_anonymous_callers_are_not_bucketed_per_request(client: AsyncClient):
+    lat, lon = 35.6762, 139.6503
+    await _seed_system_intents(lat, lon, 5)
+    ranking = app.state.container.ranking_service
+    chosen = []
+    strategy_for = ranking.strategy_for
+
+    def spy(user_id=None, requested=None):
+        chosen.append(strategy_for(user_id, requested))
+        return chosen[-1]
+
+    ranking.experiment = ("distance", 50)
+    ranking.strategy_for = spy
+    try:
+        etags = {(await client.get(f"/intents/nearby?lat={lat}&lon={lon}")).headers["ETag"] for _ in range(10)}
+    finally:
+        del ranking.strategy_for
+        ranking.experiment = None
+
+    assert chosen == ["linear"] * 10
+    assert len(etags) == 1
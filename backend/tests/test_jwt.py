@@ -0,0 +1,67 @@
+import uuid
+from datetime import timedelta
+
+from prometheus_client import REGISTRY
+
+from backend.auth.jwt import (
+    VerifiedTokenCache,
+    create_access_token,
+    token_cache,
+    verify_access_token,
+)
+
+
+def test_verify_access_token_caches_verified_tokens():
+    token_cache.clear()
+    user_id = str(uuid.uuid4())
+    token = create_access_token({"sub": user_id})
+
+    first = verify_access_token(token)
+    second = verify_access_token(token)
+    assert first == (user_id, uuid.UUID(user_id))
+    assert second[1] is first[1]  # UUID reused, not rebuilt
+    assert token_cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_verify_access_token_rejects_and_does_not_cache_invalid():
+    token_cache.clear()
+    assert verify_access_token("not-a-jwt") is None
+    assert verify_access_token(create_access_token({"sub": "not-a-uuid"})) is None
+    assert token_cache.stats()["size"] == 0
+
+
+def test_expired_token_is_not_served_from_cache():
+    token_cache.clear()
+    token = create_access_token({"sub": str(uuid.uuid4())}, expires_delta=timedelta(seconds=-1))
+    assert verify_access_token(token) is None
+
+    cache = VerifiedTokenCache(maxsize=10)
+    key = cache.digest("token")
+    cache.put(key, "u", uuid.uuid4(), exp=100.0)
+    assert cache.get(key, now=99.0) is not None
+    assert cache.get(key, now=100.0) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_is_bounded_lru():
+    cache = VerifiedTokenCache(maxsize=2)
+    keys = [cache.digest(f"t{i}") for i in range(3)]
+    cache.put(keys[0], "a", uuid.uuid4(), exp=1e12)
+    cache.put(keys[1], "b", uuid.uuid4(), exp=1e12)
+    cache.get(keys[0], now=0)  # touch -> most recently used
+    cache.put(keys[2], "c", uuid.uuid4(), exp=1e12)
+
+    assert cache.get(keys[1], now=0) is None
+    assert cache.get(keys[0], now=0) is not None
+    assert cache.get(keys[2], now=0) is not None
+
+
+def test_cache_lookups_are_exported_as_metrics():
+    token_cache.clear()
+    hits_before = REGISTRY.get_sample_value("nowhere_jwt_cache_lookups_total", {"result": "hit"}) or 0.0
+    token = create_access_token({"sub": str(uuid.uuid4())})
+    verify_access_token(token)
+    verify_access_token(token)
+
+    assert REGISTRY.get_sample_value("nowhere_jwt_cache_lookups_total", {"result": "hit"}) == hits_before + 1
+    assert REGISTRY.get_sample_value("nowhere_jwt_cache_size") == 1
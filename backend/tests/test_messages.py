@@ -0,0 +1,143 @@
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from redis.asyncio import Redis
+
+from backend.core.models.intent import Intent
+from backend.core.models.message import Message
+from backend.infra.persistence.intent_repo import IntentRepository
+from backend.infra.persistence.join_repo import JoinRepository
+from backend.infra.persistence.keys import RedisKeys
+from backend.infra.persistence.message_repo import MessageRepository
+from backend.infra.persistence.redis import RedisClient
+from backend.main import app, lifespan
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+@pytest.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def _member_with_intent(client: AsyncClient):
+    """Create an intent directly in Redis and join it as a freshly authenticated user."""
+    res = await client.post("/auth/handshake", json={})
+    user_id = uuid.UUID(res.json()["anon_id"])
+    headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    redis = RedisClient.get_client()
+    intent = Intent(
+        title="Chat test",
+        emoji="🧪",
+        latitude=12.0,
+        longitude=12.0,
+        created_at=datetime.now(UTC),
+    )
+    await IntentRepository(redis).save_intent(intent)
+    await JoinRepository(redis).save_join(intent.id, user_id)
+    return intent, user_id, headers
+
+
+async def _post(intent_id: uuid.UUID, user_id: uuid.UUID, content: str) -> Message:
+    message = Message(
+        intent_id=intent_id,
+        user_id=user_id,
+        content=content,
+        created_at=datetime.now(UTC),
+    )
+    await MessageRepository(RedisClient.get_client()).save_message(message)
+    return message
+
+
+@pytest.mark.asyncio
+async def test_get_messages_conditional(client: AsyncClient):
+    intent, user_id, headers = await _member_with_intent(client)
+    await _post(intent.id, user_id, "first")
+
+    res = await client.get(f"/intents/{intent.id}/messages", headers=headers)
+    assert res.status_code == 200
+    assert [m["content"] for m in res.json()] == ["first"]
+    etag = res.headers["ETag"]
+
+    # Unchanged poll -> 304, no body
+    res = await client.get(
+        f"/intents/{intent.id}/messages", headers={**headers, "If-None-Match": etag}
+    )
+    assert res.status_code == 304
+    assert res.content == b""
+
+    # A new message bumps the version
+    await _post(intent.id, user_id, "second")
+    res = await client.get(
+        f"/intents/{intent.id}/messages", headers={**headers, "If-None-Match": etag}
+    )
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_get_messages_since(client: AsyncClient):
+    intent, user_id, headers = await _member_with_intent(client)
+    first = await _post(intent.id, user_id, "first")
+    await _post(intent.id, user_id, "second")
+
+    res = await client.get(
+        f"/intents/{intent.id}/messages",
+        params={"since": first.created_at.isoformat()},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    assert [m["content"] for m in res.json()] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_get_messages_requires_membership(client: AsyncClient):
+    intent, _user_id, _headers = await _member_with_intent(client)
+    res = await client.get(f"/intents/{intent.id}/messages")
+    assert res.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_get_messages_etag_is_per_slice(client: AsyncClient):
+    intent, user_id, headers = await _member_with_intent(client)
+    await _post(intent.id, user_id, "first")
+    await _post(intent.id, user_id, "second")
+
+    res = await client.get(f"/intents/{intent.id}/messages", headers=headers)
+    etag = res.headers["ETag"]
+
+    # Same version, different slice: must not be answered with 304
+    res = await client.get(
+        f"/intents/{intent.id}/messages",
+        params={"limit": 1},
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert res.status_code == 200
+    assert [m["content"] for m in res.json()] == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_membership_check_can_bypass_a_lagging_reader():
+    redis = RedisClient.get_client()
+    # A reader on another database stands in for a replica that hasn't caught up
+    lagging = Redis(connection_pool=redis.connection_pool.__class__(
+        **{**redis.connection_pool.connection_kwargs, "db": 1}
+    ))
+    intent_id, user_id = uuid.uuid4(), uuid.uuid4()
+    await redis.sadd(RedisKeys.intent_joins(intent_id), str(user_id))
+    try:
+        repo = JoinRepository(redis, reader=lagging)
+        assert not await repo.is_member(intent_id, user_id)
+        assert await repo.is_member(intent_id, user_id, primary=True)
+    finally:
+        await redis.delete(RedisKeys.intent_joins(intent_id))
+        await lagging.aclose()
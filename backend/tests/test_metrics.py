@@ -0,0 +1,34 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.main import app, lifespan
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_metrics_prometheus_exposition():
+    transport = ASGITransport(app=app, client=("127.0.0.1", 5000))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/intents/nearby?lat=0&lon=0")
+        res = await client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    body = res.text
+    # Route templates, not raw paths, label the request histogram
+    assert 'nowhere_http_request_duration_seconds_count{method="GET",route="/intents/nearby",status="200"}' in body
+    assert 'nowhere_redis_call_duration_seconds_count{method="find_nearby",repository="intent"}' in body
+    assert "nowhere_active_intents_geo" in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_forbidden_for_remote_clients():
+    transport = ASGITransport(app=app, client=("203.0.113.7", 5000))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.get("/metrics")
+    assert res.status_code == 403
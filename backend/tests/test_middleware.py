@@ -0,0 +1,57 @@
+import uuid
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.main import app, lifespan
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+@pytest.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.mark.asyncio
+async def test_security_headers_and_request_id(client: AsyncClient):
+    res = await client.get("/health", headers={"X-Request-ID": "req-123"})
+    assert res.headers["X-Request-ID"] == "req-123"
+    assert res.headers["X-Content-Type-Options"] == "nosniff"
+    assert res.headers["X-Frame-Options"] == "DENY"
+    assert "frame-ancestors 'none'" in res.headers["Content-Security-Policy"]
+
+    # A request ID is generated when the client does not send one
+    res = await client.get("/health")
+    assert uuid.UUID(res.headers["X-Request-ID"])
+
+
+@pytest.mark.asyncio
+async def test_body_size_limit(client: AsyncClient):
+    res = await client.post(
+        "/auth/handshake",
+        content=b"{}",
+        headers={"Content-Type": "application/json", "Content-Length": str(2 * 1_048_576)},
+    )
+    assert res.status_code == 413
+    assert res.json() == {"detail": "Request body too large"}
+    assert res.headers["X-Content-Type-Options"] == "nosniff"
+
+
+@pytest.mark.asyncio
+async def test_authenticated_identity_sets_cookie(client: AsyncClient):
+    res = await client.post("/auth/handshake", json={})
+    token, anon_id = res.json()["access_token"], res.json()["anon_id"]
+
+    res = await client.get("/health", headers={"Authorization": f"Bearer {token}"})
+    assert res.cookies.get("user_id") == anon_id
+
+    # Invalid tokens fall back to an ephemeral identity without a cookie
+    res = await client.get("/health", headers={"Authorization": "Bearer not-a-jwt"})
+    assert "user_id" not in res.cookies
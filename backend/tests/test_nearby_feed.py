@@ -0,0 +1,184 @@
+import json
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from starlette.testclient import TestClient
+
+from backend.api.nearby_feed import NearbyFeed
+from backend.api.ws import get_ws_manager
+from backend.auth.jwt import create_access_token
+from backend.core.events import IntentCreated, MessagePosted
+from backend.core.models.intent import Intent
+from backend.infra.persistence.event_store import RedisEventStore
+from backend.infra.persistence.intent_repo import IntentRepository
+from backend.infra.persistence.redis import RedisClient
+from backend.main import app, lifespan
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent: list[dict] = []
+
+    async def send_text(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+def _intent(lat: float, lon: float, join_count: int = 1) -> Intent:
+    # join_count >= 1 keeps it visible beyond the 200m zero-join radius
+    return Intent(
+        title="Nearby", emoji="📍", latitude=lat, longitude=lon,
+        created_at=datetime.now(UTC), join_count=join_count,
+    )
+
+
+@pytest.mark.asyncio
+async def test_subscribe_sends_snapshot():
+    feed = NearbyFeed(max_subscriptions=10)
+    ws = FakeWebSocket()
+    shown = _intent(51.5, -0.12)
+
+    assert await feed.subscribe(ws, 51.5, -0.12, 1.0, [shown])
+    assert [m["type"] for m in ws.sent] == ["snapshot"]
+    assert [i["id"] for i in ws.sent[0]["intents"]] == [str(shown.id)]
+    assert len(feed) == 1
+
+
+@pytest.mark.asyncio
+async def test_subscribe_rejects_when_full_but_allows_moving():
+    feed = NearbyFeed(max_subscriptions=1)
+    ws = FakeWebSocket()
+    assert await feed.subscribe(ws, 0.0, 0.0, 1.0, [])
+    assert not await feed.subscribe(FakeWebSocket(), 0.0, 0.0, 1.0, [])
+    assert await feed.subscribe(ws, 10.0, 10.0, 1.0, [])  # moving the viewport is not a new slot
+    assert len(feed) == 1
+
+
+@pytest.mark.asyncio
+async def test_changes_are_pushed_as_add_update_remove():
+    feed = NearbyFeed(max_subscriptions=10)
+    near, far = FakeWebSocket(), FakeWebSocket()
+    await feed.subscribe(near, 51.5, -0.12, 1.0, [])
+    await feed.subscribe(far, 48.85, 2.35, 1.0, [])
+    intent = _intent(51.501, -0.121)
+
+    assert await feed.on_intent_changed(intent.id, intent) == 1
+    assert near.sent[-1]["type"] == "add"
+
+    # Unchanged counts: nothing to send
+    assert await feed.on_intent_changed(intent.id, intent) == 0
+
+    joined = intent.with_counts(join_count=2, online_count=1)
+    assert await feed.on_intent_changed(intent.id, joined) == 1
+    assert near.sent[-1]["type"] == "update"
+    assert near.sent[-1]["intent"]["join_count"] == 2
+
+    assert await feed.on_intent_changed(intent.id, None) == 1
+    assert near.sent[-1] == {"type": "remove", "id": str(intent.id)}
+    assert len(far.sent) == 1  # only its snapshot
+
+
+@pytest.mark.asyncio
+async def test_changes_during_the_snapshot_query_are_replayed_after_it():
+    feed = NearbyFeed(max_subscriptions=10)
+    ws = FakeWebSocket()
+    assert feed.reserve(ws, 51.5, -0.12, 1.0)
+    snapshot = []  # queried before the intent below was created
+
+    # Consumed while the snapshot query is in flight
+    created = _intent(51.501, -0.121)
+    assert await feed.on_intent_changed(created.id, created) == 0
+    already = _intent(51.502, -0.122)
+    await feed.on_intent_changed(already.id, already)
+    assert ws.sent == []
+
+    # `already` made it into the snapshot, so only `created` is replayed
+    await feed.send_snapshot(ws, snapshot + [already])
+    assert [m["type"] for m in ws.sent] == ["snapshot", "add"]
+    assert ws.sent[1]["intent"]["id"] == str(created.id)
+
+    # Live from here on
+    assert await feed.on_intent_changed(created.id, None) == 1
+    assert ws.sent[-1] == {"type": "remove", "id": str(created.id)}
+
+
+@pytest.mark.asyncio
+async def test_flagged_intents_are_removed():
+    feed = NearbyFeed(max_subscriptions=10)
+    ws = FakeWebSocket()
+    intent = _intent(0.0, 0.0)
+    await feed.subscribe(ws, 0.0, 0.0, 1.0, [intent])
+
+    flagged = intent.model_copy(update={"flags": 3})
+    assert await feed.on_intent_changed(intent.id, flagged) == 1
+    assert ws.sent[-1] == {"type": "remove", "id": str(intent.id)}
+
+
+@pytest.mark.asyncio
+async def test_unsubscribed_sockets_get_nothing():
+    feed = NearbyFeed(max_subscriptions=10)
+    ws = FakeWebSocket()
+    intent = _intent(0.0, 0.0)
+    await feed.subscribe(ws, 0.0, 0.0, 1.0, [intent])
+    feed.unsubscribe(ws)
+
+    assert await feed.on_intent_changed(intent.id, None) == 0
+    assert await feed.on_intent_changed(intent.id, intent) == 0
+    assert len(feed) == 0
+
+
+@pytest.mark.asyncio
+async def test_consume_applies_events_from_the_stream():
+    async with lifespan(app):
+        reader = RedisClient.get_reader()
+        store = RedisEventStore(RedisClient.get_client())
+        feed = NearbyFeed(max_subscriptions=10)
+        repo = IntentRepository(RedisClient.get_client())
+        ws = FakeWebSocket()
+        await feed.subscribe(ws, 40.0, -74.0, 1.0, [])
+        await feed.consume(reader, repo)  # pins the read position to the stream tail
+
+        intent = _intent(40.001, -74.001)
+        await repo.save_intent(intent)
+        now = datetime.now(UTC)
+        await store.append(IntentCreated(intent_id=intent.id, user_id="u", emoji="📍", timestamp=now))
+        await store.append(MessagePosted(message_id=uuid4(), intent_id=intent.id, user_id=uuid4(), content_length=1, timestamp=now))
+
+        assert await feed.consume(reader, repo) == 1
+        assert ws.sent[-1]["type"] == "add"
+        assert ws.sent[-1]["intent"]["id"] == str(intent.id)
+
+
+@pytest.mark.asyncio
+async def test_check_expired_removes_vanished_intents():
+    async with lifespan(app):
+        reader = RedisClient.get_reader()
+        live = _intent(1.0, 1.0)
+        await IntentRepository(RedisClient.get_client()).save_intent(live)
+        expired = _intent(1.001, 1.001)  # never saved: stands in for an intent whose TTL ran out
+
+        feed = NearbyFeed(max_subscriptions=10)
+        ws = FakeWebSocket()
+        await feed.subscribe(ws, 1.0, 1.0, 1.0, [live, expired])
+
+        assert await feed.check_expired(reader) == 1
+        assert ws.sent[-1] == {"type": "remove", "id": str(expired.id)}
+        assert await feed.check_expired(reader) == 0
+
+
+def test_endpoint_registers_with_manager_and_throttles_resubscribes():
+    token = create_access_token({"sub": str(uuid4())})
+    subscribe = {"type": "subscribe", "lat": 35.0, "lon": 139.0, "radius": 1.0}
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/ws/nearby?token={token}") as ws:
+            ws.send_text(json.dumps(subscribe))
+            assert ws.receive_json()["type"] == "snapshot"
+            assert get_ws_manager().feed_size == 1
+
+            ws.send_text(json.dumps(subscribe))  # same circle: no new query
+            ws.send_text(json.dumps({**subscribe, "lat": 35.01}))  # moved, but too soon
+            assert ws.receive_json() == {"type": "error", "message": "Resubscribing too fast"}
+        assert get_ws_manager().feed_size == 0
@@ -0,0 +1,149 @@
+import time
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from backend.api.heartbeat import Heartbeat
+from backend.api.ws import ConnectionManager, get_ws_manager
+from backend.auth.jwt import create_access_token
+from backend.core.models.intent import Intent
+from backend.infra.persistence.intent_repo import IntentRepository
+from backend.infra.persistence.join_repo import JoinRepository
+from backend.infra.persistence.keys import RedisKeys
+from backend.infra.persistence.presence_repo import (
+    PRESENCE_WINDOW_SECONDS,
+    PresenceRepository,
+)
+from backend.infra.persistence.redis import RedisClient
+from backend.main import app, lifespan
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+class FakeWebSocket:
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+class CountingRedis:
+    """Wraps the client to count pipeline commands per flush."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self.commands: list[str] = []
+
+    def pipeline(self, transaction: bool = True):
+        pipe = self._redis.pipeline(transaction=transaction)
+        original = pipe.pipeline_execute_command
+
+        def record(*args, **kwargs):
+            self.commands.append(args[0])
+            return original(*args, **kwargs)
+
+        pipe.pipeline_execute_command = record
+        return pipe
+
+
+async def _intent(lat: float = 10.0) -> Intent:
+    intent = Intent(title="Presence", emoji="👋", latitude=lat, longitude=10.0, is_system=True, created_at=datetime.now(UTC))
+    await IntentRepository(RedisClient.get_client()).save_intent(intent)
+    return intent
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_one_zadd_per_room():
+    redis = CountingRedis(RedisClient.get_client())
+    manager = ConnectionManager(max_per_room=100, max_total=1000)
+    heartbeat = Heartbeat(manager, idle_timeout=60, tick=1, room_check_interval=30)
+    room_a, room_b = uuid4(), uuid4()
+    conns = [manager.join(room_a, FakeWebSocket(), user_id=uuid4()) for _ in range(5)]
+    manager.join(room_b, FakeWebSocket(), user_id=uuid4())
+
+    # Many pings within one tick still cost one ZADD per room
+    for _ in range(3):
+        for conn in conns:
+            manager.touch(conn)
+    await heartbeat.flush_presence(PresenceRepository(redis))
+
+    assert redis.commands.count("ZADD") == 2
+    presence = PresenceRepository(RedisClient.get_client())
+    assert await presence.online_count(room_a) == 5
+    assert await presence.online_count(room_b) == 1
+
+    # Nothing happened since: no write at all
+    redis.commands.clear()
+    await heartbeat.flush_presence(PresenceRepository(redis))
+    assert redis.commands == []
+
+
+@pytest.mark.asyncio
+async def test_closing_a_socket_leaves_other_workers_presence_alone():
+    presence = PresenceRepository(RedisClient.get_client())
+    workers = [ConnectionManager(max_per_room=100, max_total=1000) for _ in range(2)]
+    heartbeats = [Heartbeat(m, idle_timeout=60, tick=1, room_check_interval=30) for m in workers]
+    room, user = uuid4(), uuid4()
+    phone, laptop = FakeWebSocket(), FakeWebSocket()
+    workers[0].join(room, phone, user_id=user)
+    workers[1].join(room, laptop, user_id=user)
+    for heartbeat in heartbeats:
+        await heartbeat.flush_presence(presence)
+    assert await presence.online_count(room) == 1
+
+    # The phone's worker has no socket of the user left; the laptop is still in the room
+    workers[0].leave(room, phone)
+    for heartbeat in heartbeats:
+        await heartbeat.flush_presence(presence)
+    assert await presence.online_count(room) == 1
+
+
+@pytest.mark.asyncio
+async def test_presence_ages_out_of_the_window():
+    presence = PresenceRepository(RedisClient.get_client())
+    room = uuid4()
+    await presence.record({room: {str(uuid4())}}, now=time.time() - PRESENCE_WINDOW_SECONDS - 1)
+    assert await presence.online_count(room) == 0
+
+
+@pytest.mark.asyncio
+async def test_online_count_hydrated_and_stale_entries_ignored():
+    redis = RedisClient.get_client()
+    lively, quiet = await _intent(10.0), await _intent(10.001)
+    now = time.time()
+    await PresenceRepository(redis).record({lively.id: {str(uuid4()), str(uuid4())}}, now=now)
+    await redis.zadd(RedisKeys.presence(quiet.id), {str(uuid4()): now - PRESENCE_WINDOW_SECONDS - 1})
+
+    pairs = await IntentRepository(redis).find_nearby(10.0, 10.0, radius_km=1.0)
+    online = {intent.id: intent.online_count for intent, _ in pairs}
+    assert online[lively.id] == 2
+    assert online[quiet.id] == 0
+    assert (await IntentRepository(redis).get_intent(str(lively.id))).online_count == 2
+
+
+def test_chat_socket_requires_membership_before_counting_presence():
+    user_id = uuid4()
+    token = create_access_token({"sub": str(user_id)})
+    with TestClient(app) as client:
+        intent = Intent(title="Members only", emoji="🔒", latitude=10.0, longitude=10.0, created_at=datetime.now(UTC))
+        client.portal.call(IntentRepository(RedisClient.get_client()).save_intent, intent)
+        path = f"/ws/intents/{intent.id}/messages?token={token}"
+
+        with pytest.raises(WebSocketDisconnect) as refused, client.websocket_connect(path) as ws:
+            ws.receive_text()
+        assert refused.value.code == 4003
+        assert get_ws_manager().room_size(intent.id) == 0
+
+        client.portal.call(JoinRepository(RedisClient.get_client()).save_join, intent.id, user_id)
+        with client.websocket_connect(path) as ws:
+            ws.send_text("ping")
+            assert ws.receive_text() == "pong"
+            assert get_ws_manager().room_size(intent.id) == 1
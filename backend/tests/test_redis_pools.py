@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.config import settings
+from backend.core.metrics import REDIS_POOL_IN_USE, REDIS_POOL_WAIT_SECONDS
+from backend.infra.persistence.redis import InstrumentedPool, RedisClient
+from backend.main import app, lifespan
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+def _sample(metric, name: str, role: str) -> float:
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name == name and sample.labels.get("role") == role:
+                return sample.value
+    return 0.0
+
+
+@pytest.mark.asyncio
+async def test_separate_read_and_write_pools():
+    writer, reader = RedisClient.get_client(), RedisClient.get_reader()
+    assert writer is not reader
+    assert writer.connection_pool.role == "write"
+    assert reader.connection_pool.role == "read"
+    assert writer.connection_pool.max_connections == settings.REDIS_WRITE_POOL_SIZE
+    assert reader.connection_pool.max_connections == settings.REDIS_READ_POOL_SIZE
+
+    repo = app.state.container.intent_repo
+    assert repo.redis is writer and repo.reader is reader
+
+
+@pytest.mark.asyncio
+async def test_pool_exports_wait_and_in_use():
+    before = _sample(REDIS_POOL_WAIT_SECONDS, "nowhere_redis_pool_wait_seconds_count", "read")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.get("/intents/nearby?lat=0&lon=0")
+    assert res.status_code == 200
+
+    assert _sample(REDIS_POOL_WAIT_SECONDS, "nowhere_redis_pool_wait_seconds_count", "read") > before
+    assert _sample(REDIS_POOL_IN_USE, "nowhere_redis_pool_in_use", "read") == 0
+
+
+@pytest.mark.asyncio
+async def test_exhausted_pool_queues_instead_of_failing():
+    pool = InstrumentedPool.from_url(settings.REDIS_DSN, role="test", max_connections=1, timeout=2)
+    first = await pool.get_connection("PING")
+    waiter = asyncio.create_task(pool.get_connection("PING"))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    await pool.release(first)
+    second = await asyncio.wait_for(waiter, timeout=1)
+    assert second is first
+    await pool.release(second)
+    await pool.disconnect()
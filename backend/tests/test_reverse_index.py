@@ -0,0 +1,103 @@
+import time
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from backend.core.event_bus import InMemoryEventBus
+from backend.core.models.intent import Intent
+from backend.core.models.message import Message
+from backend.infra.persistence.intent_repo import IntentRepository
+from backend.infra.persistence.join_repo import JoinRepository
+from backend.infra.persistence.keys import RedisKeys
+from backend.infra.persistence.message_repo import MessageRepository
+from backend.infra.persistence.redis import RedisClient
+from backend.infra.persistence.unit_of_work import RedisUnitOfWork
+from backend.main import app, lifespan
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+async def _intent(ttl: int | None = None) -> Intent:
+    redis = RedisClient.get_client()
+    intent = Intent(title="Index test", emoji="📇", latitude=30.0, longitude=30.0, created_at=datetime.now(UTC))
+    await IntentRepository(redis).save_intent(intent)
+    if ttl is not None:
+        await redis.expire(RedisKeys.intent(intent.id), ttl)
+    return intent
+
+
+@pytest.mark.asyncio
+async def test_join_and_post_populate_reverse_indexes():
+    redis = RedisClient.get_client()
+    user_id = uuid.uuid4()
+    first, second = await _intent(), await _intent(ttl=600)
+
+    await JoinRepository(redis).save_join(first.id, user_id)
+    await JoinRepository(redis).save_join(second.id, user_id)
+    await MessageRepository(redis).save_message(
+        Message(intent_id=second.id, user_id=user_id, content="hi", created_at=datetime.now(UTC))
+    )
+
+    # Ordered by intent expiry; key TTL follows the longest-lived member
+    assert await JoinRepository(redis).get_joined_intents(user_id) == [str(second.id), str(first.id)]
+    assert await MessageRepository(redis).get_posted_intents(user_id) == [str(second.id)]
+    assert await redis.ttl(RedisKeys.user_joined(user_id)) > 600
+    assert 0 < await redis.ttl(RedisKeys.user_posted(user_id)) <= 600
+
+
+@pytest.mark.asyncio
+async def test_flag_index_follows_the_intent_expiry():
+    redis = RedisClient.get_client()
+    user_id = uuid.uuid4()
+    intent = await _intent(ttl=600)
+
+    await IntentRepository(redis).record_user_flag(intent.id, user_id)
+
+    score = await redis.zscore(RedisKeys.user_flagged(user_id), str(intent.id))
+    assert abs(score - (time.time() + 600)) <= 2
+    assert 0 < await redis.ttl(RedisKeys.intent_flags(intent.id)) <= 600
+
+
+@pytest.mark.asyncio
+async def test_join_on_missing_intent_is_not_indexed():
+    redis = RedisClient.get_client()
+    user_id = uuid.uuid4()
+    with pytest.raises(ValueError):
+        await JoinRepository(redis).save_join(uuid.uuid4(), user_id)
+    assert not await redis.exists(RedisKeys.user_joined(user_id))
+
+
+@pytest.mark.asyncio
+async def test_expired_members_are_pruned_on_write():
+    redis = RedisClient.get_client()
+    user_id = uuid.uuid4()
+    stale = str(uuid.uuid4())
+    await redis.zadd(RedisKeys.user_joined(user_id), {stale: int(time.time()) - 10})
+
+    intent = await _intent()
+    await JoinRepository(redis).save_join(intent.id, user_id)
+
+    assert await redis.zrange(RedisKeys.user_joined(user_id), 0, -1) == [str(intent.id)]
+
+
+@pytest.mark.asyncio
+async def test_indexes_written_inside_unit_of_work():
+    redis = RedisClient.get_client()
+    user_id = uuid.uuid4()
+    intent = await _intent()
+
+    uow = RedisUnitOfWork(redis=redis, event_bus=InMemoryEventBus())
+    async with uow:
+        await uow.join_repo.save_join(intent.id, user_id)
+        await uow.message_repo.save_message(
+            Message(intent_id=intent.id, user_id=user_id, content="tx", created_at=datetime.now(UTC))
+        )
+        await uow.commit()
+
+    assert await JoinRepository(redis).get_joined_intents(user_id) == [str(intent.id)]
+    assert await MessageRepository(redis).get_posted_intents(user_id) == [str(intent.id)]
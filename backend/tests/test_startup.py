@@ -0,0 +1,14 @@
+from backend.benchmarks.import_time import measure
+
+# Generous ceiling for a cold `import backend.main` (typically ~0.5s);
+# catches heavyweight imports creeping back onto the startup path.
+IMPORT_BUDGET_US = 2_000_000
+
+
+def test_redis_only_startup_skips_postgres_stack():
+    timings = measure("backend.main", env={"POSTGRES_ENABLED": "false", "DEBUG": "false"})
+
+    assert "backend.main" in timings
+    assert not any(name.split(".")[0] in ("sqlalchemy", "asyncpg") for name in timings)
+    assert "backend.api.debug" not in timings
+    assert timings["backend.main"] < IMPORT_BUDGET_US
@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+from redis.asyncio import from_url
+
+from backend.config import settings
+from backend.infra.persistence import tracing
+from backend.infra.persistence.keys import RedisKeys
+
+
+def test_key_pattern_masks_identifiers():
+    intent_id = uuid.uuid4()
+    assert tracing.key_pattern(RedisKeys.intent_joins(intent_id)) == "intent:*:joins"
+    assert tracing.key_pattern(RedisKeys.rate_limit(str(intent_id), "join")) == "identity:*:limits:join"
+    assert tracing.key_pattern(RedisKeys.intent_geo()) == "intents:geo"
+    assert tracing.key_pattern(b"area:u4pru") == "area:*"
+
+
+def test_describe_command_handles_keyless_and_scripts():
+    assert tracing.describe_command(("MULTI",)) == ("MULTI", "-")
+    assert tracing.describe_command(("EVALSHA", "abc", 1, "intent:1:joins", "u")) == ("EVALSHA", "intent:*:joins")
+    assert tracing.describe_command(("EVALSHA", "abc", 0)) == ("EVALSHA", "-")
+    assert tracing.describe_command(("mget", "intent:1", "intent:2")) == ("MGET", "intent:*")
+
+
+@pytest.mark.asyncio
+async def test_traced_pool_records_commands_per_request():
+    client = from_url(settings.REDIS_DSN, decode_responses=True)
+    pool = client.connection_pool
+    pool.connection_class = tracing.traced_connection_class(pool.connection_class)
+    tracing.reset_stats()
+
+    intent_id = uuid.uuid4()
+    token = tracing.begin_request_trace()
+    try:
+        await client.sadd(RedisKeys.intent_joins(intent_id), "u1")
+        pipe = client.pipeline()
+        pipe.scard(RedisKeys.intent_joins(intent_id))
+        pipe.get(RedisKeys.intent(intent_id))
+        await pipe.execute()
+        await client.delete(RedisKeys.intent_joins(intent_id))
+    finally:
+        trace = tracing.end_request_trace(token)
+        await client.aclose()
+
+    traced = [(s.command, s.pattern) for s in trace]
+    # The connection handshake is not attributed to the request
+    assert traced == [
+        ("SADD", "intent:*:joins"),
+        ("MULTI", "-"),
+        ("SCARD", "intent:*:joins"),
+        ("GET", "intent:*"),
+        ("EXEC", "-"),
+        ("DEL", "intent:*:joins"),
+    ]
+    assert all(s.size > 0 and s.seconds >= 0 for s in trace)
+
+    rows = tracing.slowest_patterns(limit=50)
+    assert {(r["command"], r["pattern"]) for r in rows} == set(traced)
+    sadd = next(r for r in rows if r["command"] == "SADD")
+    assert sadd["count"] == 1 and sadd["max_ms"] >= sadd["mean_ms"]
+    tracing.reset_stats()
@@ -0,0 +1,91 @@
+import random
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from backend.core.events import IntentFlagged
+from backend.core.models.intent import MAX_VISIBLE_FLAGS, Intent
+from backend.infra.persistence.keys import RedisKeys
+from backend.infra.persistence.redis import RedisClient
+from backend.main import app, lifespan
+
+GEOHASH5_LON_DEG = 360 / 2**13  # width of a geohash-5 cell
+
+
+@pytest.fixture(autouse=True)
+async def manage_redis():
+    async with lifespan(app):
+        yield
+
+
+async def _intent_with_joins(lat: float, lon: float, joins: int) -> Intent:
+    container = app.state.container
+    intent = Intent(title=f"{joins} joins", emoji="🔥", latitude=lat, longitude=lon, created_at=datetime.now(UTC))
+    await container.intent_repo.save_intent(intent)
+    for _ in range(joins):
+        await container.join_repo.save_join(intent.id, uuid4())
+    return intent
+
+
+@pytest.mark.asyncio
+async def test_trending_merges_neighbouring_cells_by_join_count():
+    lat, lon = random.uniform(-30, 30), random.uniform(-150, 150)
+    top = await _intent_with_joins(lat, lon, 3)
+    low = await _intent_with_joins(lat, lon, 1)
+    next_cell = await _intent_with_joins(lat, lon + GEOHASH5_LON_DEG, 2)
+    await _intent_with_joins(lat + 1.0, lon, 5)  # far away
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(f"/intents/trending?lat={lat}&lon={lon}")
+        assert response.status_code == 200
+        data = response.json()
+        assert [i["id"] for i in data["intents"]] == [str(top.id), str(next_cell.id), str(low.id)]
+        assert [i["join_count"] for i in data["intents"]] == [3, 2, 1]
+
+        quiet = await client.get(f"/intents/trending?lat={-lat}&lon={-lon}")
+        assert quiet.json()["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_intents_are_pruned_from_leaderboards():
+    container = app.state.container
+    lat, lon = random.uniform(-30, 30), random.uniform(-150, 150)
+    live = await _intent_with_joins(lat, lon, 1)
+    expired = await _intent_with_joins(lat, lon, 2)
+    await RedisClient.get_client().delete(RedisKeys.intent(expired.id))  # stands in for its TTL running out
+
+    assert [i.id for i in await container.trending_service.trending(lat, lon)] == [live.id]
+    cells = container.trending_repo.cells(lat, lon)
+    assert await container.trending_repo.top(cells, 10) == [(str(live.id), 1)]
+
+
+@pytest.mark.asyncio
+async def test_intents_leave_leaderboards_when_flagged_hidden():
+    container = app.state.container
+    lat, lon = random.uniform(-30, 30), random.uniform(-150, 150)
+    live = await _intent_with_joins(lat, lon, 1)
+    flagged = await _intent_with_joins(lat, lon, 2)
+    cells = container.trending_repo.cells(lat, lon)
+
+    # Below the threshold it stays on the board
+    await container.intent_repo.save_intent(flagged.model_copy(update={"flags": MAX_VISIBLE_FLAGS - 1}))
+    await container.event_bus.publish(IntentFlagged(
+        intent_id=flagged.id, new_flag_count=MAX_VISIBLE_FLAGS - 1, timestamp=datetime.now(UTC),
+    ))
+    assert len(await container.trending_repo.top(cells, 10)) == 2
+
+    await container.intent_repo.save_intent(flagged.model_copy(update={"flags": MAX_VISIBLE_FLAGS}))
+    await container.event_bus.publish(IntentFlagged(
+        intent_id=flagged.id, new_flag_count=MAX_VISIBLE_FLAGS, timestamp=datetime.now(UTC),
+    ))
+    assert await container.trending_repo.top(cells, 10) == [(str(live.id), 1)]
+
+
+@pytest.mark.asyncio
+async def test_trending_limit_is_bounded():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/intents/trending?lat=0&lon=0&limit=0")).status_code == 422
+        assert (await client.get("/intents/trending?lat=0&lon=0&limit=101")).status_code == 422
+        assert (await client.get("/intents/trending?lat=0&lon=0&limit=100")).status_code == 200
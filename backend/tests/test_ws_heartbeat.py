@@ -0,0 +1,126 @@
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import pytest
+
+from backend.api.heartbeat import (
+    EXPIRED_CLOSE_CODE,
+    IDLE_CLOSE_CODE,
+    Heartbeat,
+    TimerWheel,
+)
+from backend.api.ws import ConnectionManager
+from backend.core.models.intent import Intent
+from backend.infra.persistence.intent_repo import IntentRepository
+from backend.infra.persistence.redis import RedisClient
+from backend.main import app, lifespan
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.closed: int | None = None
+
+    async def send_text(self, data: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.closed = code
+
+
+def _heartbeat(clock: FakeClock, idle_timeout: float = 60.0) -> tuple[ConnectionManager, Heartbeat]:
+    manager = ConnectionManager(max_per_room=100, max_total=1000)
+    return manager, Heartbeat(manager, idle_timeout=idle_timeout, tick=1.0, room_check_interval=30.0, clock=clock)
+
+
+def _connect(manager: ConnectionManager, heartbeat: Heartbeat, clock: FakeClock, intent_id=None):
+    ws = FakeWebSocket()
+    conn = manager.join(intent_id or uuid4(), ws)
+    conn.last_seen = clock()
+    heartbeat.track(conn)
+    return ws, conn
+
+
+def test_timer_wheel_fires_on_deadline_never_early():
+    wheel = TimerWheel(tick=1.0, slots=10, now=0.0)
+    wheel.schedule("a", 2.5)
+    wheel.schedule("b", 4.0)
+
+    assert wheel.advance(2.9) == []
+    assert wheel.advance(3.0) == ["a"]
+    assert wheel.advance(3.5) == []
+    assert wheel.advance(4.0) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_clamps_far_deadlines_and_wraps():
+    wheel = TimerWheel(tick=1.0, slots=4, now=0.0)
+    wheel.schedule("far", 100.0)  # clamped to the last bucket
+    assert wheel.advance(3.0) == ["far"]
+    wheel.schedule("wrapped", 5.0)
+    assert wheel.advance(5.0) == ["wrapped"]
+
+
+@pytest.mark.asyncio
+async def test_sweep_evicts_silent_connections_in_one_batch():
+    clock = FakeClock()
+    manager, heartbeat = _heartbeat(clock)
+    silent = [_connect(manager, heartbeat, clock) for _ in range(3)]
+    chatty_ws, chatty = _connect(manager, heartbeat, clock)
+
+    clock.now += 30
+    chatty.last_seen = clock.now  # client pinged
+    assert await heartbeat.sweep() == 0
+
+    clock.now += 30
+    assert await heartbeat.sweep() == 3
+    assert [ws.closed for ws, _ in silent] == [IDLE_CLOSE_CODE] * 3
+    assert chatty_ws.closed is None
+    assert manager.total == 1
+
+    # The active connection was re-bucketed, not dropped from the wheel
+    clock.now += 30
+    assert await heartbeat.sweep() == 1
+    assert chatty_ws.closed == IDLE_CLOSE_CODE
+    assert manager.total == 0
+
+
+@pytest.mark.asyncio
+async def test_sweep_skips_connections_that_already_left():
+    clock = FakeClock()
+    manager, heartbeat = _heartbeat(clock)
+    intent_id = uuid4()
+    ws, _ = _connect(manager, heartbeat, clock, intent_id=intent_id)
+    manager.leave(intent_id, ws)
+
+    clock.now += 61
+    assert await heartbeat.sweep() == 0
+    assert ws.closed is None
+    assert len(heartbeat.wheel) == 0
+
+
+@pytest.mark.asyncio
+async def test_check_rooms_closes_rooms_of_expired_intents():
+    async with lifespan(app):
+        reader = RedisClient.get_reader()
+        live = Intent(title="Live", emoji="🟢", latitude=1.0, longitude=1.0, created_at=datetime.now(UTC))
+        await IntentRepository(RedisClient.get_client()).save_intent(live)
+
+        clock = FakeClock()
+        manager, heartbeat = _heartbeat(clock)
+        live_ws, _ = _connect(manager, heartbeat, clock, intent_id=live.id)
+        expired_id = uuid4()  # never saved: stands in for an intent whose TTL ran out
+        gone = [_connect(manager, heartbeat, clock, intent_id=expired_id)[0] for _ in range(2)]
+
+        assert await heartbeat.check_rooms(reader) == 1
+        assert [ws.closed for ws in gone] == [EXPIRED_CLOSE_CODE] * 2
+        assert live_ws.closed is None
+        assert manager.room_ids() == [live.id]
+        assert manager.room_size(expired_id) == 0
@@ -0,0 +1,117 @@
+import json
+from uuid import uuid4
+
+import pytest
+
+from backend.api.ws import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent: list[str] = []
+        self.closed: int | None = None
+
+    async def send_text(self, data: str) -> None:
+        if self.fail:
+            raise RuntimeError("socket gone")
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.closed = code
+
+
+def test_limits_come_from_constructor():
+    manager = ConnectionManager(max_per_room=2, max_total=3)
+    room_a, room_b = uuid4(), uuid4()
+
+    assert manager.join(room_a, FakeWebSocket())
+    assert manager.join(room_a, FakeWebSocket())
+    assert not manager.join(room_a, FakeWebSocket())  # room full
+    assert manager.join(room_b, FakeWebSocket())
+    assert not manager.join(uuid4(), FakeWebSocket())  # worker full
+    assert manager.total == 3
+
+
+def test_str_and_uuid_ids_share_a_room():
+    manager = ConnectionManager(max_per_room=10, max_total=10)
+    intent_id = uuid4()
+    ws = FakeWebSocket()
+    manager.join(str(intent_id), ws)
+
+    assert manager.room_size(intent_id) == 1
+    manager.leave(intent_id, ws)
+    assert manager.room_size(str(intent_id)) == 0
+    assert manager.total == 0
+    assert manager.memory_usage()["rooms"] == 0
+
+
+def test_leave_unknown_socket_is_a_noop():
+    manager = ConnectionManager(max_per_room=10, max_total=10)
+    intent_id = uuid4()
+    manager.join(intent_id, FakeWebSocket())
+    manager.leave(intent_id, FakeWebSocket())
+    assert manager.total == 1
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_and_drops_dead_sockets():
+    manager = ConnectionManager(max_per_room=10, max_total=10)
+    intent_id = uuid4()
+    sender, alive, dead = FakeWebSocket(), FakeWebSocket(), FakeWebSocket(fail=True)
+    for ws in (sender, alive, dead):
+        manager.join(intent_id, ws)
+
+    await manager.broadcast(str(intent_id), {"type": "new_message", "content": "héllo"}, exclude=sender)
+
+    assert sender.sent == []
+    assert alive.sent == ['{"type":"new_message","content":"héllo"}']
+    assert json.loads(alive.sent[0])["content"] == "héllo"
+    assert manager.members(intent_id) == [sender, alive]
+    assert manager.total == 2
+
+
+@pytest.mark.asyncio
+async def test_close_all_empties_manager():
+    manager = ConnectionManager(max_per_room=10, max_total=10)
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for ws in sockets:
+        manager.join(uuid4(), ws, user_id=uuid4())
+
+    await manager.close_all(code=1001)
+
+    assert [ws.closed for ws in sockets] == [1001, 1001, 1001]
+    assert manager.total == 0
+    usage = manager.memory_usage()
+    assert (usage["connections"], usage["rooms"], usage["bytes_per_connection"]) == (0, 0, 0.0)
+
+
+def test_memory_usage_scales_with_connections():
+    manager = ConnectionManager(max_per_room=100, max_total=10_000)
+    intent_id = uuid4()
+    for _ in range(100):
+        manager.join(intent_id, FakeWebSocket(), user_id=uuid4())
+
+    usage = manager.memory_usage()
+    assert usage["connections"] == 100
+    assert usage["rooms"] == 1
+    # Slotted record + dict slot + 16-byte user id; far below a per-socket dict/str layout
+    assert 0 < usage["bytes_per_connection"] < 400
+
+
+@pytest.mark.asyncio
+async def test_feed_sockets_share_the_total_limit_but_no_room():
+    manager = ConnectionManager(max_per_room=10, max_total=2)
+    feed_ws = FakeWebSocket()
+    conn = manager.join_feed(feed_ws)
+    manager.touch(conn)
+
+    assert manager.join(uuid4(), FakeWebSocket())
+    assert manager.join_feed(FakeWebSocket()) is None  # worker full
+    assert manager.feed_size == 1
+    assert len(manager.room_ids()) == 1  # the feed is never room-checked
+    assert manager.drain_presence() == {}
+
+    await manager.evict([conn], code=4008)
+    assert feed_ws.closed == 4008
+    assert (manager.feed_size, manager.total) == (0, 1)
@@ -75,3 +75,122 @@ def test_visibility_thresholds():
     # Popular intent -> visible
     i3 = make_intent(joins=5, system=False)
     assert is_visible(i3, 0.5) is True
+
+
+def test_presence_boosts_score_when_weighted():
+    now = datetime.now(timezone.utc)
+    empty = Intent(title="A", emoji="🅰️", latitude=0, longitude=0, created_at=now)
+    busy = empty.with_counts(join_count=0, online_count=8)
+
+    # Unweighted by default: presence alone does not reorder
+    assert calculate_score(busy, dist_km=0, now=now) == calculate_score(empty, dist_km=0, now=now)
+    assert calculate_score(busy, dist_km=0, now=now, w_online=0.5) > calculate_score(empty, dist_km=0, now=now, w_online=0.5)
+
+
+def test_batch_scores_match_the_datetime_formula_under_custom_weights():
+    from math import log1p
+    from backend.config import settings
+    from backend.core.models.ranking import linear_scores, score_terms
+    from backend.services.ranking_service import RankingService
+
+    weights = {"RANKING_W_DIST": 1.5, "RANKING_W_FRESH": 3.0, "RANKING_W_POP": 0.8, "RANKING_W_ONLINE": 0.2, "RANKING_DECAY_SECONDS": 7200}
+    now = datetime.now(timezone.utc)
+    intents = [
+        make_intent(ago_seconds=s, joins=j).with_counts(join_count=j, online_count=o)
+        for s, j, o in [(0, 0, 0), (600, 3, 1), (5000, 12, 0), (9000, 1, 4), (30, 2000, 2)]
+    ]
+    dists = [0.0, 0.3, 0.9, 1.5, 0.1]
+
+    expected = [
+        1.5 * max(0, 1 - d / 2.0) + 3.0 * max(0, 1 - (now - i.created_at).total_seconds() / 7200)
+        + 0.8 * log1p(i.join_count) + 0.2 * log1p(i.online_count)
+        for i, d in zip(intents, dists)
+    ]
+    terms = [score_terms(i) for i in intents]
+    scores = linear_scores(
+        [c for c, _ in terms], [p for _, p in terms], dists, [i.online_count for i in intents], None,
+        now.timestamp(), 2.0, w_dist=1.5, w_fresh=3.0, w_pop=0.8, decay_seconds=7200, w_online=0.2,
+    )
+    assert scores == pytest.approx(expected, abs=1e-9)
+
+    ranking = RankingService(settings.model_copy(update=weights))
+    by_expected = [i.id for _, i in sorted(zip(expected, intents), key=lambda p: p[0], reverse=True)]
+    assert [i.id for i in ranking.rank(list(zip(intents, dists)), 2.0, limit=5)] == by_expected
+
+
+def test_score_terms_are_cached_at_hydration_and_follow_count_changes():
+    from math import log1p
+    from backend.core.models.ranking import score_terms
+
+    intent = make_intent(ago_seconds=60, joins=3)
+    assert score_terms(intent) == (intent.created_at.timestamp(), log1p(3))
+    assert score_terms(intent.with_counts(join_count=7, online_count=1))[1] == log1p(7)
+    assert score_terms(intent.with_join_count(0))[1] == 0.0
+
+    naive = Intent.model_validate_json(intent.model_dump_json().replace("Z", ""))
+    assert score_terms(naive)[0] == pytest.approx(intent.created_at.timestamp())
+    # Not part of the serialized model
+    assert "created_ts" not in intent.model_dump() and "created_ts" not in Intent.model_json_schema()["properties"]
+
+
+def test_strategies_order_by_their_own_criteria():
+    from backend.core.models.ranking import RANKING_STRATEGIES, CandidateBatch, ScoreWeights
+
+    now = datetime.now(timezone.utc)
+    near_stale = make_intent(ago_seconds=20 * 3600)
+    far_fresh = make_intent(ago_seconds=0, joins=20)
+    batch = CandidateBatch.from_pairs([(near_stale, 0.05), (far_fresh, 0.6)])
+
+    scores = {name: strategy(batch, now.timestamp(), 1.0, ScoreWeights()) for name, strategy in RANKING_STRATEGIES.items()}
+    assert scores["distance"][0] > scores["distance"][1]
+    # Fresh and popular outweighs a few hundred metres for both score models
+    assert scores["linear"][1] > scores["linear"][0]
+    assert scores["gravity"][1] > scores["gravity"][0]
+    assert scores["learned"] == scores["linear"]
+
+
+def test_strategy_selection_and_experiment_buckets():
+    from uuid import UUID
+    from backend.config import settings
+    from backend.services.ranking_service import RankingService
+
+    ranking = RankingService(settings.model_copy(update={
+        "RANKING_EXPERIMENT": "gravity:25", "RANKING_LEARNED_WEIGHTS": "0,1,0,0,0",
+    }))
+    assert ranking.strategy_for(UUID(int=24)) == "gravity"
+    assert ranking.strategy_for(UUID(int=125)) == "linear"
+    assert ranking.strategy_for(None) == "linear"
+    assert ranking.strategy_for(UUID(int=24), requested="distance") == "distance"
+    assert ranking.weights_for("learned").w_fresh == 1.0 and ranking.weights_for("learned").w_dist == 0.0
+
+    with pytest.raises(ValueError):
+        ranking.strategy_for(requested="nope")
+    with pytest.raises(ValueError):
+        RankingService(settings.model_copy(update={"RANKING_STRATEGY": "nope"}))
+    with pytest.raises(ValueError):
+        RankingService(settings.model_copy(update={"RANKING_LEARNED_WEIGHTS": "1,2"}))
+
+
+@pytest.mark.parametrize("strategy", ["linear", "gravity"])
+def test_numpy_and_python_scoring_agree(strategy, monkeypatch):
+    import random
+    from math import log1p
+    from backend.core.models import ranking
+
+    if ranking.np is None:
+        pytest.skip("numpy not installed")
+    rng = random.Random(7)
+    n = ranking.NUMPY_MIN_CANDIDATES + 50
+    now_ts = 1_700_000_000.0
+    batch = ranking.CandidateBatch(
+        [now_ts - rng.uniform(0, 2 * 86400) for _ in range(n)],
+        [log1p(rng.randint(0, 40)) for _ in range(n)],
+        [rng.uniform(0, 2.5) for _ in range(n)],
+        [rng.randint(0, 2000) for _ in range(n)],
+        [rng.uniform(0, 50) for _ in range(n)],
+    )
+    weights = ranking.ScoreWeights(1.2, 2.0, 0.5, 0.3, 0.4, 7200)
+    with_numpy = ranking.RANKING_STRATEGIES[strategy](batch, now_ts, 2.0, weights)
+    monkeypatch.setattr(ranking, "np", None)
+    without = ranking.RANKING_STRATEGIES[strategy](batch, now_ts, 2.0, weights)
+    assert with_numpy == pytest.approx(without, rel=1e-12, abs=1e-12)